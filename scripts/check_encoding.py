@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+check_encoding.py
+─────────────────
+Перевірка цілісності кодування *.loc.tsv на рівні байтів.
+
+Раніше всі скрипти читали TSV з `encoding_errors="ignore"`: биті байти
+мовчки зникали, а файл потім записувався назад уже без них. Тепер
+спільний завантажувач (l10n_tree.load_tsv) на битому UTF-8 зупиняється,
+а цей скрипт показує, що саме не так і де:
+
+  • invalid-utf8   — невалідна послідовність UTF-8
+  • bom            — BOM (U+FEFF) на початку файлу або всередині
+  • nul            — нульовий байт
+  • mixed-eol      — у файлі змішано CRLF / LF / CR; вказуються кінці
+                     рядків, що відрізняються від основного стилю файлу
+
+Для кожної проблеми — зміщення в байтах і номер рядка. Кожен файл
+читається один раз цілком і перевіряється за один прохід; файли
+обробляються паралельно в пулі потоків.
+
+З `--repair`:
+  • BOM і NUL видаляються
+  • невалідні послідовності замінюються на U+FFFD («�»), щоб їх було
+    видно й можна знайти пошуком — нічого не зникає мовчки
+  • кінці рядків приводяться до основного стилю файлу
+
+Використання:
+    python scripts/check_encoding.py                       # translation/text/db
+    python scripts/check_encoding.py _upstream/en/text/db names.loc.tsv
+    python scripts/check_encoding.py --repair
+
+Код виходу 1, якщо знайдено проблеми (і не виправлено з --repair).
+"""
+
+import argparse, bisect, codecs, contextlib, os, re, sys, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from l10n_txn import TreeLock, write_files
+
+DEFAULT_DIR = Path("translation/text/db")
+BOM = b"\xef\xbb\xbf"
+EOL_RE = re.compile(rb"\r\n|\r|\n")
+
+
+class Issue(NamedTuple):
+    offset: int
+    line: int
+    kind: str
+    detail: str
+
+
+def line_starts(data: bytes) -> list[int]:
+    """Зміщення початку кожного рядка після першого (CRLF, LF і CR — за один прохід)."""
+    return [m.end() for m in EOL_RE.finditer(data)]
+
+
+def line_of(starts: list[int], offset: int) -> int:
+    return bisect.bisect_right(starts, offset) + 1
+
+
+# обробник помилок декодування записує межі кожної битої послідовності й
+# продовжує з наступного байта (файли перевіряються в кількох потоках)
+_local = threading.local()
+
+
+def _record_span(e: UnicodeDecodeError) -> tuple[str, int]:
+    _local.spans.append((e.start, e.end))
+    return "", e.end
+
+
+codecs.register_error("check_encoding.record", _record_span)
+
+
+def invalid_spans(data: bytes) -> list[tuple[int, int]]:
+    """(start, end) невалідних послідовностей UTF-8 — за одне декодування."""
+    _local.spans = spans = []
+    data.decode("utf-8", "check_encoding.record")
+    return spans
+
+
+def eol_style(data: bytes) -> tuple[bytes, dict[bytes, int]]:
+    """Основний кінець рядка файлу й кількість кожного виду."""
+    crlf = data.count(b"\r\n")
+    counts = {b"\r\n": crlf, b"\n": data.count(b"\n") - crlf, b"\r": data.count(b"\r") - crlf}
+    return max(counts, key=counts.get), counts
+
+
+def scan(data: bytes) -> list[Issue]:
+    issues = []
+    starts = line_starts(data)
+    for start, end in invalid_spans(data):
+        issues.append(Issue(start, line_of(starts, start), "invalid-utf8", data[start:end].hex(" ")))
+
+    pos = data.find(BOM)
+    while pos >= 0:
+        issues.append(Issue(pos, line_of(starts, pos), "bom", "на початку файлу" if pos == 0 else "всередині"))
+        pos = data.find(BOM, pos + len(BOM))
+
+    pos = data.find(b"\0")
+    while pos >= 0:
+        issues.append(Issue(pos, line_of(starts, pos), "nul", "00"))
+        pos = data.find(b"\0", pos + 1)
+
+    main, counts = eol_style(data)
+    if sum(1 for n in counts.values() if n) > 1:
+        names = {b"\r\n": "CRLF", b"\n": "LF", b"\r": "CR"}
+        for m in EOL_RE.finditer(data):
+            if m.group() != main:
+                issues.append(Issue(m.start(), line_of(starts, m.start()), "mixed-eol",
+                                    f"{names[m.group()]} замість {names[main]}"))
+    return sorted(issues)
+
+
+def repair(data: bytes) -> bytes:
+    text = data.decode("utf-8", errors="replace")        # невалідне → U+FFFD
+    text = text.replace("\ufeff", "").replace("\0", "")
+    main, _ = eol_style(data)
+    return EOL_RE.sub(main, text.encode("utf-8"))
+
+
+def process_file(path: Path, fix: bool = False) -> tuple[Path, list[Issue], Optional[bytes]]:
+    """(файл, проблеми, виправлений вміст — з fix і лише якщо він інший)."""
+    data = path.read_bytes()
+    issues = scan(data)
+    fixed = repair(data) if issues and fix else None
+    return path, issues, fixed if fixed != data else None
+
+
+def main(argv: list[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Биті UTF-8, BOM, NUL і змішані кінці рядків у *.loc.tsv.")
+    ap.add_argument("paths", nargs="*", help="файли або каталоги (за замовчуванням DEFAULT_DIR)")
+    ap.add_argument("--repair", action="store_true", help="виправити знайдене")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="кількість потоків")
+    args = ap.parse_args(argv)
+
+    files: list[Path] = []
+    for a in args.paths or [DEFAULT_DIR]:
+        p = Path(a)
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.loc.tsv")))
+        elif p.exists():
+            files.append(p)
+        else:
+            print(f"{p} — не знайдено, пропуск.")
+
+    # з --repair — блокування дерева від читання до запису (l10n_txn.py)
+    with TreeLock() if args.repair else contextlib.nullcontext():
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            results = list(pool.map(lambda f: process_file(f, args.repair), files))
+        if args.repair:
+            write_files({path: fixed for path, _, fixed in results if fixed is not None})
+
+    bad = 0
+    for path, issues, fixed in results:
+        for i in issues:
+            print(f"❌ {path}:{i.line} (байт {i.offset}): {i.kind} {i.detail}")
+        if fixed:
+            print(f"🔧 {path}: виправлено")
+        elif issues:
+            bad += 1
+
+    total = sum(len(r[1]) for r in results)
+    if not total:
+        print(f"✅ Перевірено файлів: {len(files)} — проблем з кодуванням немає.")
+        return 0
+    print(f"\n⚠️  Проблем: {total} у {sum(1 for r in results if r[1])} файлах"
+          + ("" if bad else " — виправлено."))
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
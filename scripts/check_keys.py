@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+check_keys.py
+─────────────
+Глобальна перевірка key по всьому дереву перекладу.
+
+Гра зливає всі *.loc у один простір імен, тож key, визначений у двох
+різних файлах, мовчки перекриває інший. validate_tsv.py перевіряє
+унікальність лише в межах файлу; цей скрипт будує один хеш-індекс
+key → [(файл, рядок)] для всього `translation/text/db` і показує:
+
+  • колізії — key у кількох файлах (або кілька разів в одному)
+  • «сироти» — key з перекладу, яких немає в жодному файлі
+    `_upstream/en/text/db` (застарілі або з помилкою в назві)
+
+Індекс кожного файлу (key → номери рядків) будується за один прохід
+по байтах і кешується в `_temp/cache/keys.json`; повторний запуск
+переіндексовує лише змінені файли.
+
+Використання:
+    python scripts/check_keys.py
+    python scripts/check_keys.py --no-orphans       # лише колізії
+
+Код виходу 1, якщо є колізії.
+"""
+
+import argparse, sys
+from pathlib import Path
+from typing import Optional
+
+from l10n_tree import FileCache, Tree
+
+SRC_DIR = Path("_upstream/en/text/db")
+TRG_DIR = Path("translation/text/db")
+
+
+def add_key(keys: dict[str, list[int]], key: str, lineno: int) -> None:
+    if key.strip() and not key.startswith("#Loc;"):
+        keys.setdefault(key, []).append(lineno)
+
+
+def scan_keys(path: Path) -> dict[str, list[int]]:
+    """key → номери рядків (1 — заголовок); службові й порожні key пропускаються."""
+    keys: dict[str, list[int]] = {}
+    with open(path, "rb") as f:
+        next(f, None)
+        for lineno, line in enumerate(f, 2):
+            add_key(keys, line.split(b"\t", 1)[0].rstrip(b"\r\n").decode("utf-8", errors="ignore"), lineno)
+    return keys
+
+
+def index_dir(tree: Tree, directory: Path, cache: FileCache) -> dict[str, dict[str, list[int]]]:
+    """file → (key → рядки) для всіх файлів каталогу.
+
+    Незмінені файли беруться з кешу; змінені в пам'яті (у конвеєрі l10n.py)
+    індексуються з таблиці дерева й у кеш не потрапляють.
+    """
+    dirty = set(tree.dirty)
+    result = {}
+    for p in tree.files(directory):
+        if p in dirty:
+            keys: dict[str, list[int]] = {}
+            for lineno, key in enumerate(tree.table(p)["key"], 2):
+                add_key(keys, key, lineno)
+        else:
+            name = f"{directory.as_posix()}/{p.name}"
+            keys = cache.get(name, p)
+            if keys is None:
+                keys = scan_keys(p)
+                cache.put(name, keys, p)
+        result[p.name] = keys
+    return result
+
+
+def collisions(index: dict[str, dict[str, list[int]]]) -> dict[str, list[tuple[str, int]]]:
+    """key → усі місця, де він визначений, якщо їх більше одного."""
+    seen: dict[str, list[tuple[str, int]]] = {}
+    for fname, keys in index.items():
+        for key, lines in keys.items():
+            seen.setdefault(key, []).extend((fname, n) for n in lines)
+    return {k: v for k, v in seen.items() if len(v) > 1}
+
+
+def orphans(index: dict[str, dict[str, list[int]]],
+            upstream: dict[str, dict[str, list[int]]]) -> list[tuple[str, int, str]]:
+    """(file, line, key) для key, яких немає в жодному upstream-файлі."""
+    known = set()
+    for keys in upstream.values():
+        known.update(keys)
+    return [(fname, lines[0], key)
+            for fname, keys in index.items()
+            for key, lines in keys.items() if key not in known]
+
+
+def check_tree(tree: Tree, with_orphans: bool = True) -> int:
+    """Друкує колізії та key без upstream; повертає 1, якщо є колізії."""
+    cache = FileCache("keys")
+    index = index_dir(tree, TRG_DIR, cache)
+    print(f"🔍 Проіндексовано {sum(len(k) for k in index.values())} key у {len(index)} файлах …\n")
+
+    clashes = collisions(index)
+    for key, places in sorted(clashes.items()):
+        where = ", ".join(f"{f}:{n}" for f, n in places)
+        print(f"❌ {key}: {where}")
+
+    lost = []
+    upstream = index_dir(tree, SRC_DIR, cache) if with_orphans else {}
+    if upstream:
+        lost = orphans(index, upstream)
+        for fname, lineno, key in lost:
+            print(f"⚠️  {fname}:{lineno}: {key} — немає в жодному файлі {SRC_DIR}")
+    cache.save()
+
+    print()
+    print(f"Колізій key: {len(clashes)}")
+    if upstream:
+        print(f"Key без upstream: {len(lost)}")
+    elif with_orphans:
+        print(f"–  {SRC_DIR} порожній, пошук key без upstream пропущено.")
+    return 1 if clashes else 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Колізії key між файлами та key без upstream.")
+    ap.add_argument("--no-orphans", action="store_true", help="не шукати key без upstream")
+    args = ap.parse_args(argv)
+    return check_tree(Tree(), with_orphans=not args.no_orphans)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
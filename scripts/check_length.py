@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+check_length.py
+───────────────
+Шукає переклади, які, найімовірніше, не влізуть у вікна інтерфейсу гри.
+
+Український текст часто на 20–40 % довший за англійський, і рядки в
+`uied_component_texts.loc.tsv`, `diplomacy_strings.loc.tsv`, коротких
+описах загонів тощо вилазять за межі UI. Щоб не шукати це грою:
+
+  • для кожного key рахується «ширина» EN і UK тексту за таблицею
+    ширин гліфів (частки em, близько до шрифтів гри: «ш» ширша за «і»),
+    теги розмітки [[col:…]], [[url:…]], {{tr:…}} не враховуються
+  • ширина рахується векторно для цілої колонки (numpy: кодові точки
+    всіх текстів файлу → таблиця ширин → суми по рядках)
+  • рядок порушує бюджет, якщо ширина UK > max_ratio × ширина EN
+  • найгірші рядки виводяться першими
+
+Бюджети — `length_budgets.tsv` у корені репозиторію:
+
+    scope	max_ratio
+    *	1.4                                       ← за замовчуванням
+    uied_component_texts.loc.tsv	1.25          ← для всього файлу
+    ui_text_replacements_localised_text_	1.2   ← для key з цим префіксом
+
+Префікс key важливіший за файл; з кількох префіксів діє найдовший.
+
+Результати кешуються по файлах (`_temp/cache/length.json`), тож
+повторний запуск перераховує лише змінені файли (або все — якщо
+змінилися бюджети).
+
+Використання:
+    python scripts/check_length.py                         # усе дерево, 30 найгірших
+    python scripts/check_length.py diplomacy_strings.loc.tsv --top 0   # усі порушення
+    python scripts/check_length.py --min-width 4           # ігнорувати EN коротші за 4 em
+
+Код виходу 1, якщо є порушення або вказаного файлу немає.
+"""
+
+import argparse, sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from l10n_tree import FileCache, READ_KW, Tree, text_hash
+
+SRC_DIR = Path("_upstream/en/text/db")
+TRG_DIR = Path("translation/text/db")
+BUDGETS = Path("length_budgets.tsv")
+
+DEFAULT_RATIO = 1.4
+SKIP_TEXTS = {"", "PLACEHOLDER", "placeholder", "text_rejected"}
+MARKUP_RE = r"\[\[[^\]]*\]\]|\{\{[^}]*\}\}"
+
+# ── таблиця ширин ────────────────────────────────────────────────────
+TABLE_SIZE = 0x500                       # Latin + Cyrillic (до U+04FF)
+WIDTH_GROUPS = {
+    0.28: " iljIіїЇ!.,:;'|`",
+    0.34: "ftrJ()[]{}-/\\\"«»",
+    0.50: "cksvxyzгкстчъьэяєґ",
+    0.60: "abdeghnopquабвдеёзийлнопруфхцыюABCDEFGHKLNOPRSTUVXYZ0123456789",
+    0.72: "АБВГДЕЁЗИЙКЛНОПРСТУФХЦЧЪЬЭЯЄҐ",
+    0.82: "mwжшщMWЖШЩЮюQ",
+}
+DEFAULT_WIDTH = 0.60
+VERSION = "1"                            # змініть, якщо змінюєте таблицю
+
+
+def build_widths() -> np.ndarray:
+    widths = np.full(TABLE_SIZE + 1, DEFAULT_WIDTH, dtype=np.float32)
+    for width, chars in WIDTH_GROUPS.items():
+        for ch in chars:
+            widths[ord(ch)] = width
+    widths[[ord("\t"), ord("\n"), ord("\r")]] = 0
+    return widths
+
+
+WIDTHS = build_widths()
+
+
+def text_widths(texts: pd.Series) -> np.ndarray:
+    """Ширина кожного тексту колонки в em, за один векторний прохід."""
+    plain = texts.str.replace(MARKUP_RE, "", regex=True)
+    lengths = plain.str.len().to_numpy()
+    if not len(lengths):
+        return np.zeros(0, dtype=np.float32)
+    codes = np.frombuffer("".join(plain).encode("utf-32-le"), dtype=np.uint32)
+    glyphs = WIDTHS[np.minimum(codes, TABLE_SIZE)]
+    sums = np.concatenate(([0], np.cumsum(glyphs, dtype=np.float64)))
+    ends = np.cumsum(lengths)
+    return (sums[ends] - sums[ends - lengths]).astype(np.float32)
+
+# ── бюджети ──────────────────────────────────────────────────────────
+class Budgets:
+    def __init__(self, path: Path = BUDGETS) -> None:
+        self.default = DEFAULT_RATIO
+        self.files: dict[str, float] = {}
+        self.prefixes: list[tuple[str, float]] = []
+        self.digest = VERSION
+        if not path.exists():
+            return
+        df = pd.read_csv(path, usecols=["scope", "max_ratio"], **READ_KW)
+        self.digest += text_hash(path.read_bytes())
+        for scope, ratio in zip(df["scope"].str.strip(), df["max_ratio"].astype(float)):
+            if scope == "*":
+                self.default = ratio
+            elif scope.endswith(".loc.tsv"):
+                self.files[scope] = ratio
+            elif scope:
+                self.prefixes.append((scope, ratio))
+        self.prefixes.sort(key=lambda p: len(p[0]))          # найдовший — останнім
+
+    def for_keys(self, name: str, keys: pd.Series) -> np.ndarray:
+        limits = np.full(len(keys), self.files.get(name, self.default), dtype=np.float32)
+        for prefix, ratio in self.prefixes:
+            limits[keys.str.startswith(prefix).to_numpy()] = ratio
+        return limits
+
+# ── перевірка ────────────────────────────────────────────────────────
+def check_file(en_df: pd.DataFrame, uk_df: pd.DataFrame, name: str,
+               budgets: Budgets, min_width: float) -> list[list]:
+    """[key, ratio, ліміт, ширина EN, ширина UK] для рядків понад бюджет."""
+    df = uk_df[["key", "text"]].merge(en_df[["key", "text"]], on="key", suffixes=("_uk", "_en"))
+    df = df[(df["text_uk"] != df["text_en"]) & ~df["text_uk"].isin(SKIP_TEXTS)
+            & ~df["text_en"].isin(SKIP_TEXTS) & ~df["key"].str.startswith("#Loc;")]
+    if df.empty:
+        return []
+    en_w, uk_w = text_widths(df["text_en"]), text_widths(df["text_uk"])
+    limits = budgets.for_keys(name, df["key"])
+    ok_en = en_w >= min_width
+    ratio = np.divide(uk_w, en_w, out=np.zeros_like(uk_w), where=ok_en)
+    over = ok_en & (ratio > limits)
+    return [[k, round(float(r), 3), float(l), round(float(e), 1), round(float(u), 1)]
+            for k, r, l, e, u in zip(df["key"].to_numpy()[over], ratio[over], limits[over],
+                                     en_w[over], uk_w[over])]
+
+
+def check_tree(tree: Tree, budgets: Budgets, files: list[str] = (),
+               min_width: float = 3.0) -> list[tuple[str, str, float, float, float, float]]:
+    """Порушення (file, key, ratio, ліміт, ширина EN, ширина UK), найгірші першими."""
+    cache = FileCache("length", salt=f"{budgets.digest}:{min_width}")
+    dirty = set(tree.dirty)
+    names = files or [p.name for p in tree.files(TRG_DIR)]
+
+    result = []
+    for name in names:
+        src, trg = SRC_DIR / name, TRG_DIR / name
+        if not (tree.exists(src) and tree.exists(trg)):
+            continue
+        found = None if trg in dirty else cache.get(name, src, trg)
+        if found is None:
+            found = check_file(tree.table(src), tree.table(trg), name, budgets, min_width)
+            if trg not in dirty:
+                cache.put(name, found, src, trg)
+        result.extend((name, *row) for row in found)
+    cache.save()
+    return sorted(result, key=lambda r: r[2] / r[3], reverse=True)
+
+
+def print_violations(result: list, top: int = 30) -> None:
+    shown = result[:top] if top else result
+    for name, key, ratio, limit, en_w, uk_w in shown:
+        print(f"❌ {name}:{key}  ×{ratio:.2f} (ліміт ×{limit:.2f}; EN {en_w:.1f} em → UK {uk_w:.1f} em)")
+    if len(shown) < len(result):
+        print(f"… ще {len(result) - len(shown)}")
+    if result:
+        print(f"\n⚠️  Рядків понад бюджет довжини: {len(result)}")
+    else:
+        print("✅ Усі переклади в межах бюджету довжини.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Переклади, довші за бюджет відносно EN.")
+    ap.add_argument("files", nargs="*", help="лише ці *.loc.tsv (назви файлів)")
+    ap.add_argument("--budgets", type=Path, default=BUDGETS, help="TSV з колонками scope, max_ratio")
+    ap.add_argument("--min-width", type=float, default=3.0, help="не перевіряти EN, вужчі за N em")
+    ap.add_argument("--top", type=int, default=30, help="скільки найгірших показати (0 — усі)")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    missing = [n for n in args.files if not (tree.exists(SRC_DIR / n) and tree.exists(TRG_DIR / n))]
+    for name in missing:
+        print(f"⚠️  {name} — немає в {TRG_DIR.as_posix()} або {SRC_DIR.as_posix()}, пропуск.")
+    result = check_tree(tree, Budgets(args.budgets), args.files, args.min_width)
+    if result or not missing:
+        print_violations(result, args.top)
+    return 1 if result or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
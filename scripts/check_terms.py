@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+check_terms.py
+──────────────
+Перевіряє, що в `translation/text/db` дотримано глосарію: якщо в EN-тексті
+рядка трапляється термін, то в українському тексті має бути його
+узгоджений відповідник.
+
+Глосарій — `glossary.tsv` у корені репозиторію:
+
+    en	uk
+    Byzantine Empire	Візантійськ
+    Holy Roman Empire	Священн|Св. Римськ
+
+• `en`  — термін англійською (без урахування регістру, цілими словами)
+• `uk`  — допустимі відповідники через «|»; досить основи слова
+          (Візантійськ → Візантійська, Візантійської, …)
+
+Як працює:
+  • усі терміни (EN і UK) компілюються в ОДИН автомат Aho-Corasick;
+  • для кожного рядка EN-текст і UK-текст скануються за один прохід
+    (`en + "\\0" + uk`), тож вартість O(довжина тексту), а не
+    O(терміни × рядки);
+  • неперекладені рядки (UK == EN) та placeholder-и пропускаються;
+  • результати кешуються по файлах (`_temp/cache/terms.json`) — повторний
+    запуск перевіряє лише змінені файли або всі, якщо змінився глосарій.
+
+Використання:
+    python scripts/check_terms.py                      # усе дерево
+    python scripts/check_terms.py factions.loc.tsv     # лише вказані файли
+    python scripts/check_terms.py --glossary my.tsv
+
+Код виходу 1, якщо знайдено порушення (зручно для CI).
+"""
+
+import argparse, sys
+from collections import deque
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from l10n_tree import FileCache, READ_KW, Tree, text_hash
+
+SRC_DIR  = Path("_upstream/en/text/db")
+TRG_DIR  = Path("translation/text/db")
+GLOSSARY = Path("glossary.tsv")
+
+SKIP_TEXTS = {"", "PLACEHOLDER", "placeholder", "text_rejected"}
+
+# ── Aho-Corasick ─────────────────────────────────────────────────────
+class Automaton:
+    """Класичний автомат Aho-Corasick над символами рядка."""
+
+    def __init__(self) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[list[tuple[int, object]]] = [[]]
+
+    def add(self, word: str, value) -> None:
+        state = 0
+        for ch in word:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(word), value))
+
+    def build(self) -> "Automaton":
+        queue = deque(self.goto[0].values())
+        while queue:
+            r = queue.popleft()
+            for ch, u in self.goto[r].items():
+                queue.append(u)
+                f = self.fail[r]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[u] = self.goto[f].get(ch, 0)
+                self.out[u] = self.out[u] + self.out[self.fail[u]]
+        return self
+
+    def iter(self, text: str) -> Iterator[tuple[int, int, object]]:
+        """(start, end, value) для кожного входження."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for length, value in out[state]:
+                    yield i - length + 1, i + 1, value
+
+# ── глосарій ─────────────────────────────────────────────────────────
+class Glossary:
+    def __init__(self, path: Path = GLOSSARY) -> None:
+        df = pd.read_csv(path, usecols=["en", "uk"], **READ_KW)
+        self.digest = text_hash(path.read_bytes())
+        self.terms: list[tuple[str, list[str]]] = []
+        self.automaton = Automaton()
+        for en, uk in zip(df["en"], df["uk"]):
+            en = en.strip()
+            forms = [f.strip() for f in uk.split("|") if f.strip()]
+            if not en or not forms:
+                continue
+            tid = len(self.terms)
+            self.terms.append((en, forms))
+            self.automaton.add(en.lower(), ("en", tid))
+            for form in forms:
+                self.automaton.add(form.lower(), ("uk", tid))
+        self.automaton.build()
+
+    def violations(self, en: str, uk: str) -> list[int]:
+        """id термінів, що є в EN, але без відповідника в UK."""
+        en = en.lower()                 # lower() може змінити довжину («İ» → «i̇»)
+        text = f"{en}\0{uk.lower()}"
+        sep = len(en)
+        en_hits, uk_hits = set(), set()
+        for start, end, (side, tid) in self.automaton.iter(text):
+            if side == "en" and end <= sep:
+                # лише цілі слова
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == sep or not text[end].isalnum()):
+                    en_hits.add(tid)
+            elif side == "uk" and start > sep:
+                # основа слова: межа потрібна лише на початку
+                if not text[start - 1].isalnum():
+                    uk_hits.add(tid)
+        return sorted(en_hits - uk_hits)
+
+# ── перевірка ────────────────────────────────────────────────────────
+def check_file(en_df: pd.DataFrame, uk_df: pd.DataFrame, glossary: Glossary) -> list[list]:
+    en_map = dict(zip(en_df["key"], en_df["text"]))
+    found = []
+    for key, uk in zip(uk_df["key"], uk_df["text"]):
+        en = en_map.get(key)
+        if en is None or uk == en or uk in SKIP_TEXTS:
+            continue
+        for tid in glossary.violations(en, uk):
+            found.append([key, tid])
+    return found
+
+def check_tree(tree: Tree, glossary: Glossary, files: list[str] = ()) -> list[tuple[str, str, str, list[str]]]:
+    """Повертає порушення (file, key, en_term, uk_forms) для всього дерева."""
+    cache = FileCache("terms", salt=glossary.digest)
+    dirty = set(tree.dirty)
+    names = files or [p.name for p in tree.files(TRG_DIR)]
+
+    result = []
+    for name in names:
+        src, trg = SRC_DIR / name, TRG_DIR / name
+        if not (tree.exists(src) and tree.exists(trg)):
+            continue
+        found = None if trg in dirty else cache.get(name, src, trg)
+        if found is None:
+            found = check_file(tree.table(src), tree.table(trg), glossary)
+            if trg not in dirty:
+                cache.put(name, found, src, trg)
+        for key, tid in found:
+            en_term, forms = glossary.terms[tid]
+            result.append((name, key, en_term, forms))
+    cache.save()
+    return result
+
+def print_violations(result: list[tuple[str, str, str, list[str]]]) -> None:
+    for name, key, en_term, forms in result:
+        print(f"❌ {name}:{key}  «{en_term}» → очікується {' / '.join(forms)}")
+    if result:
+        print(f"\n⚠️  Порушень глосарію: {len(result)}")
+    else:
+        print("✅ Глосарій дотримано.")
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Перевірка термінології за глосарієм.")
+    ap.add_argument("files", nargs="*", help="лише ці *.loc.tsv (назви файлів)")
+    ap.add_argument("--glossary", type=Path, default=GLOSSARY, help="TSV з колонками en, uk")
+    args = ap.parse_args(argv)
+
+    if not args.glossary.exists():
+        print(f"⛔  Глосарій {args.glossary} не знайдено.")
+        return 1
+
+    result = check_tree(Tree(), Glossary(args.glossary), args.files)
+    print_violations(result)
+    return 1 if result else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
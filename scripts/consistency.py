@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+consistency.py
+──────────────
+Той самий EN-текст, перекладений по-різному в різних місцях дерева.
+
+Назва загону чи будівлі трапляється під десятками key у різних файлах,
+і різні перекладачі перекладають її по-різному. dedup_translate_tsv.py
+допомагає лише до перекладу й лише в межах одного файлу; цей скрипт
+дивиться на все дерево:
+
+  • усі перекладені рядки всіх файлів збираються в одну таблицю й
+    групуються за хешем EN-тексту (один векторний прохід pandas)
+  • група з більш ніж одним різним UK-текстом — неузгодженість; для неї
+    показуються варіанти перекладу, скільки разів кожен трапляється і де
+  • кожна група має стабільний id (8 символів sha1 EN-тексту), за яким
+    її можна уніфікувати командою apply
+
+Неперекладені рядки (UK == EN) не враховуються. Не кожна розбіжність —
+помилка (одне англійське слово буває різними частинами мови), тому
+уніфікація лише явна: вказаний варіант або `--majority`.
+
+Використання:
+    python scripts/consistency.py report                       # усі групи
+    python scripts/consistency.py report --file 'land_units*' --verbose
+    python scripts/consistency.py report --json groups.json
+    python scripts/consistency.py apply 3f1c2a9b=1 77aa01cd=2  # група=номер варіанта
+    python scripts/consistency.py apply --majority 0.8 --dry-run
+"""
+
+import argparse, fnmatch, json, sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from l10n_tree import Tree, text_hash
+
+SRC_DIR = Path("_upstream/en/text/db")
+TRG_DIR = Path("translation/text/db")
+
+SKIP_TEXTS = {"", "PLACEHOLDER", "placeholder", "text_rejected"}
+
+
+class Group(NamedTuple):
+    id: str
+    en: str
+    variants: list[tuple[str, list[tuple[str, str]]]]   # (UK-текст, [(file, key)]), найчастіші першими
+
+    @property
+    def rows(self) -> int:
+        return sum(len(places) for _, places in self.variants)
+
+
+def collect_rows(tree: Tree, file_glob: Optional[str] = None) -> pd.DataFrame:
+    """Усі перекладені рядки дерева: file, key, en, uk."""
+    frames = []
+    for trg in tree.files(TRG_DIR):
+        src = SRC_DIR / trg.name
+        if not tree.exists(src) or (file_glob and not fnmatch.fnmatch(trg.name, file_glob)):
+            continue
+        en = tree.table(src)[["key", "text"]]
+        uk = tree.table(trg)[["key", "text"]]
+        df = uk.merge(en.drop_duplicates("key", keep="last"), on="key", suffixes=("_uk", "_en"))
+        df = df[(df["text_uk"] != df["text_en"]) & ~df["text_uk"].isin(SKIP_TEXTS)
+                & ~df["text_en"].isin(SKIP_TEXTS) & ~df["key"].str.startswith("#Loc;")]
+        frames.append(df.assign(file=trg.name))
+    if not frames:
+        return pd.DataFrame(columns=["file", "key", "en", "uk"])
+    return (pd.concat(frames, ignore_index=True)
+            .rename(columns={"text_en": "en", "text_uk": "uk"})[["file", "key", "en", "uk"]])
+
+
+def find_groups(rows: pd.DataFrame, min_rows: int = 2) -> list[Group]:
+    """Групи EN-тексту з кількома різними перекладами, найбільші першими."""
+    if rows.empty:
+        return []
+    rows = rows.assign(h=pd.util.hash_array(rows["en"].to_numpy(dtype=object)))
+    variants = rows.groupby("h")["uk"].nunique()
+    rows = rows[rows["h"].isin(variants.index[variants > 1])]
+
+    groups = []
+    for _, g in rows.groupby("h", sort=False):
+        if len(g) < min_rows:
+            continue
+        en = g["en"].iloc[0]
+        places = g.groupby("uk", sort=False)[["file", "key"]].apply(lambda d: list(zip(d["file"], d["key"])))
+        ordered = sorted(places.items(), key=lambda v: (-len(v[1]), v[0]))
+        groups.append(Group(text_hash(en.encode("utf-8"))[:8], en, ordered))
+    return sorted(groups, key=lambda g: (-g.rows, g.en))
+
+
+def unify(tree: Tree, group: Group, variant: int) -> int:
+    """Ставить варіант №variant (з 1) в усі рядки групи; повертає кількість змінених."""
+    text = group.variants[variant - 1][0]
+    per_file: dict[str, dict[str, str]] = {}
+    for uk, places in group.variants:
+        if uk == text:
+            continue
+        for name, key in places:
+            per_file.setdefault(name, {})[key] = text
+    for name, edits in per_file.items():
+        tree.edit_rows(TRG_DIR / name, edits)
+    return sum(len(e) for e in per_file.values())
+
+# ── вивід ────────────────────────────────────────────────────────────
+def print_groups(groups: list[Group], verbose: bool = False) -> None:
+    for g in groups:
+        print(f"⚠️  [{g.id}] «{g.en}» — варіантів: {len(g.variants)}, рядків: {g.rows}")
+        for n, (uk, places) in enumerate(g.variants, 1):
+            shown = places if verbose else places[:3]
+            where = ", ".join(f"{f}:{k}" for f, k in shown)
+            more = f", … ще {len(places) - len(shown)}" if len(shown) < len(places) else ""
+            print(f"    {n}. «{uk}» ×{len(places)}   {where}{more}")
+    if groups:
+        print(f"\nНеузгоджених груп: {len(groups)}, рядків у них: {sum(g.rows for g in groups)}")
+    else:
+        print("✅ Однакові EN-тексти перекладено однаково.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Однакові EN-тексти з різними перекладами.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("report", help="показати неузгоджені групи")
+    p.add_argument("--file", metavar="GLOB", help="лише файли за шаблоном")
+    p.add_argument("--min-rows", type=int, default=2, help="лише групи з ≥ N рядками")
+    p.add_argument("--verbose", action="store_true", help="усі key кожного варіанта")
+    p.add_argument("--json", metavar="PATH", help="записати групи в JSON")
+    p = sub.add_parser("apply", help="уніфікувати групи до вибраного варіанта")
+    p.add_argument("choices", nargs="*", metavar="ID=N", help="id групи = номер варіанта зі звіту")
+    p.add_argument("--majority", type=float, metavar="SHARE",
+                   help="усі групи, де найчастіший варіант має ≥ SHARE рядків (0.5–1)")
+    p.add_argument("--file", metavar="GLOB", help="лише файли за шаблоном")
+    p.add_argument("--dry-run", action="store_true", help="нічого не записувати")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    groups = find_groups(collect_rows(tree, args.file), getattr(args, "min_rows", 2))
+
+    if args.cmd == "report":
+        print_groups(groups, args.verbose)
+        if args.json:
+            Path(args.json).write_text(json.dumps(
+                [{"id": g.id, "en": g.en, "variants": [
+                    {"uk": uk, "count": len(pl), "keys": [f"{f}:{k}" for f, k in pl]} for uk, pl in g.variants]}
+                 for g in groups], ensure_ascii=False, indent=2), encoding="utf-8")
+        return 0
+
+    by_id = {g.id: g for g in groups}
+    plan: list[tuple[Group, int]] = []
+    for choice in args.choices:
+        gid, _, n = choice.partition("=")
+        if gid not in by_id or not n.isdigit() or not 1 <= int(n) <= len(by_id[gid].variants):
+            raise SystemExit(f"⛔  {choice}: немає такої групи або варіанта (див. report).")
+        plan.append((by_id[gid], int(n)))
+    if args.majority:
+        chosen = {g.id for g, _ in plan}
+        plan += [(g, 1) for g in groups if g.id not in chosen
+                 and len(g.variants[0][1]) / g.rows >= args.majority
+                 and len(g.variants[0][1]) > len(g.variants[1][1])]
+    if not plan:
+        if args.majority:
+            print("–  Немає груп з такою перевагою одного варіанта.")
+            return 0
+        raise SystemExit("⛔  Вкажіть ID=N або --majority.")
+
+    changed = 0
+    for g, n in plan:
+        count = unify(tree, g, n)
+        changed += count
+        print(f"{'~' if args.dry_run else '✅'} [{g.id}] «{g.en}» → «{g.variants[n - 1][0]}» ({count} рядків)")
+    if args.dry_run:
+        print(f"\n(dry-run) буде змінено рядків: {changed} у {len(tree.pending())} файлах")
+        return 0
+    written = tree.flush()
+    print(f"\nЗмінено рядків: {changed}, записано файлів: {len(written)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
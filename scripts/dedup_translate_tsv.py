@@ -33,6 +33,8 @@ python dedup_translate_tsv.py apply   _dedup/names.loc._dedup.tsv \
 from pathlib import Path
 import sys, csv, pandas as pd
 
+from tsv_index import KeyIndex
+
 DEDUP_DIR = Path("_temp")          # каталог, куди кладемо _dedup-файли
 DEDUP_DIR.mkdir(exist_ok=True)
 
@@ -62,8 +64,6 @@ def apply(dedup_file: Path, tsv_orig: Path) -> None:
        шукаючи рядки за key-ами з колонки keys."""
     dedup = pd.read_csv(dedup_file, sep="\t", dtype=str,
                         keep_default_na=False, na_filter=False)
-    orig  = pd.read_csv(tsv_orig,  sep="\t", dtype=str,
-                        keep_default_na=False, na_filter=False)
 
     # будуємо словник key → translate
     key2tr: dict[str, str] = {}
@@ -78,12 +78,10 @@ def apply(dedup_file: Path, tsv_orig: Path) -> None:
         print("–  У dedup-файлі немає заповненої колонки translate.")
         return
 
-    # застосовуємо (лише для тих key, що існують у словнику)
-    mask = orig["key"].isin(key2tr.keys())
-    orig.loc[mask, "text"] = orig.loc[mask, "key"].map(key2tr)
-
-    orig.to_csv(tsv_orig, sep="\t", index=False, quoting=csv.QUOTE_NONE)
-    print(f"✅  Оновлено {tsv_orig.name}: перекладено {mask.sum()} рядків.")
+    # застосовуємо (лише для тих key, що існують у файлі) — переписуються
+    # тільки змінені рядки, решта файлу не розбирається й не серіалізується
+    updated = KeyIndex(tsv_orig).rewrite(key2tr)
+    print(f"✅  Оновлено {tsv_orig.name}: перекладено {updated} рядків.")
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
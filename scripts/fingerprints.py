@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+fingerprints.py
+───────────────
+Відбитки EN-тексту, з якого зроблено переклад, — щоб бачити застарілі
+переклади.
+
+merge_tsv.py лишає наявний переклад, навіть якщо EN під ним змінився
+повністю. Тому для кожного перекладеного рядка в `_fingerprints/` лежить
+sidecar-файл (`regions.loc.tsv` → `_fingerprints/regions.fp.tsv`):
+
+    key	en	ua
+    regions_onscreen_att_reg_aegyptus_alexandria	3f1c…	9a0b…
+
+• `en` — короткий sha1 EN-тексту, з якого перекладено рядок
+• `ua` — короткий sha1 самого перекладу
+
+Порівняння — лише хеші, без старої версії upstream:
+
+  • рядка ще немає в sidecar            → записуємо поточні відбитки
+  • переклад змінився (ua ≠ sidecar)    → перекладач його оновив, відбитки
+                                          оновлюються
+  • переклад той самий, а EN — ні       → рядок **stale** (застарілий);
+                                          відбиток EN не оновлюється, доки
+                                          переклад не виправлять або не
+                                          підтвердять командою ack
+
+Відбитки оновлюються етапом merge (merge_tsv.py) і командою `stale`.
+
+Використання:
+    python scripts/fingerprints.py stale                    # усі застарілі рядки
+    python scripts/fingerprints.py stale regions.loc.tsv --json stale.json
+    python scripts/fingerprints.py ack regions.loc.tsv KEY [KEY …]   # переклад актуальний
+    python scripts/fingerprints.py ack regions.loc.tsv --all
+"""
+
+import argparse, json, sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from l10n_tree import Tree, text_hash
+
+SRC_DIR = Path("_upstream/en/text/db")
+TRG_DIR = Path("translation/text/db")
+FP_DIR  = Path("_fingerprints")
+
+SKIP_TEXTS = {"", "PLACEHOLDER", "placeholder", "text_rejected"}
+
+
+def fp(text: str) -> str:
+    return text_hash(text.encode("utf-8"))[:12]
+
+
+def sidecar_path(name: str) -> Path:
+    return FP_DIR / name.replace(".loc.tsv", ".fp.tsv")
+
+
+def load_sidecar(tree: Tree, name: str) -> dict[str, tuple[str, str]]:
+    path = sidecar_path(name)
+    if not tree.exists(path):
+        return {}
+    df = tree.table(path)
+    return {k: (en, ua) for k, en, ua in zip(df["key"], df["en"], df["ua"])}
+
+
+def translated_rows(tree: Tree, name: str) -> Iterable[tuple[str, str, str]]:
+    """(key, EN, UA) для перекладених рядків файлу."""
+    src, trg = SRC_DIR / name, TRG_DIR / name
+    if not (tree.exists(src) and tree.exists(trg)):
+        return []
+    en_df = tree.table(src)
+    en_map = dict(zip(en_df["key"], en_df["text"]))
+    trg_df = tree.table(trg)
+    return [(key, en_map[key], ua) for key, ua in zip(trg_df["key"], trg_df["text"])
+            if key.strip() and key in en_map and ua not in SKIP_TEXTS
+            and en_map[key] not in SKIP_TEXTS and ua != en_map[key]]
+
+
+def update_file(tree: Tree, name: str, ack: Optional[set[str]] = None) -> list[str]:
+    """Оновлює sidecar файлу в дереві й повертає застарілі key.
+
+    ack — key, переклад яких підтверджено для поточного EN (None — жодного).
+    """
+    side = load_sidecar(tree, name)
+    rows, stale = [], []
+    for key, en, ua in translated_rows(tree, name):
+        en_fp, ua_fp = fp(en), fp(ua)
+        old = side.get(key)
+        if old and old[1] == ua_fp and old[0] != en_fp and not (ack and key in ack):
+            stale.append(key)
+            rows.append((key, old[0], ua_fp))
+        else:
+            rows.append((key, en_fp, ua_fp))
+
+    if {k: (e, u) for k, e, u in rows} != side:
+        path = sidecar_path(name)
+        if rows or tree.exists(path):
+            tree.put(path, pd.DataFrame(rows, columns=["key", "en", "ua"]))
+    return stale
+
+
+def stale_keys(tree: Tree, name: str) -> list[str]:
+    """Застарілі key файлу без оновлення sidecar (для звітів)."""
+    side = load_sidecar(tree, name)
+    return [key for key, en, ua in translated_rows(tree, name)
+            if key in side and side[key][1] == fp(ua) and side[key][0] != fp(en)]
+
+
+def update_tree(tree: Tree, names: Iterable[str] = ()) -> dict[str, list[str]]:
+    """file → застарілі key для вказаних (або всіх) файлів перекладу."""
+    names = list(names) or [p.name for p in tree.files(TRG_DIR)]
+    result = {}
+    for name in names:
+        stale = update_file(tree, name)
+        if stale:
+            result[name] = stale
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Застарілі переклади за відбитками EN-тексту.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("stale", help="оновити відбитки й показати застарілі рядки")
+    p.add_argument("files", nargs="*", help="лише ці *.loc.tsv (назви файлів)")
+    p.add_argument("--json", metavar="PATH", help="записати застарілі рядки в JSON")
+    p = sub.add_parser("ack", help="позначити переклад актуальним для поточного EN")
+    p.add_argument("file")
+    p.add_argument("keys", nargs="*")
+    p.add_argument("--all", action="store_true", help="усі застарілі рядки файлу")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    if args.cmd == "ack":
+        stale = set(stale_keys(tree, args.file))
+        keys = stale if args.all else set(args.keys) & stale
+        update_file(tree, args.file, ack=keys)
+        tree.flush()
+        print(f"✅ {args.file}: підтверджено {len(keys)} рядків.")
+        return 0
+
+    result = update_tree(tree, args.files)
+    tree.flush()
+    for name, keys in result.items():
+        en_df = tree.table(SRC_DIR / name)
+        en = dict(zip(en_df["key"], en_df["text"]))
+        for key in keys:
+            print(f"⚠️  {name}:{key}  EN: {en[key]}")
+    total = sum(len(k) for k in result.values())
+    print(f"\nЗастарілих перекладів: {total}" if total else "✅ Застарілих перекладів немає.")
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
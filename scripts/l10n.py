@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+l10n.py
+───────
+Єдина точка входу: запускає кілька інструментів як етапи одного конвеєра
+в одному процесі.
+
+• усі етапи працюють з одним спільним деревом (`l10n_tree.Tree`):
+  кожен *.loc.tsv розбирається один раз, словники key → text
+  будуються один раз і використовуються всіма таблицями patch_lua
+• на диск нічого не пишеться до кінця конвеєра — кожен змінений файл
+  записується рівно один раз (`Tree.flush()`), усі разом однією
+  транзакцією під блокуванням дерева (l10n_txn.py)
+• якщо етап повертає помилку (наприклад, validate), конвеєр зупиняється
+  і змінені в пам'яті файли НЕ записуються
+
+Етапи
+=====
+    sync-lua     sync_lua_files.py          _upstream/en → translation (*.lua)
+    lua-extract  lua_strings.py extract     рядки Lua → _lua/lua_strings.loc.tsv
+    lua-inject   lua_strings.py inject      _lua/lua_strings.loc.tsv → Lua
+    merge        merge_tsv.py               нові key з EN у переклад
+    merge-patch  merge_patch_translation.py готові переклади з _upstream/uk
+    patch-lua    patch_lua.py               усі таблиці з patch_lua.LUA_TABLES
+    lua-coverage lua_coverage.py            покриття цих таблиць перекладом TSV
+    validate     validate_tsv.py            перевірка translation/text/db
+    terms        check_terms.py             дотримання глосарію (glossary.tsv)
+    keys         check_keys.py              колізії key між файлами, key без upstream
+    length       check_length.py            переклади, довші за бюджет (length_budgets.tsv)
+    spell        spellcheck.py              орфографія колонки text (словник _dict/uk.txt)
+    report       translation_report.py      статистика перекладу
+    deploy       sync_translation.py        копія translation/ у DST з .env
+
+Використання
+============
+    # повне оновлення після нового upstream
+    python scripts/l10n.py update
+
+    # довільний набір етапів (у вказаному порядку)
+    python scripts/l10n.py run merge validate report
+
+    # показати, які файли будуть записані, нічого не змінюючи
+    python scripts/l10n.py update --dry-run
+"""
+
+import argparse, os, sys
+from pathlib import Path
+from typing import Callable
+
+import check_keys
+import check_length
+import check_terms
+import lua_coverage
+import lua_strings
+import merge_patch_translation
+import merge_tsv
+import patch_lua
+import spellcheck
+import sync_lua_files
+import sync_translation
+import translation_report
+import validate_tsv
+from l10n_tree import ConflictError, Tree
+from l10n_txn import LockTimeout
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# ── етапи ────────────────────────────────────────────────────────────
+# кожен етап отримує спільне дерево й повертає код виходу (0 — успіх)
+
+def stage_sync_lua(tree: Tree) -> int:
+    # копії лише в дереві: поточні переклади Lua на диску лишаються до flush()
+    sync_lua_files.sync_lua_tree(tree, Path("_upstream/en"), Path("translation"))
+    return 0
+
+def stage_lua_extract(tree: Tree) -> int:
+    lua_strings.extract(tree)
+    return 0
+
+def stage_lua_inject(tree: Tree) -> int:
+    lua_strings.inject(tree)
+    return 0
+
+def stage_merge(tree: Tree) -> int:
+    merge_tsv.merge_tree(tree)
+    return 0
+
+def stage_merge_patch(tree: Tree) -> int:
+    merge_patch_translation.merge_patches(tree)
+    return 0
+
+def stage_patch_lua(tree: Tree) -> int:
+    missing = patch_lua.missing_paths(tree)
+    if missing:
+        print("⛔  Вказані шляхи не існують: " + ", ".join(p.as_posix() for p in missing))
+        return 1
+    for table, prefix in patch_lua.LUA_TABLES:
+        patch_lua.patch_table(tree, table, prefix)
+    return 0
+
+def stage_lua_coverage(tree: Tree) -> int:
+    lua_coverage.print_coverage(lua_coverage.analyze(tree))
+    return 0
+
+def stage_validate(tree: Tree) -> int:
+    return validate_tsv.validate(tree)
+
+def stage_terms(tree: Tree) -> int:
+    if not check_terms.GLOSSARY.exists():
+        print(f"–  {check_terms.GLOSSARY} не знайдено, пропуск.")
+        return 0
+    result = check_terms.check_tree(tree, check_terms.Glossary())
+    check_terms.print_violations(result)
+    return 1 if result else 0
+
+def stage_keys(tree: Tree) -> int:
+    return check_keys.check_tree(tree)
+
+def stage_length(tree: Tree) -> int:
+    result = check_length.check_tree(tree, check_length.Budgets())
+    check_length.print_violations(result)
+    return 1 if result else 0
+
+def stage_spell(tree: Tree) -> int:
+    if not spellcheck.WORDLIST.exists():
+        print(f"–  {spellcheck.WORDLIST} не знайдено, пропуск.")
+        return 0
+    result = spellcheck.check_tree(tree)
+    spellcheck.print_errors(result)
+    return 1 if result else 0
+
+def stage_report(tree: Tree) -> int:
+    translation_report.print_report(translation_report.collect(tree))
+    return 0
+
+def stage_deploy(tree: Tree) -> int:
+    dst = sync_translation.load_dst()
+    if not dst:
+        print("[ERROR] 'DST' not set in .env file.")
+        return 1
+    return sync_translation.sync(dst)
+
+# name → (функція, чи потрібні етапу файли вже на диску)
+STAGES: dict[str, tuple[Callable[[Tree], int], bool]] = {
+    "sync-lua":     (stage_sync_lua,      False),
+    "lua-extract":  (stage_lua_extract,   False),
+    "lua-inject":   (stage_lua_inject,    False),
+    "merge":        (stage_merge,         False),
+    "merge-patch":  (stage_merge_patch,   False),
+    "patch-lua":    (stage_patch_lua,     False),
+    "lua-coverage": (stage_lua_coverage,  False),
+    "validate":     (stage_validate,      False),
+    "terms":        (stage_terms,         False),
+    "keys":         (stage_keys,          False),
+    "length":       (stage_length,        False),
+    "spell":        (stage_spell,         False),
+    "report":       (stage_report,        False),
+    "deploy":       (stage_deploy,        True),
+}
+
+PIPELINES = {
+    # lua-extract до sync-lua зберігає поточні переклади Lua, після — додає нові рядки upstream
+    "update": [
+        "lua-extract", "sync-lua", "lua-extract", "lua-inject",
+        "merge", "merge-patch", "patch-lua", "validate", "report", "deploy",
+    ],
+}
+
+def run_pipeline(stages: list[str], tree: Tree, dry_run: bool = False) -> int:
+    for name in stages:
+        func, needs_disk = STAGES[name]
+        if needs_disk:
+            if dry_run:
+                print(f"\n— {name}: пропущено (--dry-run)")
+                continue
+            tree.flush()
+        print(f"\n══ {name} ══")
+        code = func(tree)
+        if code:
+            print(f"\n⛔  Етап {name} завершився з кодом {code}; файли не записано.")
+            return code
+
+    if dry_run:
+        pending = tree.pending()
+        for p in pending:
+            print(f"~ {p}")
+        print(f"\n(dry-run) буде записано файлів: {len(pending)}")
+    else:
+        written = tree.flush()
+        print(f"\nЗаписано файлів: {len(written)}")
+    return 0
+
+def main(argv: list[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Конвеєр інструментів локалізації в одному процесі.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    for name, stages in PIPELINES.items():
+        p = sub.add_parser(name, help=" → ".join(stages))
+        p.add_argument("--dry-run", action="store_true", help="нічого не записувати")
+
+    p = sub.add_parser("run", help="виконати вказані етапи")
+    p.add_argument("stages", nargs="+", choices=list(STAGES))
+    p.add_argument("--dry-run", action="store_true", help="нічого не записувати")
+
+    args = ap.parse_args(argv)
+
+    # усі інструменти працюють з відносними шляхами від кореня репозиторію
+    os.chdir(PROJECT_ROOT)
+
+    stages = args.stages if args.cmd == "run" else PIPELINES[args.cmd]
+    try:
+        return run_pipeline(stages, Tree(), args.dry_run)
+    except (ConflictError, LockTimeout) as e:
+        print(f"\n⛔  {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
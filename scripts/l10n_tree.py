@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+l10n_tree.py
+────────────
+Спільне «дерево» розібраних файлів для скриптів і конвеєра `l10n.py`.
+
+• кожен *.loc.tsv читається один раз (ліниво) і далі живе в пам'яті
+  як DataFrame; те саме для Lua-файлів (як текст)
+• словники key → text для цілих каталогів (їх потребує patch_lua.py)
+  будуються один раз і діляться між етапами
+• етапи не пишуть на диск самі — вони кладуть змінені таблиці через
+  `put()` / `put_text()`, а `flush()` записує кожен файл рівно один раз
+  і лише тоді, коли його байти справді відрізняються від файлу на диску
+  (без зайвих перезаписів і зміни mtime)
+• схема таблиці типізована: key і text — рядки, tooltip — bool
+  (див. `load_tsv()`)
+• точкові зміни тексту (`edit_rows()`) пишуться через `patch_rows()`:
+  оригінальний файл читається потоком, переписуються лише відредаговані
+  рядки, а кінці рядків і решта байтів лишаються як були
+• `flush()` записує всі змінені файли однією транзакцією під блокуванням
+  дерева (див. l10n_txn.py): або всі, або жоден. Якщо файл, прочитаний
+  деревом, тим часом змінив інший процес чи редактор, запис не
+  відбувається (ConflictError) — чужі зміни не затираються
+
+Окремо скрипти теж працюють через Tree: створюють його, виконують свою
+логіку й викликають `flush()` наприкінці.
+"""
+
+import csv, hashlib, json, os, tempfile
+from pathlib import Path
+from typing import Mapping, Optional
+import pandas as pd
+
+from l10n_txn import Transaction, file_mode, write_files
+
+# службові кеші інструментів (не комітяться)
+CACHE_DIR = Path("_temp/cache")
+
+# однакові параметри читання/запису для всіх інструментів;
+# битий UTF-8 — помилка, а не мовчки викинуті байти (див. check_encoding.py)
+READ_KW = dict(
+    sep="\t", dtype=str, keep_default_na=False, na_filter=False,
+    quoting=csv.QUOTE_NONE, encoding_errors="strict",
+)
+WRITE_KW = dict(sep="\t", index=False, quoting=csv.QUOTE_NONE, lineterminator="\n")
+
+# tooltip у *.loc.tsv — прапорець "true"/"false" ("" у службовому рядку #Loc;).
+# У пам'яті це nullable bool (BooleanArray: масив значень + маска NA, по
+# байту на рядок) замість Python-рядка на кожен рядок.
+TOOLTIP_VALUES = {"true": True, "false": False, "": pd.NA}
+
+
+def parse_tooltip(col: pd.Series) -> pd.Series:
+    """Рядкова колонка tooltip → bool; інші значення лишаються рядками як є."""
+    if not col.isin(TOOLTIP_VALUES.keys()).all():
+        return col
+    return col.map(TOOLTIP_VALUES).astype("boolean")
+
+
+def format_tooltip(col: pd.Series) -> pd.Series:
+    """bool-колонка tooltip → "true"/"false"/"" (рядкову повертає без змін)."""
+    if col.dtype != "boolean":
+        return col
+    return col.astype(object).map({True: "true", False: "false"}).fillna("")
+
+
+class EncodingError(ValueError):
+    """Файл не є валідним UTF-8, а читання з втратами не дозволено."""
+
+
+class ConflictError(RuntimeError):
+    """Файл змінено на диску після того, як його прочитало дерево."""
+
+
+def load_tsv(p: Path, lossy: bool = False) -> pd.DataFrame:
+    """Читаємо TSV, нічого не перетворюємо на NaN; tooltip — bool, якщо можна.
+
+    lossy=True — старе читання з `encoding_errors="ignore"` (биті байти
+    викидаються); без нього битий UTF-8 дає EncodingError.
+    """
+    try:
+        df = pd.read_csv(p, **dict(READ_KW, encoding_errors="ignore" if lossy else "strict"))
+    except UnicodeDecodeError as e:
+        raise EncodingError(f"{p}: невалідний UTF-8 ({e.reason}) — "
+                            f"перевірте python scripts/check_encoding.py {p}") from None
+    if "tooltip" in df.columns:
+        df["tooltip"] = parse_tooltip(df["tooltip"])
+    return df
+
+
+def serialize_tsv(df: pd.DataFrame) -> bytes:
+    if "tooltip" in df.columns and df["tooltip"].dtype == "boolean":
+        df = df.assign(tooltip=format_tooltip(df["tooltip"]))
+    return df.to_csv(**WRITE_KW).encode("utf-8")
+
+
+def atomic_write(p: Path, data: bytes) -> None:
+    """Пише через тимчасовий файл у тому ж каталозі + os.replace."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=f".{p.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, file_mode(p))
+        os.replace(tmp, p)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_if_changed(p: Path, data: bytes) -> bool:
+    """Пише файл лише тоді, коли вміст відрізняється; повертає True, якщо записано."""
+    if p.exists() and p.read_bytes() == data:
+        return False
+    atomic_write(p, data)
+    return True
+
+
+def patch_rows(p: Path, edits: Mapping[str, str], dst: Optional[Path] = None,
+               dry_run: bool = False, expected: Optional[Mapping[str, str]] = None) -> int:
+    """Замінює колонку text у рядках з key із `edits`, не чіпаючи решту байтів.
+
+    Файл читається потоком; незмінені рядки копіюються як є (з тими самими
+    кінцями рядків і хвостом файлу). Результат пишеться в `dst` (за
+    замовчуванням — у той самий файл) атомарно і лише якщо щось змінилося.
+    Повертає кількість змінених рядків.
+
+    expected — key → text, на основі якого зроблено зміну; якщо рядок на
+    диску тепер інший (і не дорівнює новому тексту), — ConflictError.
+    """
+    dst = Path(dst or p)
+    encoded = {k.encode("utf-8"): v.encode("utf-8") for k, v in edits.items()}
+    before = {k.encode("utf-8"): v.encode("utf-8") for k, v in (expected or {}).items()}
+    changed = 0
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp")
+    try:
+        with open(p, "rb") as src, os.fdopen(fd, "wb") as out:
+            out.write(src.readline())                       # заголовок
+            for line in src:
+                body = line.rstrip(b"\r\n")
+                key, tab, rest = body.partition(b"\t")
+                new = encoded.get(key)
+                if new is not None and tab:
+                    fields = rest.split(b"\t")
+                    if key in before and fields[0] not in (before[key], new):
+                        raise ConflictError(f"{p}: рядок {key.decode('utf-8', 'replace')} змінено "
+                                            f"іншим процесом після читання — нічого не записано, "
+                                            f"запустіть інструмент ще раз")
+                    if fields[0] != new:
+                        fields[0] = new
+                        line = key + b"\t" + b"\t".join(fields) + line[len(body):]
+                        changed += 1
+                out.write(line)
+        # у інший файл пишемо завжди (навіть копію без змін)
+        if not dry_run and (changed or dst != Path(p)):
+            os.chmod(tmp, file_mode(p))
+            os.replace(tmp, dst)
+        else:
+            os.unlink(tmp)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return changed
+
+
+def dump_tsv(df: pd.DataFrame, p: Path) -> bool:
+    return bool(write_files({p: serialize_tsv(df)}))
+
+
+def file_signature(p: Path) -> str:
+    """Дешевий відбиток файлу (розмір + mtime) для інкрементальних кешів."""
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return "-"
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def text_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class FileCache:
+    """JSON-кеш результатів по файлах у CACHE_DIR.
+
+    Запис інвалідується, щойно змінюється відбиток будь-якого з файлів,
+    від яких він залежить, або `salt` (наприклад, хеш глосарію/налаштувань).
+    """
+
+    def __init__(self, name: str, salt: str = "") -> None:
+        self.path = CACHE_DIR / f"{name}.json"
+        self.salt = salt
+        self.entries: dict = {}
+        self.changed = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("salt") == salt:
+                    self.entries = data["entries"]
+            except (ValueError, KeyError):
+                pass
+
+    @staticmethod
+    def _sig(paths: tuple) -> str:
+        return "|".join(file_signature(Path(p)) for p in paths)
+
+    def get(self, key: str, *paths: Path):
+        entry = self.entries.get(key)
+        if entry and entry["sig"] == self._sig(paths):
+            return entry["value"]
+        return None
+
+    def put(self, key: str, value, *paths: Path) -> None:
+        self.entries[key] = {"sig": self._sig(paths), "value": value}
+        self.changed = True
+
+    def save(self) -> None:
+        if self.changed:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"salt": self.salt, "entries": self.entries},
+                                            ensure_ascii=False), encoding="utf-8")
+            self.changed = False
+
+
+class Tree:
+    """Кеш таблиць/текстів з відкладеним записом."""
+
+    def __init__(self, lossy: bool = False) -> None:
+        self.lossy = lossy                  # див. load_tsv()
+        self._tables: dict[Path, pd.DataFrame] = {}
+        self._texts: dict[Path, str] = {}
+        self._lookups: dict[Path, dict[str, str]] = {}
+        self._edits: dict[Path, dict[str, str]] = {}
+        self._bases: dict[Path, dict[str, str]] = {}    # text рядків до edit_rows
+        self._dirty: set[Path] = set()
+        self._sigs: dict[Path, str] = {}    # відбиток файлу на момент читання
+
+    # ── читання ──────────────────────────────────────────────────────
+    def files(self, directory: Path) -> list[Path]:
+        """Усі *.loc.tsv каталогу, разом зі створеними в дереві, але ще не записаними."""
+        directory = Path(directory)
+        pending = {p for p in self._dirty if p.parent == directory and p.name.endswith(".loc.tsv")}
+        return sorted(set(directory.glob("*.loc.tsv")) | pending)
+
+    def table(self, path: Path) -> pd.DataFrame:
+        path = Path(path)
+        if path not in self._tables:
+            self._sigs.setdefault(path, file_signature(path))
+            self._tables[path] = load_tsv(path, self.lossy)
+        return self._tables[path]
+
+    def text(self, path: Path) -> str:
+        path = Path(path)
+        if path not in self._texts:
+            # без перетворення кінців рядків — щоб запис був байт-у-байт
+            self._sigs.setdefault(path, file_signature(path))
+            self._texts[path] = path.read_bytes().decode("utf-8")
+        return self._texts[path]
+
+    def lookup(self, directory: Path) -> dict[str, str]:
+        """key → text по всіх *.loc.tsv каталогу (пізніші файли перекривають)."""
+        directory = Path(directory)
+        if directory not in self._lookups:
+            d: dict[str, str] = {}
+            for f in self.files(directory):
+                df = self.table(f)
+                d.update(zip(df["key"], df["text"]))
+            self._lookups[directory] = d
+        return self._lookups[directory]
+
+    def lookup_keys(self, directory: Path, keys) -> dict[str, str]:
+        """Як lookup(), але лише для потрібних ключів.
+
+        Файли, яких ще немає в дереві, не розбираються цілком — рядки
+        читаються через індекс зміщень (tsv_index.KeyIndex).
+        """
+        from tsv_index import KeyIndex
+
+        directory = Path(directory)
+        if directory in self._lookups:
+            full = self._lookups[directory]
+            return {k: full[k] for k in keys if k in full}
+        keys = set(keys)
+        found: dict[str, str] = {}
+        for f in self.files(directory):
+            if f in self._tables:
+                df = self._tables[f]
+                mask = df["key"].isin(keys)
+                found.update(zip(df.loc[mask, "key"], df.loc[mask, "text"]))
+            else:
+                found.update(KeyIndex(f).texts(keys))
+        return found
+
+    def keys(self, directory: Path) -> list[str]:
+        """Усі key каталогу; незавантажені файли — з індексу зміщень."""
+        from tsv_index import KeyIndex
+
+        keys: list[str] = []
+        for f in self.files(directory):
+            if f in self._tables:
+                keys.extend(self._tables[f]["key"])
+            else:
+                keys.extend(KeyIndex(f).offsets)
+        return keys
+
+    def exists(self, path: Path) -> bool:
+        path = Path(path)
+        return path in self._tables or path in self._texts or path.exists()
+
+    # ── запис ────────────────────────────────────────────────────────
+    def put(self, path: Path, df: pd.DataFrame) -> None:
+        """Повна заміна таблиці (нові/видалені key, інший порядок)."""
+        path = Path(path)
+        self._tables[path] = df
+        self._edits.pop(path, None)
+        self._bases.pop(path, None)
+        self._lookups.pop(path.parent, None)
+        self._dirty.add(path)
+
+    def edit_rows(self, path: Path, edits: Mapping[str, str]) -> None:
+        """Точкові зміни колонки text; на диску перепишуться лише ці рядки."""
+        path = Path(path)
+        if not edits:
+            return
+        if path in self._tables:
+            df = self._tables[path]
+            mask = df["key"].isin(edits.keys())
+            base = self._bases.setdefault(path, {})
+            for key, text in zip(df.loc[mask, "key"], df.loc[mask, "text"]):
+                base.setdefault(key, text)
+            df.loc[mask, "text"] = df.loc[mask, "key"].map(edits)
+        self._lookups.pop(path.parent, None)
+        if path in self._dirty and path not in self._edits:
+            return          # таблицю вже замінено цілком — її й запишемо
+        self._edits.setdefault(path, {}).update(edits)
+        self._dirty.add(path)
+
+    def put_text(self, path: Path, text: str) -> None:
+        path = Path(path)
+        self._texts[path] = text
+        self._dirty.add(path)
+
+    def forget(self, path: Optional[Path] = None) -> None:
+        """Скидає кеш (наприклад, після того як файли змінено поза деревом).
+
+        Без аргументу скидає все, крім ще не записаних змін.
+        """
+        if path is None:
+            for cache in (self._tables, self._texts):
+                for p in [p for p in cache if p not in self._dirty]:
+                    del cache[p]
+                    self._sigs.pop(p, None)
+            self._lookups.clear()
+            return
+        path = Path(path)
+        self._tables.pop(path, None)
+        self._texts.pop(path, None)
+        self._sigs.pop(path, None)
+        self._lookups.pop(path.parent, None)
+
+    @property
+    def dirty(self) -> list[Path]:
+        return sorted(self._dirty)
+
+    def _serialize(self, path: Path) -> bytes:
+        if path in self._tables:
+            return serialize_tsv(self._tables[path])
+        return self._texts[path].encode("utf-8")
+
+    def _write(self, path: Path, txn: Optional[Transaction] = None) -> bool:
+        """Готує запис файлу в транзакції (без txn — лише перевіряє, чи він потрібен)."""
+        if path in self._edits:
+            # точкові зміни накладаються на поточний вміст диска; конфлікт — лише
+            # якщо сам змінюваний рядок змінився після читання
+            if txn is None:
+                return patch_rows(path, self._edits[path], dry_run=True) > 0
+            if patch_rows(path, self._edits[path], dst=txn.stage_path(path),
+                          expected=self._bases.get(path)):
+                return True
+            txn.discard(path)
+            return False
+        data = self._serialize(path)
+        if path.exists() and path.read_bytes() == data:
+            return False
+        if txn is not None:
+            if path in self._sigs and file_signature(path) != self._sigs[path]:
+                raise ConflictError(f"{path}: файл змінено іншим процесом після читання — "
+                                    f"нічого не записано, запустіть інструмент ще раз")
+            txn.stage(path, data)
+        return True
+
+    def pending(self) -> list[Path]:
+        """Файли, які `flush()` справді перезапише (вміст відрізняється від диска)."""
+        return [p for p in self.dirty if self._write(p)]
+
+    def flush(self) -> list[Path]:
+        """Записує змінені файли однією транзакцією і повертає список записаних.
+
+        Якщо жоден файл не відрізняється від диска, транзакція (а з нею
+        блокування `_temp/l10n.lock` і відновлення журналу) не відкривається.
+        """
+        written = []
+        if self.pending():
+            with Transaction() as txn:
+                written = [p for p in self.dirty if self._write(p, txn)]
+        for p in self._dirty:
+            self._sigs[p] = file_signature(p)
+        self._dirty.clear()
+        self._edits.clear()
+        self._bases.clear()
+        return written
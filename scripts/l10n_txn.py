@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+l10n_txn.py
+───────────
+Транзакційний запис кількох файлів дерева перекладу.
+
+Раніше кожен інструмент писав файли по одному: Ctrl-C або падіння
+посередині лишали дерево напівзлитим, а два інструменти одночасно (або
+інструмент і збереження в редакторі) могли затерти зміни один одного.
+
+Тепер усі записи (`Tree.flush()`, `write_files()`) ідуть так:
+
+  1. береться advisory-блокування дерева `_temp/l10n.lock` (інший процес
+     чекає, доки його звільнять; у межах одного процесу — реентерабельне)
+  2. незавершені транзакції процесів, що впали, відновлюються за журналом
+  3. новий вміст кожного файлу пишеться в тимчасовий файл поруч із ним
+     (`.<name>.<txn>.tmp` — той самий диск, тож перейменування атомарне),
+     кожен крок записується в журнал `_temp/txn/<txn>.journal`
+  4. тимчасові файли й журнал скидаються на диск (fsync), у журнал
+     пишеться позначка commit
+  5. файли атомарно перейменовуються на місце, журнал видаляється
+
+Якщо процес упав до позначки commit — тимчасові файли видаляються й
+дерево лишається як було; після неї — перейменування доводяться до кінця.
+Тобто після відновлення видно або всі файли транзакції, або жодного.
+
+Використання як модуля:
+    with Transaction() as txn:
+        txn.stage(Path("translation/text/db/names.loc.tsv"), data)
+        txn.delete(Path("translation/text/db/old.loc.tsv"))
+    # вихід без винятку — commit, з винятком — rollback
+
+    write_files({path: data, …})      # лише файли, вміст яких змінився
+"""
+
+import json, os, stat, time
+from pathlib import Path
+from typing import Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:                  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_PATH    = Path("_temp/l10n.lock")
+JOURNAL_DIR  = Path("_temp/txn")
+LOCK_TIMEOUT = 300.0                 # секунд очікування чужого блокування
+
+
+class LockTimeout(RuntimeError):
+    """Дерево надто довго заблоковане іншим процесом."""
+
+# ── блокування ───────────────────────────────────────────────────────
+_held = 0                            # глибина блокування в цьому процесі
+_lock_file = None
+_live: set[Path] = set()             # журнали незавершених транзакцій цього процесу
+
+
+def _try_lock(f) -> bool:
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f) -> None:
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TreeLock:
+    """Ексклюзивне advisory-блокування дерева між процесами."""
+
+    def __init__(self, timeout: float = LOCK_TIMEOUT) -> None:
+        self.timeout = timeout
+
+    def __enter__(self) -> "TreeLock":
+        global _held, _lock_file
+        if _held:
+            _held += 1
+            return self
+        LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        f = open(LOCK_PATH, "a+b")
+        deadline = time.monotonic() + self.timeout
+        waiting = False
+        while not _try_lock(f):
+            if time.monotonic() > deadline:
+                f.close()
+                raise LockTimeout(f"{LOCK_PATH}: дерево заблоковане іншим процесом понад {self.timeout:.0f} с")
+            if not waiting:
+                print(f"⏳ Дерево перекладу зайняте іншим інструментом — чекаю ({LOCK_PATH})…")
+                waiting = True
+            time.sleep(0.1)
+        _held, _lock_file = 1, f
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _held, _lock_file
+        _held -= 1
+        if not _held:
+            _unlock(_lock_file)
+            _lock_file.close()
+            _lock_file = None
+
+# ── права файлів ─────────────────────────────────────────────────────
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+UMASK = _read_umask()
+
+
+def file_mode(path: Path) -> int:
+    """Права для нового вмісту `path`: як у наявного файлу, для нового — за umask.
+
+    Тимчасові файли (mkstemp) створюються з 0600, і os.replace переносив би
+    ці права на файл дерева.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+# ── журнал ───────────────────────────────────────────────────────────
+def _fsync(path: Path) -> None:
+    with open(path, "r+b") as f:
+        os.fsync(f.fileno())
+
+
+def _read_journal(path: Path) -> list[dict]:
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:           # обірваний останній рядок
+            break
+    return entries
+
+
+def recover() -> list[Path]:
+    """Доводить до кінця або відкочує транзакції процесів, що впали.
+
+    Викликати лише під TreeLock. Повертає відновлені (записані) файли.
+    """
+    restored = []
+    for journal in sorted(JOURNAL_DIR.glob("*.journal")):
+        if journal in _live:
+            continue
+        entries = _read_journal(journal)
+        committed = any(e["op"] == "commit" for e in entries)
+        for e in entries:
+            if e["op"] == "stage":
+                tmp = Path(e["tmp"])
+                if not tmp.exists():
+                    continue
+                if committed:
+                    os.replace(tmp, e["dst"])
+                    restored.append(Path(e["dst"]))
+                else:
+                    tmp.unlink()
+            elif e["op"] == "delete" and committed:
+                Path(e["dst"]).unlink(missing_ok=True)
+        journal.unlink()
+        print(f"♻️  {journal.name}: незавершену транзакцію "
+              + ("доведено до кінця" if committed else "відкочено"))
+    return restored
+
+# ── транзакція ───────────────────────────────────────────────────────
+class Transaction:
+    """Запис кількох файлів «все або нічого» під блокуванням дерева."""
+
+    def __init__(self, timeout: float = LOCK_TIMEOUT) -> None:
+        self.lock = TreeLock(timeout)
+        self.id = f"{os.getpid()}-{time.time_ns()}"
+        self.staged: dict[Path, Path] = {}          # ціль → тимчасовий файл
+        self.deleted: list[Path] = []
+        self.journal_path = JOURNAL_DIR / f"{self.id}.journal"
+        self.journal = None
+        self.done = False
+
+    def __enter__(self) -> "Transaction":
+        self.lock.__enter__()
+        try:
+            recover()
+            JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+            self.journal = open(self.journal_path, "w", encoding="utf-8")
+            _live.add(self.journal_path)
+        except BaseException:
+            self.lock.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        try:
+            if not self.done:
+                self.rollback() if exc_type else self.commit()
+        finally:
+            self.lock.__exit__(None, None, None)
+
+    def _log(self, **entry) -> None:
+        self.journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.journal.flush()
+
+    def stage_path(self, dst: Path) -> Path:
+        """Тимчасовий шлях, куди треба записати новий вміст `dst`."""
+        dst = Path(dst).resolve()
+        if dst in self.staged:
+            return self.staged[dst]
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.parent / f".{dst.name}.{self.id}.tmp"
+        self._log(op="stage", tmp=str(tmp), dst=str(dst))
+        self.staged[dst] = tmp
+        return tmp
+
+    def stage(self, dst: Path, data: bytes) -> None:
+        self.stage_path(dst).write_bytes(data)
+
+    def discard(self, dst: Path) -> None:
+        """Скасовує вже підготовлений запис `dst` (наприклад, змін не виявилося)."""
+        tmp = self.staged.pop(Path(dst).resolve(), None)
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+
+    def delete(self, dst: Path) -> None:
+        dst = Path(dst).resolve()
+        self._log(op="delete", dst=str(dst))
+        self.deleted.append(dst)
+
+    def commit(self) -> list[Path]:
+        for dst, tmp in self.staged.items():
+            os.chmod(tmp, file_mode(dst))
+            _fsync(tmp)
+        self._log(op="commit")
+        os.fsync(self.journal.fileno())
+        for dst, tmp in self.staged.items():
+            os.replace(tmp, dst)
+        for dst in self.deleted:
+            dst.unlink(missing_ok=True)
+        self._close()
+        return list(self.staged)
+
+    def rollback(self) -> None:
+        for tmp in self.staged.values():
+            tmp.unlink(missing_ok=True)
+        self._close()
+
+    def _close(self) -> None:
+        self.journal.close()
+        self.journal_path.unlink()
+        _live.discard(self.journal_path)
+        self.done = True
+
+
+def write_files(files: Mapping[Path, bytes], timeout: Optional[float] = None) -> list[Path]:
+    """Записує однією транзакцією файли, вміст яких змінився; повертає їх."""
+    if not files:
+        return []
+    written = []
+    with Transaction(LOCK_TIMEOUT if timeout is None else timeout) as txn:
+        for path, data in files.items():
+            path = Path(path)
+            if path.exists() and path.read_bytes() == data:
+                continue
+            txn.stage(path, data)
+            written.append(path)
+    return written
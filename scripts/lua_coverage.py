@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+lua_coverage.py
+───────────────
+Покриття таблиць `mk1212_localisation_lists.lua` перекладом із TSV —
+замість того, щоб запускати patch_lua.py для кожної таблиці й
+читати лічильники.
+
+Lua-файл розбирається один раз (усі таблиці верхнього рівня за один
+прохід), ключі всіх таблиць з `patch_lua.LUA_TABLES` шукаються в TSV
+одним запитом на каталог через індекс зміщень (`Tree.lookup_keys`).
+Каталоги ті самі, що й у patch_lua.py.
+
+Для кожного рядка таблиці (`key = "Text"` / `["key"] = "Text"`):
+
+  ok            текст у Lua = переклад з TSV
+  mismatched    переклад є, але в Lua інший текст (patch-lua ще не
+                запускали або рядок у Lua правили вручну)
+  untranslated  key є в TSV, але текст порожній або збігається з EN/RU —
+                patch_lua.py такий рядок пропускає
+  missing       key немає в жодному TSV
+
+Окремо — «unused»: перекладені key з простору імен таблиці (префікс
+`prefix_`, для таблиць без префікса — спільний початок їхніх ключів),
+яких немає в Lua, тобто переклад, що ніколи не потрапить у гру.
+
+Використання:
+    python scripts/lua_coverage.py            # зведення по таблицях
+    python scripts/lua_coverage.py -v         # + список проблемних рядків
+    python scripts/lua_coverage.py NAMES_TO_LOCALISATION -v
+"""
+
+import argparse, os, re, sys
+from typing import NamedTuple, Optional
+
+from l10n_tree import Tree
+from patch_lua import DIR_DB, DIR_UP1, DIR_UP2, LUA_TABLES, PATH_LUA, ROW_RE
+
+# усі таблиці верхнього рівня: NAME = { … } (закриваюча дужка з початку рядка)
+TABLES_RE = re.compile(
+    r'^[ \t]*(?P<name>[A-Za-z_]\w*)\s*=\s*\{(?P<body>.*?)^[ \t]*\}',
+    re.S | re.M
+)
+
+STATUSES = ("ok", "mismatched", "untranslated", "missing")
+
+
+class Entry(NamedTuple):
+    line: int        # рядок у Lua-файлі
+    key: str         # повний TSV-ключ
+    lua: str         # текст у Lua
+    tsv: str         # текст у TSV ("" — якщо key немає)
+    status: str
+
+
+class Coverage(NamedTuple):
+    table: str
+    prefix: str
+    entries: list[Entry]
+    unused: list[str]        # перекладені key простору імен, яких немає в Lua
+
+    def count(self, status: str) -> int:
+        return sum(e.status == status for e in self.entries)
+
+
+def parse_tables(src: str) -> dict[str, list[tuple[int, str, str]]]:
+    """table → [(рядок, lua-key, текст)] для всіх таблиць файлу."""
+    tables = {}
+    for t in TABLES_RE.finditer(src):
+        base = t.start("body")
+        line = src.count("\n", 0, base) + 1
+        pos = base
+        rows = []
+        for r in ROW_RE.finditer(t["body"]):
+            line += t["body"].count("\n", pos - base, r.start())
+            pos = base + r.start()
+            rows.append((line, r["kq"] or r["kp"], r["txt"]))
+        tables[t["name"]] = rows
+    return tables
+
+
+def namespace(prefix: str, keys: list[str]) -> str:
+    """Префікс TSV-ключів таблиці: `prefix_` або спільний початок ключів до «_»."""
+    if prefix:
+        return f"{prefix}_"
+    common = os.path.commonprefix(keys)
+    return common[:common.rfind("_") + 1]
+
+
+def analyze(tree: Tree, tables: list[tuple[str, str]] = LUA_TABLES) -> list[Coverage]:
+    if not (tree.exists(PATH_LUA) and DIR_DB.exists() and DIR_UP2.exists()):
+        print("⛔  Вказані шляхи не існують.")
+        return []
+
+    parsed = parse_tables(tree.text(PATH_LUA))
+    full = {}
+    for table, prefix in tables:
+        if table not in parsed:
+            print(f"–  {PATH_LUA.name}: таблицю {table} не знайдено.")
+            continue
+        full[table] = [(line, f"{prefix}_{k}" if prefix else k, text)
+                       for line, k, text in parsed[table]]
+
+    # один прохід по кожному каталогу для ключів усіх таблиць
+    spaces = {t: namespace(p, [k for _, k, _ in full[t]]) for t, p in tables if t in full}
+    extra = [k for k in tree.keys(DIR_DB) if any(ns and k.startswith(ns) for ns in spaces.values())]
+    wanted = {k for rows in full.values() for _, k, _ in rows} | set(extra)
+    tr  = tree.lookup_keys(DIR_DB, wanted)
+    up2 = tree.lookup_keys(DIR_UP2, wanted)
+    up1 = tree.lookup_keys(DIR_UP1, wanted)
+
+    def translated(key: str) -> bool:
+        text = tr.get(key, "")
+        return bool(text) and text != up2.get(key, "") and text != up1.get(key)
+
+    result = []
+    for table, prefix in tables:
+        if table not in full:
+            continue
+        entries = []
+        for line, key, lua in full[table]:
+            if key not in tr:
+                status = "missing"
+            elif not translated(key):
+                status = "untranslated"
+            elif tr[key] != lua:
+                status = "mismatched"
+            else:
+                status = "ok"
+            entries.append(Entry(line, key, lua, tr.get(key, ""), status))
+        in_lua = {e.key for e in entries}
+        ns = spaces[table]
+        unused = sorted(k for k in extra if ns and k.startswith(ns) and k not in in_lua and translated(k))
+        result.append(Coverage(table, prefix, entries, unused))
+    return result
+
+
+def print_coverage(result: list[Coverage], verbose: bool = False) -> None:
+    if not result:
+        return
+    print(f"{'Таблиця':<30} {'рядків':>7} {'ok':>7} {'mismatch':>9} {'untransl':>9} "
+          f"{'missing':>8} {'unused':>7} {'покриття':>9}")
+    for cov in result:
+        total = len(cov.entries)
+        ok = cov.count("ok")
+        pct = ok / total * 100 if total else 100.0
+        print(f"{cov.table:<30} {total:>7} {ok:>7} {cov.count('mismatched'):>9} "
+              f"{cov.count('untranslated'):>9} {cov.count('missing'):>8} {len(cov.unused):>7} {pct:>8.1f}%")
+
+    if not verbose:
+        return
+    for cov in result:
+        for e in cov.entries:
+            if e.status == "mismatched":
+                print(f"~ {cov.table}:{e.line} {e.key}: Lua «{e.lua}» ≠ TSV «{e.tsv}»")
+            elif e.status != "ok":
+                print(f"✗ {cov.table}:{e.line} {e.key}: {e.status}")
+        for key in cov.unused:
+            print(f"⚠️  {cov.table}: {key} перекладено, але в Lua немає")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Покриття Lua-таблиць перекладом із TSV.")
+    ap.add_argument("tables", nargs="*", help="лише ці таблиці (за замовчуванням — LUA_TABLES)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="перелічити проблемні рядки")
+    args = ap.parse_args(argv)
+
+    tables = LUA_TABLES
+    if args.tables:
+        prefixes = dict(LUA_TABLES)
+        tables = [(t, prefixes.get(t, "")) for t in args.tables]
+    print_coverage(analyze(Tree(), tables), args.verbose)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+lua_strings.py
+──────────────
+Витягує видимі гравцю рядки з перекладених Lua-скриптів у таблицю
+`_lua/lua_strings.loc.tsv` (формат як у *.loc.tsv) і повертає переклади
+назад у Lua — щоб не редагувати 53 файли вручну після кожного
+sync_lua_files.py.
+
+Ключ рядка стабільний і складається з трьох частин:
+
+    <файл відносно translation/>:<шлях у таблицях/присвоєннях>:<номер>
+
+    campaigns/main_attila/ironman/achievements/achievement_survivor.lua:achievement.name:1
+    lua_scripts/frontend_strings.lua:FRONTEND_STRINGS.campaign_title_1:1
+    campaigns/main_attila/kingdoms/kingdom_italy.lua:Register_Decision.conditionstring:3
+
+Номер рахується серед усіх літералів шляху, тому ключі збігаються в EN-
+та перекладеній версії файлу. У таблицю потрапляють лише «видимі»
+рядки: літерали в лапках, що містять
+не-ASCII літери або кілька англійських слів (ідентифікатори, шляхи,
+назви подій, "PLACEHOLDER", "v2.4.0.0" тощо пропускаються), крім
+аргументів службових викликів (assert, print, require…).
+
+Результат розбору кожного файлу кешується за sha1 вмісту у
+`_temp/cache/lua_strings.json`, тож повторний прохід по всіх файлах
+після sync розбирає лише ті, що змінилися.
+
+Використання:
+    # 1) зібрати рядки з translation/**.lua у таблицю
+    #    (вже наявні непорожні переклади в таблиці не затираються)
+    python scripts/lua_strings.py extract
+
+    # 2) записати переклади з таблиці назад у Lua-файли
+    python scripts/lua_strings.py inject
+
+    # 3) переклад лишається правильним, хоча EN-літерал змінився
+    python scripts/lua_strings.py ack KEY [KEY …]      # або --all
+
+Якщо EN-літерал під перекладеним ключем змінився (порівнюється з тим
+самим файлом у `_upstream/en`), extract показує рядок як застарілий —
+відбитки EN і перекладу лежать у `_fingerprints/lua_strings.fp.tsv`,
+як для таблиць у fingerprints.py.
+
+Типовий цикл оновлення: sync_lua_files.py → extract (додає нові рядки
+upstream) → inject (повертає переклади). Обидва кроки є етапами
+l10n.py (lua-extract / lua-inject).
+"""
+
+import hashlib, json, re, sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+import fingerprints
+from l10n_tree import CACHE_DIR, Tree
+
+BASE_DIR   = Path("translation")
+UPSTREAM_DIR = Path("_upstream/en")
+LUA_ROOTS  = [BASE_DIR / "lua_scripts", BASE_DIR / "campaigns" / "main_attila"]
+LUA_TSV    = Path("_lua/lua_strings.loc.tsv")
+CACHE_FILE = CACHE_DIR / "lua_strings.json"
+
+# таблиці цього файлу патчить patch_lua.py з TSV гри
+SKIP_FILES = {"campaigns/main_attila/common/mk1212_localisation_lists.lua"}
+
+# виклики, аргументи яких гравець не бачить
+NON_UI_CALLS = {"assert", "error", "print", "output", "require", "ModLog", "dev.log"}
+
+# ключові слова, з яких починається нова інструкція
+STATEMENT_KEYWORDS = {"local", "if", "then", "else", "elseif", "end", "for", "while",
+                      "do", "return", "function", "repeat", "until", "break"}
+
+# ── токенізатор ──────────────────────────────────────────────────────
+TOKEN_RE = re.compile(r"""
+      (?P<comment>--\[(?P<ceq>=*)\[.*?\](?P=ceq)\]|--[^\n]*)
+    | (?P<long>\[(?P<leq>=*)\[.*?\](?P=leq)\])
+    | (?P<str>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<num>0[xX][0-9a-fA-F]+|\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+)
+    | (?P<op>\.\.\.|\.\.|==|~=|<=|>=|::|\S)
+""", re.S | re.X)
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+def tokenize(src: str) -> list[Token]:
+    """Лексеми Lua без коментарів і довгих рядків [[…]]."""
+    tokens = []
+    for m in TOKEN_RE.finditer(src):
+        kind = m.lastgroup
+        if kind in ("comment", "long"):
+            continue
+        tokens.append(Token(kind, m.group(), m.start(), m.end()))
+    return tokens
+
+# ── вибір рядків ─────────────────────────────────────────────────────
+ESCAPE_RE = re.compile(r"\\.")
+MARKUP_RE = re.compile(r"\[\[/?[a-z]+(?::[\d:]+)?\]\]")
+
+def is_user_facing(text: str) -> bool:
+    plain = MARKUP_RE.sub("", ESCAPE_RE.sub(" ", text))
+    if re.search(r"[^\x00-\x7f]", plain):
+        return True
+    return len(re.findall(r"[A-Za-z]{2,}", plain)) >= 2 and " " in plain
+
+class LuaString(NamedTuple):
+    key: str
+    start: int      # межі вмісту літерала (без лапок)
+    end: int
+    text: str
+    visible: bool   # чи потрапляє рядок у таблицю при extract
+
+def extract_strings(src: str, rel: str) -> list[LuaString]:
+    """Знаходить усі рядкові літерали файлу й будує для них стабільні ключі."""
+    tokens = tokenize(src)
+    # стек рамок: [тип ("(" / "{" / ""), назва, поточне присвоєння/поле]
+    frames = [["", "", None]]
+    chain: list[str] = []
+    prev_op = None
+    counters: dict[str, int] = {}
+    found = []
+
+    i = 0
+    while i < len(tokens):
+        kind, val = tokens[i].kind, tokens[i].value
+        top = frames[-1]
+
+        if kind == "name":
+            if val in STATEMENT_KEYWORDS:
+                top[2] = None
+                chain = []
+            elif prev_op in (".", ":") and chain:
+                chain.append(val)
+            else:
+                chain = [val]
+        elif kind == "str":
+            # ["key"] / T["key"] — це ключ, а не текст
+            if (i > 0 and tokens[i - 1].value == "[" and i + 1 < len(tokens)
+                    and tokens[i + 1].value == "]"):
+                chain.append(val[1:-1])
+                i += 2
+                prev_op = "]"
+                continue
+            # нумеруємо ВСІ літерали шляху, а не лише видимі: тоді номер
+            # однаковий і в EN-, і в перекладеній версії файлу
+            text = val[1:-1]
+            callers = {f[1] for f in frames if f[0] == "("}
+            parts = [f[1] for f in frames if f[1]] + ([top[2]] if top[2] else [])
+            path = ".".join(parts) or "_"
+            counters[path] = counters.get(path, 0) + 1
+            found.append(LuaString(f"{rel}:{path}:{counters[path]}",
+                                   tokens[i].start + 1, tokens[i].end - 1, text,
+                                   is_user_facing(text) and not callers & NON_UI_CALLS))
+            chain = []
+        elif kind == "op":
+            if val == "=":
+                top[2] = ".".join(chain) or None
+                chain = []
+            elif val == "(":
+                frames.append(["(", ".".join(chain), None])
+                chain = []
+            elif val == "{":
+                if top[0] == "{" and top[2]:
+                    name = top[2]
+                elif top[0] == "(":
+                    name = ""
+                else:
+                    name = top[2] or ""
+                frames.append(["{", name, None])
+                chain = []
+            elif val in (")", "}"):
+                if len(frames) > 1:
+                    frames.pop()
+                chain = []
+            elif val in (",", ";"):
+                if top[0] == "{" or val == ";":
+                    top[2] = None
+                chain = []
+            elif val not in (".", ":", "[", "]"):
+                chain = []
+            prev_op = val
+            i += 1
+            continue
+        else:
+            chain = []
+        prev_op = None
+        i += 1
+
+    return found
+
+# ── кеш розбору ──────────────────────────────────────────────────────
+class ParseCache:
+    """rel-шлях → (sha1 вмісту, знайдені рядки); зберігається в JSON."""
+
+    def __init__(self, path: Path = CACHE_FILE) -> None:
+        self.path = path
+        self.entries: dict = {}
+        self.changed = False
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.entries = {}
+
+    def strings(self, rel: str, src: str, slot: Optional[str] = None) -> list[LuaString]:
+        """Рядки файлу `rel`; slot — окремий запис кешу (наприклад, для EN-версії)."""
+        digest = hashlib.sha1(src.encode("utf-8")).hexdigest()
+        entry = self.entries.get(slot or rel)
+        if entry and entry["sha1"] == digest:
+            return [LuaString(*s) for s in entry["strings"]]
+        found = extract_strings(src, rel)
+        self.entries[slot or rel] = {"sha1": digest, "strings": [list(s) for s in found]}
+        self.changed = True
+        return found
+
+    def save(self) -> None:
+        if self.changed:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+            self.changed = False
+
+def lua_files() -> list[Path]:
+    return sorted(p for root in LUA_ROOTS for p in root.rglob("*.lua")
+                  if rel_name(p) not in SKIP_FILES)
+
+def rel_name(p: Path) -> str:
+    return p.relative_to(BASE_DIR).as_posix()
+
+# ── extract / inject ─────────────────────────────────────────────────
+def upstream_strings(tree: Tree, cache: ParseCache, rel: str) -> dict[str, str]:
+    """key → EN-текст тих самих літералів з `_upstream/en/<rel>` (порожньо, якщо файлу немає)."""
+    up = UPSTREAM_DIR / rel
+    if not tree.exists(up):
+        return {}
+    return {s.key: s.text for s in cache.strings(rel, tree.text(up), slot=f"{UPSTREAM_DIR.as_posix()}/{rel}")}
+
+def extract(tree: Tree, cache: Optional[ParseCache] = None, ack: Optional[set[str]] = None) -> int:
+    """Додає в таблицю нові рядки з Lua; наявні непорожні переклади лишає.
+
+    Для перекладених рядків у `_fingerprints/lua_strings.fp.tsv` зберігаються
+    відбитки EN і перекладу (як у fingerprints.py): якщо EN-літерал змінився,
+    а переклад ні, рядок показується як застарілий, доки переклад не
+    оновлять або не підтвердять (`ack`). Повертає кількість доданих/оновлених ключів.
+    """
+    cache = cache or ParseCache()
+    old: dict[str, str] = {}
+    if tree.exists(LUA_TSV):
+        df = tree.table(LUA_TSV)
+        old = dict(zip(df["key"], df["text"]))
+    side = fingerprints.load_sidecar(tree, LUA_TSV.name)
+
+    rows = [("#Loc;1;text/db/lua_strings.loc", "", pd.NA)]
+    fp_rows, stale = [], []
+    updated = 0
+    for p in lua_files():
+        rel = rel_name(p)
+        en_map = upstream_strings(tree, cache, rel)
+        for s in cache.strings(rel, tree.text(p)):
+            if not (s.visible or s.key in old):
+                continue
+            text = old.get(s.key) or s.text
+            if old.get(s.key) != text:
+                updated += 1
+            rows.append((s.key, text, True))
+
+            en = en_map.get(s.key)
+            if en is None or text == en or text in fingerprints.SKIP_TEXTS:
+                continue
+            en_fp, ua_fp = fingerprints.fp(en), fingerprints.fp(text)
+            prev = side.get(s.key)
+            if prev and prev[1] == ua_fp and prev[0] != en_fp and not (ack and s.key in ack):
+                stale.append((s.key, en, text))
+                fp_rows.append((s.key, prev[0], ua_fp))
+            else:
+                fp_rows.append((s.key, en_fp, ua_fp))
+    cache.save()
+
+    df = pd.DataFrame(rows, columns=["key", "text", "tooltip"]).astype({"tooltip": "boolean"})
+    tree.put(LUA_TSV, df)
+    if {k: (e, u) for k, e, u in fp_rows} != side:
+        tree.put(fingerprints.sidecar_path(LUA_TSV.name), pd.DataFrame(fp_rows, columns=["key", "en", "ua"]))
+    print(f"✅ {LUA_TSV}: {len(rows) - 1} рядків, нових/змінених {updated}.")
+    for key, en, text in stale:
+        print(f"⚠️  {key}: EN змінився — «{en}», переклад «{text}»")
+    if stale:
+        print(f"Застарілих перекладів Lua: {len(stale)} (виправте або: python scripts/lua_strings.py ack --all)")
+    return updated
+
+def stale_keys(tree: Tree, cache: Optional[ParseCache] = None) -> set[str]:
+    """Застарілі key таблиці без оновлення відбитків."""
+    cache = cache or ParseCache()
+    if not tree.exists(LUA_TSV):
+        return set()
+    side = fingerprints.load_sidecar(tree, LUA_TSV.name)
+    df = tree.table(LUA_TSV)
+    texts = dict(zip(df["key"], df["text"]))
+    stale = set()
+    for p in lua_files():
+        for key, en in upstream_strings(tree, cache, rel_name(p)).items():
+            prev, text = side.get(key), texts.get(key)
+            if prev and text and prev[1] == fingerprints.fp(text) and prev[0] != fingerprints.fp(en):
+                stale.add(key)
+    return stale
+
+def escape_for(text: str, quote: str) -> str:
+    """Екранує лапки-розділювачі, які перекладач вписав без «\\»."""
+    return re.sub(rf'(?<!\\){quote}', f"\\{quote}", text)
+
+def inject(tree: Tree, cache: Optional[ParseCache] = None) -> int:
+    """Підставляє тексти з таблиці в Lua-файли; повертає кількість замін."""
+    if not tree.exists(LUA_TSV):
+        print(f"⛔  {LUA_TSV} не знайдено — спершу виконайте extract.")
+        return 0
+    cache = cache or ParseCache()
+    df = tree.table(LUA_TSV)
+    translations = dict(zip(df["key"], df["text"]))
+
+    total = 0
+    for p in lua_files():
+        src = tree.text(p)
+        updated = 0
+        # з кінця файлу, щоб зсуви не псували наступні позиції
+        for s in sorted(cache.strings(rel_name(p), src), key=lambda s: s.start, reverse=True):
+            new = translations.get(s.key)
+            if not new or new == s.text:
+                continue
+            src = src[:s.start] + escape_for(new, src[s.start - 1]) + src[s.end:]
+            updated += 1
+        if updated:
+            tree.put_text(p, src)
+            print(f"✅ {rel_name(p)}: замінено {updated} рядків.")
+            total += updated
+    cache.save()
+    if not total:
+        print("–  Lua-файли вже містять усі переклади.")
+    return total
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("extract", "inject", "ack") or (argv[0] != "ack" and len(argv) != 1):
+        print("Використання:\n"
+              "  extract             Lua → _lua/lua_strings.loc.tsv\n"
+              "  inject              _lua/lua_strings.loc.tsv → Lua\n"
+              "  ack KEY … | --all   переклад актуальний для нового EN")
+        return 1
+
+    tree = Tree()
+    if argv[0] == "extract":
+        extract(tree)
+    elif argv[0] == "ack":
+        stale = stale_keys(tree)
+        keys = stale if argv[1:] == ["--all"] else set(argv[1:]) & stale
+        extract(tree, ack=keys)
+        print(f"✅ Підтверджено рядків: {len(keys)}.")
+    else:
+        inject(tree)
+    tree.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
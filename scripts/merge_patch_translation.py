@@ -18,36 +18,32 @@ merge_patch_translation.py
       і     key є в ua_patch
       і     ua_patch.text != en.text
       →     копіюємо ua_patch.text у ua_main.text
-4. зберігаємо файл без зміни порядку рядків.
+4. зберігаємо файл без зміни порядку рядків (переписуються лише
+   змінені рядки — див. l10n_tree.patch_rows).
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
+
+from l10n_tree import Tree
 
 ROOT_EN     = Path("_upstream/en/text/db")
 ROOT_PATCH  = Path("_upstream/uk/text/db")
 ROOT_MAIN   = Path("translation/text/db")
 
-def load(p: Path) -> pd.DataFrame:
-    """Читаємо TSV, нічого не перетворюємо на NaN."""
-    return pd.read_csv(
-        p, sep="\t", dtype=str,
-        keep_default_na=False, na_filter=False
-    )
-
-def process(file_name: str) -> None:
+def process(file_name: str, tree: Tree) -> int:
+    """Оновлює таблицю в дереві й повертає кількість підставлених рядків."""
     path_en    = ROOT_EN   / file_name
     path_patch = ROOT_PATCH / file_name
     path_main  = ROOT_MAIN / file_name
 
-    if not (path_en.exists() and path_main.exists() and path_patch.exists()):
+    if not (tree.exists(path_en) and tree.exists(path_main) and tree.exists(path_patch)):
         print(f"⚠️  Пропуск {file_name} — файл не знайдено у всіх трьох каталогаx.")
-        return
+        return 0
 
-    en    = load(path_en)
-    main  = load(path_main)
-    patch = load(path_patch)
+    en    = tree.table(path_en)
+    main  = tree.table(path_main)
+    patch = tree.table(path_patch)
 
     # ── фільтри, але тепер робимо *копії*, головний DF лишається повним
     sub_en    = en[  en["key"].str.strip()   != ""].iloc[1:]
@@ -58,10 +54,9 @@ def process(file_name: str) -> None:
     en_lookup    = dict(zip(sub_en["key"],    sub_en["text"]))
     patch_lookup = dict(zip(sub_patch["key"], sub_patch["text"]))
 
+    edits: dict[str, str] = {}
     updated = 0
-    for idx, row in main.iterrows():
-        k = row["key"]
-        text_main   = main.at[idx, "text"]        # беремо з ПОВНОГО DF
+    for k, text_main in zip(main["key"], main["text"]):   # беремо з ПОВНОГО DF
         text_en     = en_lookup.get(k, "")
         text_patch  = patch_lookup.get(k)
 
@@ -69,16 +64,24 @@ def process(file_name: str) -> None:
                 k and text_patch and text_patch != text_en and
                 (text_main == text_en or text_main == "")
         ):
-            main.at[idx, "text"] = text_patch
+            edits[k] = text_patch
             updated += 1
 
     if updated:
-        main.to_csv(path_main, sep="\t", index=False, na_rep="")
+        # переписуються лише змінені рядки, порядок і решта байтів — як були
+        tree.edit_rows(path_main, edits)
         print(f"✅ {file_name}: оновлено {updated} рядків.")
     else:
         print(f"–  {file_name}: переклади не потрібні.")
+    return updated
+
+def merge_patches(tree: Tree, targets: list[str] = ()) -> int:
+    total = 0
+    for fname in targets or [p.name for p in tree.files(ROOT_PATCH)]:
+        total += process(fname, tree)
+    return total
 
 if __name__ == "__main__":
-    targets = sys.argv[1:] or [p.name for p in ROOT_PATCH.glob("*.loc.tsv")]
-    for fname in targets:
-        process(fname)
+    tree = Tree()
+    merge_patches(tree, sys.argv[1:])
+    tree.flush()
@@ -9,9 +9,21 @@ merge_tsv.py
   - Не затирає вже перекладені рядки
   - Архівує видалені ключі у папку obsolete
   - Валідує структуру та унікальність ключів у TSV
+  - Оновлює відбитки EN (fingerprints.py) і показує застарілі переклади
 
 Як запускати:
   python scripts/merge_tsv.py
+  python scripts/merge_tsv.py --yes                 # у CI: не питати, мерджити навіть з помилками
+  python scripts/merge_tsv.py --no                  # у CI: при помилках валідації — вихід з кодом 1
+  python scripts/merge_tsv.py --dry-run             # нічого не записувати, лише показати зміни
+  python scripts/merge_tsv.py --diff-json diff.json # структурований звіт змін (key-и по файлах)
+  python scripts/merge_tsv.py --lossy               # дозволити читання битого UTF-8 з втратою байтів
+  python scripts/merge_tsv.py --review-since v1.3   # позначити переклади, EN яких змінився
+                                                    # з часу знімка v1.3 (upstream_snapshot.py)
+
+Файли перезаписуються лише тоді, коли їхній вміст справді змінився.
+Без --yes/--no і без інтерактивного терміналу мердж при помилках
+скасовується (input() не блокує CI).
 
 Для чого потрібно:
   - Щоб переклад завжди містив усі актуальні ключі з оригіналу
@@ -19,25 +31,28 @@ merge_tsv.py
   - Для зручного оновлення після оновлення оригінальних файлів
 """
 
-import pandas as pd, pathlib, sys
-import csv
+import argparse, json, pandas as pd, pathlib, sys
+from typing import Optional
+
+import fingerprints
+import upstream_snapshot
+from l10n_tree import EncodingError, Tree, load_tsv
 
 SRC_DIR = pathlib.Path("_upstream/en/text/db")
 TRG_DIR = pathlib.Path("translation/text/db")
 OBS_DIR = pathlib.Path("_obsolete")
 
-# - stat counters -
-files_done   = 0
-total_added  = 0
-total_removed = 0
-total_modified = 0
-
 # ── Функції валідації ─────────────────────────────────────────────────
-def validate_tsv_file(file_path: pathlib.Path) -> tuple[bool, list[str]]:
-    """Валідує один TSV файл та повертає (is_valid, error_messages)."""
+def validate_tsv_file(file_path: pathlib.Path, lossy: bool = False) -> tuple[bool, list[str]]:
+    """Валідує один TSV файл та повертає (is_valid, error_messages).
+
+    Битий UTF-8 (без lossy) не перевіряється тут, а піднімає EncodingError.
+    """
     errors = []
     try:
-        df = pd.read_csv(file_path, sep="\t", dtype=str, keep_default_na=False, quoting=csv.QUOTE_NONE, encoding_errors='ignore')
+        df = load_tsv(file_path, lossy)
+    except EncodingError:
+        raise
     except Exception as e:
         errors.append(f"не вдалося прочитати файл ({e})")
         return False, errors
@@ -63,19 +78,28 @@ def validate_tsv_file(file_path: pathlib.Path) -> tuple[bool, list[str]]:
 
     return len(errors) == 0, errors
 
-def validate_directory(dir_path: pathlib.Path, dir_name: str) -> tuple[bool, dict[str, list[str]]]:
-    """Валідує всі TSV файли в директорії та повертає (is_valid, file_errors)."""
+def validate_directory(dir_path: pathlib.Path, dir_name: str,
+                       lossy: bool = False) -> tuple[bool, dict[str, list[str]], list[str]]:
+    """Валідує всі TSV файли в директорії.
+
+    Повертає (is_valid, file_errors, broken), де broken — файли з битим UTF-8.
+    """
     print(f"🔍 Перевіряємо TSV у {dir_name} ({dir_path})...")
     
     if not dir_path.exists():
         print(f"⚠️  Директорія {dir_name} не існує")
-        return True, {}
+        return True, {}, []
     
     file_errors = {}
+    broken = []
     has_errors = False
     
     for file_path in sorted(dir_path.glob("*.loc.tsv")):
-        is_valid, errors = validate_tsv_file(file_path)
+        try:
+            is_valid, errors = validate_tsv_file(file_path, lossy)
+        except EncodingError as e:
+            broken.append(file_path.name)
+            errors = [str(e)]
         if errors:
             file_errors[file_path.name] = errors
             has_errors = True
@@ -86,10 +110,18 @@ def validate_directory(dir_path: pathlib.Path, dir_name: str) -> tuple[bool, dic
             pass
     
     print()
-    return not has_errors, file_errors
-
-def ask_continue() -> bool:
-    """Питає користувача чи продовжувати виконання."""
+    return not has_errors, file_errors, broken
+
+def ask_continue(answer: Optional[bool] = None) -> bool:
+    """Питає користувача чи продовжувати виконання.
+
+    answer — готова відповідь (--yes/--no); без неї й без TTY повертає False.
+    """
+    if answer is not None:
+        return answer
+    if not sys.stdin.isatty():
+        print("Немає інтерактивного терміналу — вкажіть --yes або --no.")
+        return False
     while True:
         response = input("Продовжити мердж? (y/n): ").lower().strip()
         if response in ['y', 'yes', 'так', 'т']:
@@ -99,39 +131,9 @@ def ask_continue() -> bool:
         else:
             print("Будь ласка, введіть 'y' або 'n'")
 
-# ── Перевірка файлів перед мерджем ──────────────────────────────────
-print("=== ПОПЕРЕДНЯ ПЕРЕВІРКА ФАЙЛІВ ===\n")
-
-src_valid, src_errors = validate_directory(SRC_DIR, "SRC_DIR")
-trg_valid, trg_errors = validate_directory(TRG_DIR, "TRG_DIR")
-
-if not src_valid or not trg_valid:
-    print("⚠️  ЗНАЙДЕНО ПОМИЛКИ В ФАЙЛАХ!")
-    print("Скрипт може відпрацювати некоректно і краще виправити проблемні файли власноруч.")
-    print()
-    
-    if not ask_continue():
-        print("Мердж скасовано.")
-        sys.exit(1)
-    
-    print("Продовжуємо мердж...\n")
-else:
-    print("✅ Всі файли валідні, продовжуємо мердж.\n")
-
-print("=== ПОЧИНАЄМО МЕРДЖ ===\n")
-
-files_with_changes = 0
-
-for src_path in SRC_DIR.glob("*.loc.tsv"):
-    trg_path = TRG_DIR / src_path.name
-    read = lambda p: pd.read_csv(
-        p, sep="\t", dtype=str, keep_default_na=False, na_filter=False, 
-        quoting=csv.QUOTE_NONE, encoding_errors='ignore'
-    )
-
-    src = read(src_path)
-    trg = read(trg_path) if trg_path.exists() else pd.DataFrame(columns=src.columns)
-
+# ── Мердж ────────────────────────────────────────────────────────────
+def merge_file(src: pd.DataFrame, trg: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, list[str]]:
+    """Мерджить одну пару EN/UA і повертає (merged, new_keys, removed, modified_keys)."""
     # - Filter empty keys -
     src = src[src["key"].str.strip() != ""].copy()
     trg = trg[trg["key"].str.strip() != ""].copy()
@@ -147,51 +149,167 @@ for src_path in SRC_DIR.glob("*.loc.tsv"):
     )
 
     # - Count actually modified rows (where translation appeared or changed) -
-    modified_count = 0
+    modified_keys: list[str] = []
     if "text_old" in merged.columns:
         modified_mask = (merged["text"].notna()) & (merged["text"] != "") & (
             merged["text_old"].isna() | (merged["text_old"] == "") | (merged["text"] != merged["text_old"]))
-        modified_count = modified_mask.sum()
-    total_modified += modified_count
+        modified_keys = merged.loc[modified_mask, "key"].tolist()
 
     merged = merged[src.columns]   # return column order
 
-    # NaN → ""
-    merged = merged.fillna("")
-
-    trg_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Зберігаємо з pandas to_csv, використовуючи QUOTE_NONE
-    merged.to_csv(trg_path, sep='\t', index=False, quoting=csv.QUOTE_NONE, encoding='utf-8')
+    # NaN → "" (tooltip — bool, його NA службового рядка лишаємо)
+    merged = merged.fillna({"key": "", "text": ""})
 
     # - statistic for new keys -
     new_keys = src.loc[~src["key"].isin(trg["key"])]
-    total_added += len(new_keys)
 
     # -︎ Removed keys -
     removed = trg.loc[~trg["key"].isin(src["key"])]
-    if not removed.empty:
-        OBS_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Зберігаємо архівний файл з pandas to_csv
-        archive_path = OBS_DIR / src_path.name
-        removed.to_csv(archive_path, sep='\t', index=False, quoting=csv.QUOTE_NONE, encoding='utf-8')
-        
-        total_removed += len(removed)
-
-    files_done += 1
-    if len(new_keys) > 0 or len(removed) > 0 or modified_count > 0:
-        print(f"✓ {src_path.name}: +{len(new_keys)} new, -{len(removed)} removed, ~{modified_count} modified")
-        files_with_changes += 1
-
-if files_with_changes == 0:
-    print("✅ Всі файли актуальні")
-
-print("\n=== Merge completed ===")
-print(f"Processed files : {files_done}")
-print(f"New keys added  : {total_added}")
-print(f"Keys archived   : {total_removed}")
-print(f"Rows modified   : {total_modified}")
-print("Done!")
-
-sys.exit(0)
\ No newline at end of file
+
+    return merged, new_keys, removed, modified_keys
+
+def merge_tree(tree: Tree, src_dir: pathlib.Path = SRC_DIR, trg_dir: pathlib.Path = TRG_DIR,
+               obs_dir: pathlib.Path = OBS_DIR,
+               en_changes: Optional[dict[str, dict[str, tuple[str, str]]]] = None) -> dict:
+    """Мерджить усі файли каталогу в дереві (без запису на диск).
+
+    Повертає звіт {"totals": {...}, "files": {name: {"added", "removed", "modified"}}}
+    — той самий, що пишеться у --diff-json.
+
+    en_changes — file → {key: (старий EN, новий EN)} з upstream_snapshot.changed_keys();
+    перекладені рядки з цього списку потрапляють у "review".
+    """
+    stats = dict(files_done=0, files_with_changes=0, added=0, removed=0, modified=0, review=0, stale=0)
+    files: dict[str, dict[str, list[str]]] = {}
+
+    for src_path in tree.files(src_dir):
+        trg_path = trg_dir / src_path.name
+
+        src = tree.table(src_path)
+        trg = tree.table(trg_path) if tree.exists(trg_path) else pd.DataFrame(columns=src.columns)
+
+        merged, new_keys, removed, modified_keys = merge_file(src, trg)
+        modified_count = len(modified_keys)
+
+        # переклад лишився, а EN під ним змінився — треба перечитати
+        review: list[str] = []
+        changed = (en_changes or {}).get(src_path.name)
+        if changed:
+            review = [k for k, t in zip(merged["key"], merged["text"])
+                      if k in changed and t and t not in changed[k]]
+        if (list(trg.columns) == list(merged.columns) and len(trg) == len(merged)
+                and trg["key"].tolist() == merged["key"].tolist()
+                and trg["tooltip"].tolist() == merged["tooltip"].tolist()):
+            # ті самі key у тому ж порядку — переписуємо лише змінені рядки
+            diff = merged["text"].values != trg["text"].values
+            tree.edit_rows(trg_path, dict(zip(merged["key"][diff], merged["text"][diff])))
+        else:
+            tree.put(trg_path, merged)
+
+        if not removed.empty:
+            # архівний файл з видаленими key
+            tree.put(obs_dir / src_path.name, removed)
+
+        # переклад лишився, а відбиток EN, з якого його зроблено, — інший
+        stale = fingerprints.update_file(tree, src_path.name)
+
+        stats["files_done"] += 1
+        stats["added"] += len(new_keys)
+        stats["removed"] += len(removed)
+        stats["modified"] += modified_count
+        stats["review"] += len(review)
+        stats["stale"] += len(stale)
+        if len(new_keys) > 0 or len(removed) > 0 or modified_count > 0 or review or stale:
+            print(f"✓ {src_path.name}: +{len(new_keys)} new, -{len(removed)} removed, ~{modified_count} modified"
+                  + (f", !{len(review)} to review" if review else "")
+                  + (f", ⚠{len(stale)} stale" if stale else ""))
+            stats["files_with_changes"] += 1
+            files[src_path.name] = {
+                "added": new_keys["key"].tolist(),
+                "removed": removed["key"].tolist(),
+                "modified": modified_keys,
+            }
+            if stale:
+                files[src_path.name]["stale"] = stale
+            if review:
+                files[src_path.name]["review"] = [
+                    {"key": k, "en_old": changed[k][0], "en_new": changed[k][1]} for k in review]
+
+    if stats["files_with_changes"] == 0:
+        print("✅ Всі файли актуальні")
+    return {"totals": stats, "files": files}
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Мердж оригіналу (EN) у файли перекладу.")
+    answer = ap.add_mutually_exclusive_group()
+    answer.add_argument("--yes", "-y", dest="answer", action="store_const", const=True,
+                        help="продовжувати мердж навіть якщо валідація знайшла помилки")
+    answer.add_argument("--no", "-n", dest="answer", action="store_const", const=False,
+                        help="скасувати мердж, якщо валідація знайшла помилки")
+    ap.add_argument("--dry-run", action="store_true", help="нічого не записувати")
+    ap.add_argument("--diff-json", metavar="PATH", help="записати структурований звіт змін у JSON")
+    ap.add_argument("--lossy", action="store_true",
+                    help="читати битий UTF-8 з втратою байтів (за замовчуванням — помилка)")
+    ap.add_argument("--review-since", metavar="LABEL",
+                    help="знімок upstream_snapshot.py, відносно якого шукати змінений EN")
+    args = ap.parse_args(argv)
+
+    # ── Перевірка файлів перед мерджем ──────────────────────────────
+    print("=== ПОПЕРЕДНЯ ПЕРЕВІРКА ФАЙЛІВ ===\n")
+
+    src_valid, src_errors, src_broken = validate_directory(SRC_DIR, "SRC_DIR", args.lossy)
+    trg_valid, trg_errors, trg_broken = validate_directory(TRG_DIR, "TRG_DIR", args.lossy)
+
+    # битий UTF-8 не мерджимо навіть з --yes: запис викинув би байти
+    broken = src_broken + trg_broken
+    if broken:
+        print(f"⛔  Невалідний UTF-8 у {len(broken)} файлах — виправте "
+              "(python scripts/check_encoding.py --repair) або запустіть з --lossy.")
+        return 1
+
+    if not src_valid or not trg_valid:
+        print("⚠️  ЗНАЙДЕНО ПОМИЛКИ В ФАЙЛАХ!")
+        print("Скрипт може відпрацювати некоректно і краще виправити проблемні файли власноруч.")
+        print()
+
+        if not ask_continue(args.answer):
+            print("Мердж скасовано.")
+            return 1
+
+        print("Продовжуємо мердж...\n")
+    else:
+        print("✅ Всі файли валідні, продовжуємо мердж.\n")
+
+    print("=== ПОЧИНАЄМО МЕРДЖ ===\n")
+
+    tree = Tree(lossy=args.lossy)
+    en_changes = None
+    if args.review_since:
+        en_changes = upstream_snapshot.changed_keys(
+            upstream_snapshot.resolve(tree, args.review_since), upstream_snapshot.resolve(tree, None))
+    report = merge_tree(tree, en_changes=en_changes)
+    if args.dry_run:
+        written = tree.pending()
+    else:
+        written = tree.flush()
+    report["written"] = [str(p) for p in written]
+
+    if args.diff_json:
+        pathlib.Path(args.diff_json).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    stats = report["totals"]
+    print("\n=== Merge completed ===")
+    print(f"Processed files : {stats['files_done']}")
+    print(f"New keys added  : {stats['added']}")
+    print(f"Keys archived   : {stats['removed']}")
+    print(f"Rows modified   : {stats['modified']}")
+    if args.review_since:
+        print(f"To review       : {stats['review']}")
+    print(f"Stale rows      : {stats['stale']}")
+    print(f"Files {'to write' if args.dry_run else 'written'} : {len(written)}")
+    print("Done!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
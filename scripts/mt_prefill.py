@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+mt_prefill.py
+─────────────
+Машинний пре-переклад рядків, які досі збігаються з EN-оригіналом.
+
+Як працює:
+  1. проходить по парах EN/UA (логіка translation_report.py: порожні key,
+     службові рядки та placeholder-и пропускаються) і збирає рядки, де
+     text_ua == text_en;
+  2. дедуплікує їх за EN-текстом — кожен унікальний текст перекладається
+     один раз, навіть якщо трапляється в сотнях key;
+  3. тексти, яких ще немає в кеші, пакетами йдуть у backend
+     (asyncio: кілька пакетів паралельно, обмеження частоти, повтори
+     з експоненційною затримкою);
+  4. результати зберігаються в SQLite-кеші `_temp/cache/mt_cache.sqlite`
+     за sha1 EN-тексту (окремо для кожного backend) — нічого не
+     перекладається двічі; тексти без результату (None) не кешуються
+     і запитуються знову наступного запуску;
+  5. з `--apply` переклади з кешу підставляються у translation/text/db
+     (лише в рядки, що досі збігаються з EN) — на диску переписуються
+     тільки ці рядки (Tree.edit_rows).
+
+Backend-и (локальні, без мережі за замовчуванням):
+  • echo               — повертає текст як є (перевірка конвеєра)
+  • dict:<file.tsv>    — словник EN → UK (колонки en, uk); невідоме пропускає
+  • http:<url>         — LibreTranslate-сумісний сервер, напр. локальний
+                         http://localhost:5000/translate
+  • <module>:<Class>   — власний клас з async translate(texts) -> list
+
+Використання:
+    python scripts/mt_prefill.py --backend echo --dry-run
+    python scripts/mt_prefill.py --backend dict:glossary_mt.tsv --apply
+    python scripts/mt_prefill.py --backend http:http://localhost:5000/translate \\
+        --batch-size 20 --concurrency 4 --rate 5 --apply
+"""
+
+import argparse, asyncio, importlib, json, sqlite3, sys, time
+import urllib.request
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from l10n_tree import CACHE_DIR, READ_KW, Tree, text_hash
+from translation_report import EXCLUSIONS, SRC_DIR, TRG_DIR
+
+CACHE_DB = CACHE_DIR / "mt_cache.sqlite"
+
+# ── backend-и ────────────────────────────────────────────────────────
+class Backend(ABC):
+    """Інтерфейс backend-а: пакет EN-текстів → пакет перекладів.
+
+    None у відповіді означає «не вдалося перекласти». Такий текст не
+    кешується навмисно: для dict це безкоштовний локальний пошук, і
+    доповнений словник має спрацювати з наступного запуску; для http
+    None — зазвичай тимчасовий збій, запит варто повторити.
+    """
+    name = "base"
+    batch_size = 50
+
+    @abstractmethod
+    async def translate(self, texts: list[str]) -> list[Optional[str]]:
+        """Переклади в тому ж порядку й тієї ж кількості, що й `texts`."""
+
+
+class EchoBackend(Backend):
+    name = "echo"
+
+    async def translate(self, texts: list[str]) -> list[Optional[str]]:
+        return list(texts)
+
+
+class DictBackend(Backend):
+    """Словник EN → UK з TSV (колонки en, uk)."""
+
+    def __init__(self, path: str) -> None:
+        df = pd.read_csv(path, usecols=["en", "uk"], **READ_KW)
+        self.mapping = dict(zip(df["en"], df["uk"]))
+        self.name = f"dict:{Path(path).name}"
+
+    async def translate(self, texts: list[str]) -> list[Optional[str]]:
+        return [self.mapping.get(t) or None for t in texts]
+
+
+class HttpBackend(Backend):
+    """LibreTranslate-сумісний API: POST {q: [...], source, target}."""
+    batch_size = 20
+
+    def __init__(self, url: str, source: str = "en", target: str = "uk", timeout: float = 60) -> None:
+        self.url, self.source, self.target, self.timeout = url, source, target, timeout
+        self.name = f"http:{url}"
+
+    def _post(self, texts: list[str]) -> list[Optional[str]]:
+        body = json.dumps({"q": texts, "source": self.source, "target": self.target,
+                           "format": "text"}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        out = data["translatedText"]
+        return out if isinstance(out, list) else [out]
+
+    async def translate(self, texts: list[str]) -> list[Optional[str]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._post, texts)
+
+
+def make_backend(spec: str) -> Backend:
+    kind, _, arg = spec.partition(":")
+    if kind == "echo":
+        return EchoBackend()
+    if kind == "dict":
+        return DictBackend(arg)
+    if kind == "http":
+        return HttpBackend(arg)
+    module, _, cls = spec.rpartition(":")
+    if not module:
+        raise SystemExit(f"⛔  Невідомий backend: {spec}")
+    return getattr(importlib.import_module(module), cls)()
+
+# ── кеш ──────────────────────────────────────────────────────────────
+class MTCache:
+    """SQLite: (sha1 EN-тексту, backend) → переклад."""
+
+    def __init__(self, path: Path = CACHE_DB) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS mt ("
+                        "hash TEXT, backend TEXT, src TEXT, dst TEXT, "
+                        "PRIMARY KEY (hash, backend))")
+
+    @staticmethod
+    def key(text: str) -> str:
+        return text_hash(text.encode("utf-8"))
+
+    def get_many(self, texts: list[str], backend: str) -> dict[str, str]:
+        found = {}
+        hashes = {self.key(t): t for t in texts}
+        items = list(hashes)
+        for i in range(0, len(items), 500):
+            chunk = items[i:i + 500]
+            rows = self.db.execute(
+                f"SELECT hash, dst FROM mt WHERE backend = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [backend, *chunk])
+            for h, dst in rows:
+                found[hashes[h]] = dst
+        return found
+
+    def put_many(self, pairs: list[tuple[str, str]], backend: str) -> None:
+        self.db.executemany("INSERT OR REPLACE INTO mt VALUES (?, ?, ?, ?)",
+                            [(self.key(s), backend, s, d) for s, d in pairs])
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+# ── неперекладені рядки ──────────────────────────────────────────────
+def untranslated(tree: Tree) -> Iterator[tuple[Path, str, str]]:
+    """(файл перекладу, key, EN-текст) для рядків, де UA == EN."""
+    for src_path in tree.files(SRC_DIR):
+        trg_path = TRG_DIR / src_path.name
+        if not tree.exists(trg_path):
+            continue
+        en = tree.table(src_path)
+        en = en[~en["key"].str.startswith("#Loc;")]
+        en_map = dict(zip(en["key"], en["text"]))
+        trg = tree.table(trg_path)
+        for key, text in zip(trg["key"], trg["text"]):
+            en_text = en_map.get(key)
+            if (en_text and key.strip() and en_text.strip() and text == en_text
+                    and en_text not in EXCLUSIONS):
+                yield trg_path, key, en_text
+
+# ── асинхронний переклад ─────────────────────────────────────────────
+class RateLimiter:
+    """Не більше `rate` стартів пакетів за секунду."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            if self.next_at > now:
+                await asyncio.sleep(self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
+
+
+async def translate_all(texts: list[str], backend: Backend, cache: MTCache,
+                        batch_size: int, concurrency: int, rate: float, retries: int) -> tuple[int, int]:
+    """Перекладає тексти пакетами й пише в кеш; повертає (успішно, невдало)."""
+    sem = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    stats = [0, 0]
+
+    async def run_batch(batch: list[str]) -> None:
+        async with sem:
+            for attempt in range(retries + 1):
+                await limiter.wait()
+                try:
+                    result = await backend.translate(batch)
+                    if len(result) != len(batch):
+                        raise ValueError(f"backend повернув {len(result)} перекладів замість {len(batch)}")
+                    break
+                except Exception as e:
+                    if attempt == retries:
+                        print(f"✗ пакет з {len(batch)} текстів не перекладено: {e}")
+                        stats[1] += len(batch)
+                        return
+                    await asyncio.sleep(2 ** attempt * 0.5)
+            pairs = [(s, d) for s, d in zip(batch, result) if d]
+            cache.put_many(pairs, backend.name)
+            stats[0] += len(pairs)
+            stats[1] += len(batch) - len(pairs)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    await asyncio.gather(*(run_batch(b) for b in batches))
+    return stats[0], stats[1]
+
+# ── підстановка ──────────────────────────────────────────────────────
+def apply(tree: Tree, rows: list[tuple[Path, str, str]], translations: dict[str, str]) -> int:
+    by_file: dict[Path, dict[str, str]] = {}
+    for trg_path, key, en_text in rows:
+        dst = translations.get(en_text)
+        if dst and dst != en_text:
+            by_file.setdefault(trg_path, {})[key] = dst
+    total = 0
+    for trg_path, edits in by_file.items():
+        count = int(tree.table(trg_path)["key"].isin(edits.keys()).sum())
+        tree.edit_rows(trg_path, edits)
+        total += count
+        print(f"✅ {trg_path.name}: підставлено {count} рядків.")
+    return total
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Машинний пре-переклад неперекладених рядків.")
+    ap.add_argument("--backend", default="echo", help="echo | dict:<tsv> | http:<url> | module:Class")
+    ap.add_argument("--batch-size", type=int, help="текстів у пакеті (за замовчуванням — як у backend)")
+    ap.add_argument("--concurrency", type=int, default=4, help="пакетів одночасно")
+    ap.add_argument("--rate", type=float, default=0, help="макс. пакетів за секунду (0 — без обмеження)")
+    ap.add_argument("--retries", type=int, default=3, help="повторів для невдалого пакета")
+    ap.add_argument("--apply", action="store_true", help="підставити переклади у translation/text/db")
+    ap.add_argument("--dry-run", action="store_true", help="лише порахувати, нічого не перекладати")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    rows = list(untranslated(tree))
+    unique = list(dict.fromkeys(en for _, _, en in rows))
+    print(f"Неперекладених рядків: {len(rows)}, унікальних EN-текстів: {len(unique)}")
+
+    backend = make_backend(args.backend)
+    cache = MTCache()
+    try:
+        cached = cache.get_many(unique, backend.name)
+        todo = [t for t in unique if t not in cached]
+        print(f"У кеші ({backend.name}): {len(cached)}, до перекладу: {len(todo)}")
+        if args.dry_run:
+            return 0
+
+        if todo:
+            ok, failed = asyncio.run(translate_all(
+                todo, backend, cache, args.batch_size or backend.batch_size,
+                args.concurrency, args.rate, args.retries))
+            print(f"Перекладено: {ok}, без результату: {failed}")
+
+        if args.apply:
+            apply(tree, rows, cache.get_many(unique, backend.name))
+            tree.flush()
+    finally:
+        cache.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
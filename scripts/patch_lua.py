@@ -31,59 +31,45 @@ DIR_UP2    = "_upstream/en/text/db"      # 2-й оригінал (EN)
 
 import argparse, re, sys
 from pathlib import Path
-import pandas as pd
 
-# ── аргументи CLI ────────────────────────────────────────────────────
-ap = argparse.ArgumentParser()
-ap.add_argument("--table",  required=True, help="Lua table name")
-ap.add_argument("--prefix", default="",   help="TSV key prefix (без _)")
-args = ap.parse_args()
+from l10n_tree import Tree
 
 PATH_LUA   = Path(LUA_FILE)
 DIR_DB     = Path(DIR_TRANSL)
 DIR_UP1    = Path(DIR_UP1)
 DIR_UP2    = Path(DIR_UP2)
 
-if not (PATH_LUA.exists() and DIR_DB.exists() and DIR_UP2.exists()):
-    sys.exit("⛔  Вказані шляхи не існують.")
-
-# ── читаємо TSV → словники перекладу / оригіналів ───────────────────
-def load_dir(p: Path) -> dict[str, str]:
-    d: dict[str,str] = {}
-    for f in p.glob("*.loc.tsv"):
-        df = pd.read_csv(f, sep="\t", dtype=str,
-                         keep_default_na=False, na_filter=False)
-        d.update(zip(df["key"], df["text"]))
-    return d
-
-tr_dict   = load_dir(DIR_DB)
-up2_dict  = load_dir(DIR_UP2)
-up1_dict  = load_dir(DIR_UP1) if DIR_UP1 else {}
+# таблиці, які патчить етап patch-lua у l10n.py: (назва таблиці, префікс TSV-ключа)
+LUA_TABLES = [
+    ("REGIONS_NAMES_LOCALISATION",  "regions_onscreen"),
+    ("FACTIONS_NAMES_LOCALISATION", "factions_screen_name"),
+    ("NAMES_TO_LOCALISATION",       ""),
+]
 
 # ── регулярки ────────────────────────────────────────────────────────
 # 1) знайти потрібну таблицю цілком
-TABLE_RE = re.compile(
-    rf'^[ \t]*(?P<open>{re.escape(args.table)}\s*=\s*\{{)'  # відкриття
-    r'(?P<body>.*?)'                                        # тіло
-    r'^[ \t]*(?P<close>\})'                                 # закриття
-    , re.S | re.M
-)
+def table_re(table: str) -> re.Pattern:
+    return re.compile(
+        rf'^[ \t]*(?P<open>{re.escape(table)}\s*=\s*\{{)'  # відкриття
+        r'(?P<body>.*?)'                                   # тіло
+        r'^[ \t]*(?P<close>\})'                            # закриття
+        , re.S | re.M
+    )
 
 # 2) усередині body: key / ["key"] = "Text"
 ROW_RE = re.compile(
     r'(?P<lhs>(\[\s*"(?P<kq>[^"]+)"\s*\])|(?P<kp>[A-Za-z0-9_]+))\s*=\s*"(?P<txt>[^"]*)"'
 )
 
-lua_text = PATH_LUA.read_text(encoding="utf-8")
-
-def patch_body(body: str) -> tuple[str,int]:
+def patch_body(body: str, prefix: str, tr_dict: dict[str, str],
+               up1_dict: dict[str, str], up2_dict: dict[str, str]) -> tuple[str,int]:
     """Повертає змінений body та кількість real updates."""
     updated = 0
 
     def repl(m: re.Match) -> str:
         nonlocal updated
         lua_key = m["kq"] or m["kp"]
-        full_key = f"{args.prefix}_{lua_key}" if args.prefix else lua_key
+        full_key = f"{prefix}_{lua_key}" if prefix else lua_key
 
         new = tr_dict.get(full_key)
         if not new:
@@ -92,7 +78,7 @@ def patch_body(body: str) -> tuple[str,int]:
         # пропускаємо, якщо new == будь-який з оригіналів
         if new == up2_dict.get(full_key, ""):
             return m.group(0)
-        if DIR_UP1 and new == up1_dict.get(full_key, ""):
+        if up1_dict and new == up1_dict.get(full_key, ""):
             return m.group(0)
 
         updated += 1
@@ -101,24 +87,62 @@ def patch_body(body: str) -> tuple[str,int]:
     new_body = ROW_RE.sub(repl, body)
     return new_body, updated
 
-def patch_lua(src: str) -> tuple[str,int]:
+def patch_lua(src: str, table: str, prefix: str, tr_dict: dict[str, str],
+              up1_dict: dict[str, str], up2_dict: dict[str, str]) -> tuple[str,int]:
     total_updates = 0
 
     def table_repl(t: re.Match) -> str:
         nonlocal total_updates
         original_body = t.group('body')
-        patched_body, n = patch_body(original_body)
+        patched_body, n = patch_body(original_body, prefix, tr_dict, up1_dict, up2_dict)
         total_updates += n
         # збираємо назад: open + нове тіло + close
         return f"{t.group('open')}{patched_body}{t.group('close')}"
 
-    new_src = TABLE_RE.sub(table_repl, src, count=1)
+    new_src = table_re(table).sub(table_repl, src, count=1)
     return new_src, total_updates
 
-patched, n = patch_lua(lua_text)
-
-if n:
-    PATH_LUA.write_text(patched, encoding="utf-8")
-    print(f"✅  {PATH_LUA.name}: замінено {n} рядків у таблиці {args.table}.")
-else:
-    print(f"–  {PATH_LUA.name}: жодного перекладеного рядка для {args.table} не знайдено.")
+def missing_paths(tree: Tree) -> list[Path]:
+    """Обов'язкові шляхи (Lua-файл, перекладені TSV, EN-оригінал), яких немає."""
+    return [p for p in (PATH_LUA, DIR_DB, DIR_UP2) if not tree.exists(p)]
+
+def patch_table(tree: Tree, table: str, prefix: str = "") -> int:
+    """Патчить одну таблицю Lua-файлу в дереві; словники TSV беруться з кешу дерева.
+
+    Повертає кількість замінених рядків. Наявність шляхів перевіряє
+    викликач (missing_paths).
+    """
+    src = tree.text(PATH_LUA)
+    m = table_re(table).search(src)
+    if not m:
+        print(f"–  {PATH_LUA.name}: таблицю {table} не знайдено.")
+        return 0
+
+    # ── TSV → лише потрібні ключі (через індекс зміщень, без розбору всіх файлів)
+    keys = {f"{prefix}_{k}" if prefix else k
+            for k in (r["kq"] or r["kp"] for r in ROW_RE.finditer(m["body"]))}
+    tr_dict  = tree.lookup_keys(DIR_DB, keys)
+    up2_dict = tree.lookup_keys(DIR_UP2, keys)
+    up1_dict = tree.lookup_keys(DIR_UP1, keys)
+
+    patched, n = patch_lua(src, table, prefix, tr_dict, up1_dict, up2_dict)
+
+    if n:
+        tree.put_text(PATH_LUA, patched)
+        print(f"✅  {PATH_LUA.name}: замінено {n} рядків у таблиці {table}.")
+    else:
+        print(f"–  {PATH_LUA.name}: жодного перекладеного рядка для {table} не знайдено.")
+    return n
+
+if __name__ == "__main__":
+    # ── аргументи CLI ────────────────────────────────────────────────
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--table",  required=True, help="Lua table name")
+    ap.add_argument("--prefix", default="",   help="TSV key prefix (без _)")
+    args = ap.parse_args()
+
+    tree = Tree()
+    if missing_paths(tree):
+        sys.exit("⛔  Вказані шляхи не існують: " + ", ".join(p.as_posix() for p in missing_paths(tree)))
+    patch_table(tree, args.table, args.prefix)
+    tree.flush()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+precommit.py
+────────────
+pre-commit хук, що працює лише з тим, що справді індексовано (staged):
+
+  1. `git diff --cached` → список staged `translation/**/*.loc.tsv` і `*.lua`
+  2. вміст цих файлів з індексу (а не з робочої теки!) читається через
+     ОДИН процес `git cat-file --batch` — без окремого git-виклику на файл
+  3. кожен *.loc.tsv перевіряється як у validate_tsv.py (колонки, порожні
+     й дубльовані key, tooltip) плюс кодування як у check_encoding.py;
+     у Lua — лише битий UTF-8 і NUL
+  4. якщо помилок немає і в .env задано DST — саме ці staged-версії
+     файлів копіюються в DST (видалені з індексу — видаляються з DST)
+
+Тож час коміту залежить від розміру зміни, а не від усього дерева.
+Повна синхронізація, як і раніше, — `python scripts/sync_translation.py`.
+
+Використання (див. .pre-commit-config.yaml):
+    python scripts/precommit.py               # перевірити + розгорнути staged
+    python scripts/precommit.py --no-deploy   # лише перевірка
+
+Код виходу 1 (коміт зупиняється), якщо перевірка знайшла помилки.
+"""
+
+import argparse, io, os, subprocess, sys
+from pathlib import Path
+from typing import Optional
+
+import check_encoding
+import validate_tsv
+from l10n_tree import atomic_write, load_tsv
+from sync_translation import load_dst
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASE_DIR     = Path("translation")
+SUFFIXES     = (".loc.tsv", ".lua")
+
+
+def staged_paths() -> tuple[list[str], list[str]]:
+    """(змінені/додані, видалені) staged-файли перекладу."""
+    out = subprocess.run(["git", "diff", "--cached", "--name-status", "-z", "--no-renames"],
+                         check=True, capture_output=True).stdout.decode("utf-8")
+    parts = out.split("\0")
+    changed, deleted = [], []
+    for status, path in zip(parts[::2], parts[1::2]):
+        if not (path.startswith(f"{BASE_DIR.as_posix()}/") and path.endswith(SUFFIXES)):
+            continue
+        (deleted if status == "D" else changed).append(path)
+    return changed, deleted
+
+
+class BlobReader:
+    """Один процес `git cat-file --batch` для всіх читань blob-ів."""
+
+    def __init__(self) -> None:
+        self.proc = subprocess.Popen(["git", "cat-file", "--batch"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, path: str) -> Optional[bytes]:
+        """Вміст файлу в індексі (`:<path>`) або None, якщо його там немає."""
+        return self.object(f":{path}")
+
+    def object(self, spec: str) -> Optional[bytes]:
+        """Вміст blob-а за будь-яким іменем git (sha, `<commit>:<path>`, `:<path>`)."""
+        self.proc.stdin.write(f"{spec}\n".encode("utf-8"))
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:                     # «<spec> missing»
+            return None
+        data = self.proc.stdout.read(int(header[2]))
+        self.proc.stdout.read(1)                 # завершальний \n
+        return data if header[1] == b"blob" else None
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait()
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def check_blob(path: str, data: bytes) -> int:
+    """Перевірки одного staged-файлу; повертає 1, якщо є помилки."""
+    issues = check_encoding.scan(data)
+    if path.endswith(".lua"):
+        issues = [i for i in issues if i.kind in ("invalid-utf8", "nul")]
+    for i in issues:
+        validate_tsv.fail(f"{path}:{i.line} (байт {i.offset}): {i.kind} {i.detail}")
+    if issues or path.endswith(".lua"):
+        return 1 if issues else 0
+
+    try:
+        df = load_tsv(io.BytesIO(data))
+    except ValueError as e:          # EncodingError, ParserError
+        validate_tsv.fail(f"{path}: не вдалося прочитати файл ({e})")
+        return 1
+    return validate_tsv.check_table(path, df)
+
+
+def deploy(dst: Path, blobs: dict[str, bytes], deleted: list[str]) -> None:
+    for path, data in blobs.items():
+        atomic_write(dst / Path(path).relative_to(BASE_DIR), data)
+    for path in deleted:
+        target = dst / Path(path).relative_to(BASE_DIR)
+        if target.exists():
+            target.unlink()
+    print(f"📦 {dst}: оновлено {len(blobs)}, видалено {len(deleted)} файлів.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Перевірка й розгортання лише staged-файлів перекладу.")
+    ap.add_argument("--no-deploy", action="store_true", help="не копіювати файли в DST")
+    args = ap.parse_args(argv)
+    os.chdir(PROJECT_ROOT)
+
+    changed, deleted = staged_paths()
+    if not changed and not deleted:
+        return 0
+
+    exit_code = 0
+    blobs: dict[str, bytes] = {}
+    with BlobReader() as reader:
+        for path in changed:
+            data = reader.read(path)
+            if data is None:
+                validate_tsv.fail(f"{path}: немає в індексі")
+                exit_code = 1
+                continue
+            blobs[path] = data
+            exit_code |= check_blob(path, data)
+
+    if exit_code:
+        print("⚠️  Staged-файли містять помилки — коміт зупинено.")
+        return exit_code
+    print(f"✅ Перевірено staged-файлів: {len(blobs)}.")
+
+    dst = None if args.no_deploy else load_dst()
+    if dst:
+        if not Path(dst).exists():
+            print(f"[ERROR] Target folder does not exist: {dst}")
+            return 1
+        deploy(Path(dst), blobs, deleted)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+provenance.py
+─────────────
+Хто й у якому коміті востаннє змінив переклад кожного рядка — по key, а
+не по номеру рядка.
+
+`git blame` на великих таблицях (building_flavour_texts.loc.tsv тощо)
+повільний і рахує рядки файлу: після злиття гілок, що переставили рядки,
+авторство плутається. Тут індекс будується по key:
+
+  • для кожного коміту з `translation/text/db` (від старих до нових,
+    `git log --topo-order --raw`) беруться старий і новий blob кожного
+    зміненого файлу (один процес `git cat-file --batch`), і рядки
+    порівнюються по key — без pandas, по байтах
+  • у SQLite `_temp/cache/provenance.sqlite` для кожної пари
+    (файл, key, текст) записується коміт, що ПЕРШИМ увів саме такий текст;
+    злиття гілок, перестановки рядків і конфлікти не переписують
+    авторства (нового тексту злиття не містить — нового автора немає)
+  • для HEAD зберігається хеш поточного тексту кожного key, тож
+    «хто автор» — один запит до бази
+  • повторний запуск обробляє лише коміти після останнього оброблених;
+    якщо історію переписано (rebase, force-push) — індекс будується заново
+
+Використання:
+    python scripts/provenance.py update                       # оновити індекс
+    python scripts/provenance.py blame names.loc.tsv          # усі key файлу
+    python scripts/provenance.py blame names.loc.tsv 'names_name_21473*'
+    python scripts/provenance.py stats                        # рядків за авторами
+    python scripts/provenance.py stats --file 'diplomacy*'
+
+blame і stats перед запитом самі оновлюють індекс.
+"""
+
+import argparse, datetime, os, sqlite3, subprocess, sys
+from pathlib import Path
+from typing import Optional
+
+from l10n_tree import CACHE_DIR, text_hash
+from precommit import BlobReader
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TRG_DIR = "translation/text/db"
+DB_PATH = CACHE_DIR / "provenance.sqlite"
+NULL_SHA = "0" * 40
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta     (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS commits  (sha TEXT PRIMARY KEY, author TEXT, email TEXT, time INTEGER, subject TEXT);
+CREATE TABLE IF NOT EXISTS versions (file TEXT, key TEXT, hash TEXT, sha TEXT, PRIMARY KEY (file, key, hash));
+CREATE TABLE IF NOT EXISTS head     (file TEXT, key TEXT, hash TEXT, PRIMARY KEY (file, key));
+"""
+
+
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True).stdout.decode("utf-8")
+
+
+def parse_rows(data: Optional[bytes]) -> dict[bytes, str]:
+    """key → короткий хеш text для кожного рядка blob-а (заголовок пропускається)."""
+    rows: dict[bytes, str] = {}
+    if not data:
+        return rows
+    for line in data.splitlines()[1:]:
+        fields = line.rstrip(b"\r").split(b"\t", 2)
+        if fields[0]:
+            rows[fields[0]] = text_hash(fields[1] if len(fields) > 1 else b"")[:12]
+    return rows
+
+# ── індекс ───────────────────────────────────────────────────────────
+class Provenance:
+    def __init__(self, path: Path = DB_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def update(self) -> int:
+        """Обробляє нові коміти; повертає їхню кількість."""
+        head = git("rev-parse", "HEAD").strip()
+        last = self._meta("head")
+        if last == head:
+            return 0
+        if last and subprocess.run(["git", "merge-base", "--is-ancestor", last, head],
+                                   capture_output=True).returncode != 0:
+            print("–  історію переписано — індекс будується заново")
+            last = None
+        if not last:
+            self.db.executescript("DELETE FROM meta; DELETE FROM commits; DELETE FROM versions; DELETE FROM head;")
+
+        log = git("log", "--reverse", "--topo-order", "-m", "--raw", "--no-renames", "--no-abbrev",
+                  "--format=%x1e%H%x1f%an%x1f%ae%x1f%at%x1f%s",
+                  *([f"{last}..{head}"] if last else [head]), "--", TRG_DIR)
+        commits = set()
+        with BlobReader() as blobs, self.db:
+            for chunk in log.split("\x1e")[1:]:
+                header, *raw = chunk.strip("\n").split("\n")
+                sha, author, email, when, subject = header.split("\x1f", 4)
+                if sha not in commits:
+                    commits.add(sha)
+                    self.db.execute("INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?)",
+                                    (sha, author, email, int(when), subject))
+                for line in raw:
+                    if not line.startswith(":"):
+                        continue
+                    meta, path = line.split("\t", 1)
+                    _, _, old_blob, new_blob, status = meta.split()
+                    if not path.endswith(".loc.tsv") or status == "D":
+                        continue
+                    old = parse_rows(blobs.object(old_blob) if old_blob != NULL_SHA else None)
+                    new = parse_rows(blobs.object(new_blob))
+                    name = Path(path).name
+                    # рядки з новим текстом; якщо такий текст уже був — автор лишається старий
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO versions VALUES (?, ?, ?, ?)",
+                        [(name, k.decode("utf-8", "replace"), h, sha)
+                         for k, h in new.items() if old.get(k) != h])
+            self._refresh_head(blobs, last, head)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,))
+        return len(commits)
+
+    def _refresh_head(self, blobs: BlobReader, last: Optional[str], head: str) -> None:
+        """Поточні хеші текстів HEAD для файлів, змінених з останнього оновлення."""
+        if last:
+            changed = git("diff", "--name-only", "--no-renames", last, head, "--", TRG_DIR).split("\n")
+        else:
+            changed = git("ls-tree", "-r", "--name-only", head, "--", TRG_DIR).split("\n")
+        for path in filter(None, changed):
+            if not path.endswith(".loc.tsv"):
+                continue
+            name = Path(path).name
+            self.db.execute("DELETE FROM head WHERE file = ?", (name,))
+            rows = parse_rows(blobs.object(f"{head}:{path}"))
+            self.db.executemany("INSERT INTO head VALUES (?, ?, ?)",
+                                [(name, k.decode("utf-8", "replace"), h) for k, h in rows.items()])
+
+    # ── запити ───────────────────────────────────────────────────────
+    def blame(self, name: str, key_glob: str = "*") -> list[tuple[str, str, str, int, str]]:
+        """(key, коміт, автор, час, опис коміту) для key файлу в HEAD."""
+        return self.db.execute(
+            "SELECT h.key, c.sha, c.author, c.time, c.subject FROM head h "
+            "JOIN versions v ON v.file = h.file AND v.key = h.key AND v.hash = h.hash "
+            "JOIN commits c ON c.sha = v.sha "
+            "WHERE h.file = ? AND h.key GLOB ? ORDER BY h.rowid", (name, key_glob)).fetchall()
+
+    def stats(self, file_glob: str = "*") -> list[tuple[str, int, int, int]]:
+        """(автор, рядків у HEAD, файлів, час останньої зміни), найбільші першими."""
+        return self.db.execute(
+            "SELECT c.author, COUNT(*), COUNT(DISTINCT h.file), MAX(c.time) FROM head h "
+            "JOIN versions v ON v.file = h.file AND v.key = h.key AND v.hash = h.hash "
+            "JOIN commits c ON c.sha = v.sha "
+            "WHERE h.file GLOB ? GROUP BY c.author ORDER BY COUNT(*) DESC", (file_glob,)).fetchall()
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def date(ts: int) -> str:
+    return datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Авторство перекладу кожного рядка (по key) з історії git.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update", help="обробити нові коміти")
+    p = sub.add_parser("blame", help="автор і коміт кожного key файлу")
+    p.add_argument("file", help="назва *.loc.tsv")
+    p.add_argument("keys", nargs="?", default="*", help="шаблон key (GLOB)")
+    p = sub.add_parser("stats", help="скільки рядків HEAD належить кожному автору")
+    p.add_argument("--file", default="*", help="лише файли за шаблоном")
+    args = ap.parse_args(argv)
+    os.chdir(PROJECT_ROOT)
+
+    prov = Provenance()
+    try:
+        new = prov.update()
+        if new or args.cmd == "update":
+            print(f"–  оброблено нових комітів: {new}")
+        if args.cmd == "blame":
+            rows = prov.blame(Path(args.file).name, args.keys)
+            if not rows:
+                print(f"⚠️  {args.file}: у HEAD немає key за шаблоном {args.keys}")
+                return 1
+            width = max(len(r[2]) for r in rows)
+            for key, sha, author, when, subject in rows:
+                print(f"{sha[:8]}  {date(when)}  {author:<{width}}  {key}")
+        elif args.cmd == "stats":
+            rows = prov.stats(args.file)
+            print(f"{'Автор':<24} {'Рядків':>7} {'Файлів':>7}  Остання зміна")
+            for author, count, files, last in rows:
+                print(f"{author:<24} {count:>7} {files:>7}  {date(last)}")
+    finally:
+        prov.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
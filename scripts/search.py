@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+search.py
+─────────
+Повнотекстовий пошук по EN і UK текстах — щоб швидко побачити, як термін
+уже перекладено деінде.
+
+Індекс — SQLite FTS5 (інвертований індекс) у `_temp/cache/search.sqlite`:
+один запис на key з EN-текстом з `_upstream/en/text/db` і UK-текстом з
+`translation/text/db`. Розмітка [[col:…]], {{tr:…}} не індексується.
+Перед кожним запитом звіряються відбитки файлів (розмір + mtime), і
+переіндексуються лише змінені пари файлів, тож індекс завжди актуальний,
+а запит — мілісекунди.
+
+Запит:
+  • слова       — усі мають бути в тексті (регістр не важливий)
+  • слово*      — префікс: `фракц*` знайде «фракція», «фракцією» …
+  • "кілька слів" — фраза (у shell — в одинарних лапках: '"римська республіка"')
+  • OR          — між словами: `legion OR legio`
+
+Фільтри:
+  --lang en|uk  — шукати лише в EN або лише в UK тексті
+  --key GLOB    — лише key, що відповідають шаблону: `--key 'names_*'`
+  --file GLOB   — лише файли: `--file 'diplomacy*'`
+
+Використання:
+    python scripts/search.py legion
+    python scripts/search.py '"client state"' --lang en
+    python scripts/search.py 'сатрап*' --lang uk --key 'regions_*' --limit 100
+    python scripts/search.py --rebuild                      # перебудувати індекс
+"""
+
+import argparse, re, shutil, sqlite3, sys, time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from l10n_tree import CACHE_DIR, Tree, file_signature
+
+SRC_DIR  = Path("_upstream/en/text/db")
+TRG_DIR  = Path("translation/text/db")
+INDEX_DB = CACHE_DIR / "search.sqlite"
+VERSION  = "1"                               # змініть, якщо змінюєте схему
+
+MARKUP_RE = re.compile(r"\[\[[^\]]*\]\]|\{\{[^}]*\}\}")
+TOKEN_RE  = re.compile(r'"[^"]*"|\S+')
+
+# ── індекс ───────────────────────────────────────────────────────────
+class SearchIndex:
+    """FTS5-індекс пар EN/UK з інкрементальним оновленням по файлах."""
+
+    def __init__(self, path: Path = INDEX_DB) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != int(VERSION):
+            self.db.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS strings;")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, sig TEXT);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS strings USING fts5("
+            " name UNINDEXED, key UNINDEXED, en_raw UNINDEXED, uk_raw UNINDEXED, en, uk,"
+            " tokenize = 'unicode61 remove_diacritics 0');"
+            f"PRAGMA user_version = {VERSION};")
+
+    def clear(self) -> None:
+        self.db.executescript("DELETE FROM files; DELETE FROM strings;")
+
+    def _index_file(self, tree: Tree, name: str) -> None:
+        src, trg = SRC_DIR / name, TRG_DIR / name
+        en = dict(zip(*(tree.table(src)[c] for c in ("key", "text")))) if tree.exists(src) else {}
+        uk = dict(zip(*(tree.table(trg)[c] for c in ("key", "text")))) if tree.exists(trg) else {}
+        rows = []
+        for key in {**en, **uk}:
+            if not key.strip() or key.startswith("#Loc;"):
+                continue
+            en_text, uk_text = en.get(key, ""), uk.get(key, "")
+            rows.append((name, key, en_text, uk_text,
+                         MARKUP_RE.sub(" ", en_text), MARKUP_RE.sub(" ", uk_text)))
+        self.db.execute("DELETE FROM strings WHERE name = ?", (name,))
+        self.db.executemany("INSERT INTO strings VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def update(self, tree: Tree) -> int:
+        """Переіндексовує змінені пари файлів; повертає їхню кількість."""
+        names = sorted({p.name for p in tree.files(SRC_DIR)} | {p.name for p in tree.files(TRG_DIR)})
+        known = dict(self.db.execute("SELECT name, sig FROM files"))
+        changed = 0
+        with self.db:
+            for name in names:
+                sig = f"{file_signature(SRC_DIR / name)}|{file_signature(TRG_DIR / name)}"
+                if known.pop(name, None) == sig:
+                    continue
+                self._index_file(tree, name)
+                self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?)", (name, sig))
+                changed += 1
+            for name in known:                       # файли, яких більше немає
+                self.db.execute("DELETE FROM strings WHERE name = ?", (name,))
+                self.db.execute("DELETE FROM files WHERE name = ?", (name,))
+        return changed
+
+    def search(self, query: str, lang: Optional[str] = None, key_glob: Optional[str] = None,
+               file_glob: Optional[str] = None, limit: int = 50) -> list["Hit"]:
+        match = fts_query(query)
+        if lang:
+            match = f"{{{lang}}} : ({match})"
+        sql = "SELECT name, key, en_raw, uk_raw FROM strings WHERE strings MATCH ?"
+        params: list = [match]
+        if key_glob:
+            sql += " AND key GLOB ?"
+            params.append(key_glob)
+        if file_glob:
+            sql += " AND name GLOB ?"
+            params.append(file_glob)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return [Hit(*row) for row in self.db.execute(sql, params)]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class Hit(NamedTuple):
+    file: str
+    key: str
+    en: str
+    uk: str
+
+
+def fts_query(query: str) -> str:
+    """Запит користувача → синтаксис FTS5; кожне слово береться в лапки,
+    щоб пунктуація (don't, 1.2) не ламала розбір."""
+    parts = []
+    for tok in TOKEN_RE.findall(query):
+        if tok in ("OR", "AND", "NOT"):
+            parts.append(tok)
+        elif tok.startswith('"'):
+            phrase = tok.strip('"').replace('"', "")
+            if phrase:
+                parts.append(f'"{phrase}"')
+        else:
+            prefix = tok.endswith("*")
+            word = tok.rstrip("*").replace('"', "")
+            if word:
+                parts.append(f'"{word}"' + ("*" if prefix else ""))
+    if not parts:
+        raise SystemExit("⛔  Порожній запит.")
+    return " ".join(parts)
+
+# ── вивід ────────────────────────────────────────────────────────────
+def clip(text: str, width: int) -> str:
+    text = text.replace("\\n", " ").replace("\n", " ")
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def print_hits(hits: list[Hit], full: bool = False) -> None:
+    col = max(20, (shutil.get_terminal_size().columns - 7) // 2)
+    for h in hits:
+        print(f"{h.file}:{h.key}")
+        if full:
+            print(f"   EN: {h.en}\n   UK: {h.uk}")
+        else:
+            print(f"   {clip(h.en, col):<{col}} │ {clip(h.uk, col)}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Повнотекстовий пошук по EN і UK текстах.")
+    ap.add_argument("query", nargs="*", help="слова, слово*, \"фраза\", OR")
+    ap.add_argument("--lang", choices=("en", "uk"), help="шукати лише в цій мові")
+    ap.add_argument("--key", metavar="GLOB", help="лише key за шаблоном")
+    ap.add_argument("--file", metavar="GLOB", help="лише файли за шаблоном")
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--full", action="store_true", help="повні тексти, одне під одним")
+    ap.add_argument("--rebuild", action="store_true", help="перебудувати індекс з нуля")
+    args = ap.parse_args(argv)
+
+    index = SearchIndex()
+    if args.rebuild:
+        index.clear()
+    changed = index.update(Tree())
+    if changed:
+        print(f"–  переіндексовано файлів: {changed}")
+    if not args.query:
+        index.close()
+        return 0
+
+    started = time.perf_counter()
+    try:
+        hits = index.search(" ".join(args.query), args.lang, args.key, args.file, args.limit)
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"⛔  Некоректний запит: {e}")
+    finally:
+        index.close()
+    print_hits(hits, args.full)
+    more = " (показано перші; див. --limit)" if len(hits) == args.limit else ""
+    print(f"\nЗнайдено: {len(hits)}{more} за {(time.perf_counter() - started) * 1000:.0f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
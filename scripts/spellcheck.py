@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+spellcheck.py
+─────────────
+Перевірка орфографії колонки text у translation/text/db по всьому дереву.
+
+Словник:
+  • основний — список словоформ української, по одній у рядку (напр.
+    повний список словоформ проєкту brown-uk/dict_uk), за замовчуванням
+    `_dict/uk.txt` (можна .gz); у git не комітиться
+  • проєктний — `spelling_words.txt` у корені репозиторію: імена, назви,
+    терміни гри, яких немає в загальному словнику (комітиться)
+
+З усіх слів один раз будується мінімальний автомат (DAWG: спільні
+префікси й суфікси словоформ зберігаються один раз) і кешується в
+`_temp/cache/spell_<хеш словників>.npz`; наступні запуски лише
+завантажують масиви.
+
+Перевіряється лише колонка text: розмітка [[col:…]], {{tr:…}},
+плейсхолдери %d / %1 і \\n пропускаються, слова без кирилиці (англійські
+назви, неперекладені рядки) не перевіряються. Унікальні слова
+перевіряються паралельно в пулі процесів; для помилок — до 3 підказок
+на відстані редагування 1 (`--distance 2` — глибше, але помітно довше).
+
+Результати кешуються по рядках (хеш тексту), тож повторний запуск
+перевіряє лише змінені рядки змінених файлів.
+
+Використання:
+    python scripts/spellcheck.py                              # усе дерево
+    python scripts/spellcheck.py names.loc.tsv regions.loc.tsv
+    python scripts/spellcheck.py --wordlist ~/dict_uk/words.txt.gz --json spell.json
+    python scripts/spellcheck.py --distance 0                 # без підказок (найшвидше)
+
+Код виходу 1, якщо знайдено помилки.
+"""
+
+import argparse, bisect, gzip, json, os, re, sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+
+from l10n_tree import CACHE_DIR, FileCache, Tree, file_signature, text_hash
+
+TRG_DIR   = Path("translation/text/db")
+WORDLIST  = Path("_dict/uk.txt")
+PROJECT_WORDS = Path("spelling_words.txt")
+
+SKIP_TEXTS = {"", "PLACEHOLDER", "placeholder", "text_rejected"}
+MARKUP_RE  = re.compile(r"\[\[[^\]]*\]\]|\{\{[^}]*\}\}|%\w|\\n|\\t|https?://\S+")
+WORD_RE    = re.compile(r"[^\W\d_]+(?:['’ʼ-][^\W\d_]+)*")
+CYRILLIC_RE = re.compile(r"[а-яіїєґА-ЯІЇЄҐ]")
+APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'"})
+MAX_SUGGESTIONS = 3
+
+# ── словник-автомат ──────────────────────────────────────────────────
+def normalize(word: str) -> str:
+    return word.translate(APOSTROPHES)
+
+
+def read_words(path: Path) -> Iterable[str]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            word = line.split("/", 1)[0].strip()         # «слово/прапорці» hunspell — без прапорців
+            if word and not word.startswith("#"):
+                yield normalize(word)
+
+
+def build_dawg(words: Iterable[str]) -> dict[str, np.ndarray]:
+    """Мінімальний автомат (алгоритм Дацюка для відсортованого списку)."""
+    finals: list[bool] = [False]
+    edges: list[dict[str, int]] = [{}]
+    register: dict[tuple, int] = {}
+    unchecked: list[tuple[int, str, int]] = []          # (батько, літера, дитина)
+    prev = ""
+
+    def minimize(down_to: int) -> None:
+        while len(unchecked) > down_to:
+            parent, ch, child = unchecked.pop()
+            sig = (finals[child], tuple(sorted(edges[child].items())))
+            if sig in register:
+                edges[parent][ch] = register[sig]
+            else:
+                register[sig] = child
+
+    for word in sorted(set(words)):
+        common = 0
+        for a, b in zip(word, prev):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else 0
+        for ch in word[common:]:
+            finals.append(False)
+            edges.append({})
+            edges[node][ch] = len(edges) - 1
+            unchecked.append((node, ch, len(edges) - 1))
+            node = len(edges) - 1
+        finals[node] = True
+        prev = word
+    minimize(0)
+
+    # лише досяжні вузли, компактно: ребра вузла n — first[n]:first[n+1]
+    order, index = [0], {0: 0}
+    for node in order:
+        for child in edges[node].values():
+            if child not in index:
+                index[child] = len(order)
+                order.append(child)
+    first, labels, targets = [0], [], []
+    for node in order:
+        for ch, child in sorted(edges[node].items()):
+            labels.append(ord(ch))
+            targets.append(index[child])
+        first.append(len(labels))
+    return {"first": np.array(first, dtype=np.int32), "labels": np.array(labels, dtype=np.uint32),
+            "targets": np.array(targets, dtype=np.int32),
+            "finals": np.array([finals[n] for n in order], dtype=bool)}
+
+
+class Dictionary:
+    """Перевірка слова й підказки за автоматом."""
+
+    def __init__(self, arrays: Mapping) -> None:
+        self.first = arrays["first"].tolist()
+        self.labels = arrays["labels"].tolist()
+        self.targets = arrays["targets"].tolist()
+        self.finals = arrays["finals"].tolist()
+
+    def _child(self, node: int, ch: str) -> int:
+        lo, hi = self.first[node], self.first[node + 1]
+        i = bisect.bisect_left(self.labels, ord(ch), lo, hi)
+        return self.targets[i] if i < hi and self.labels[i] == ord(ch) else -1
+
+    def __contains__(self, word: str) -> bool:
+        node = 0
+        for ch in word:
+            node = self._child(node, ch)
+            if node < 0:
+                return False
+        return self.finals[node]
+
+    def known(self, word: str) -> bool:
+        word = normalize(word)
+        if word in self or word.lower() in self or word.capitalize() in self:
+            return True
+        # складні слова через дефіс — кожна частина окремо
+        return "-" in word and all(p and self.known(p) for p in word.split("-"))
+
+    def suggest(self, word: str, max_dist: int) -> list[str]:
+        """Слова на відстані Левенштейна ≤ max_dist (найближчі першими)."""
+        target = normalize(word).lower()
+        found: list[tuple[int, str]] = []
+        stack = [(0, "", list(range(len(target) + 1)))]
+        while stack:
+            node, prefix, row = stack.pop()
+            if self.finals[node] and row[-1] <= max_dist:
+                found.append((row[-1], prefix))
+            for i in range(self.first[node], self.first[node + 1]):
+                ch = chr(self.labels[i])
+                low = ch.lower()                  # регістр не рахується як помилка
+                new = [row[0] + 1]
+                for j, tc in enumerate(target, 1):
+                    new.append(min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (tc != low)))
+                if min(new) <= max_dist:
+                    stack.append((self.targets[i], prefix + ch, new))
+        found.sort()
+        result = list(dict.fromkeys(w if not word[:1].isupper() else w[:1].upper() + w[1:]
+                                    for _, w in found if w.lower() != target))
+        return result[:MAX_SUGGESTIONS]
+
+
+def dictionary_sources(wordlist: Path) -> list[Path]:
+    return [p for p in (wordlist, PROJECT_WORDS) if p.exists()]
+
+
+def load_arrays(sources: list[Path]) -> tuple[Path, str]:
+    """Шлях до кешованого автомата (будує, якщо словники змінилися) і його хеш."""
+    digest = text_hash("|".join(f"{p}:{file_signature(p)}" for p in sources).encode("utf-8"))[:16]
+    cached = CACHE_DIR / f"spell_{digest}.npz"
+    if not cached.exists():
+        print(f"–  будую словник з {', '.join(map(str, sources))}…")
+        words = (w for p in sources for w in read_words(p))
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for old in CACHE_DIR.glob("spell_*.npz"):
+            old.unlink()
+        np.savez(cached, **build_dawg(words))
+    return cached, digest
+
+# ── перевірка слів (у пулі процесів) ─────────────────────────────────
+_dict: Optional[Dictionary] = None
+_distance = 1
+
+
+def _init_worker(path: Path, distance: int) -> None:
+    global _dict, _distance
+    with np.load(path) as arrays:
+        _dict = Dictionary(arrays)
+    _distance = distance
+
+
+def _check_words(words: list[str]) -> dict[str, list[str]]:
+    """Невідомі слова з підказками."""
+    bad = {}
+    for w in words:
+        if not _dict.known(w):
+            bad[w] = _dict.suggest(w, _distance) if _distance else []
+    return bad
+
+
+def check_words(words: list[str], dawg_path: Path, jobs: int, distance: int = 1) -> dict[str, list[str]]:
+    if not words:
+        return {}
+    if jobs <= 1 or len(words) < 1000:
+        _init_worker(dawg_path, distance)
+        return _check_words(words)
+    chunks = [words[i::jobs * 4] for i in range(jobs * 4)]
+    bad: dict[str, list[str]] = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(dawg_path, distance)) as pool:
+        for part in pool.map(_check_words, chunks):
+            bad.update(part)
+    return bad
+
+# ── дерево ───────────────────────────────────────────────────────────
+def tokens(text: str) -> list[str]:
+    return [w for w in WORD_RE.findall(MARKUP_RE.sub(" ", text)) if CYRILLIC_RE.search(w)]
+
+
+def check_tree(tree: Tree, wordlist: Path = WORDLIST, files: list[str] = (),
+               jobs: int = os.cpu_count(), distance: int = 1) -> list[tuple[str, str, str, list[str]]]:
+    """Помилки (file, key, слово, підказки)."""
+    sources = dictionary_sources(wordlist)
+    dawg_path, digest = load_arrays(sources)
+    cache = FileCache("spell", salt=f"{digest}:{distance}")
+    dirty = set(tree.dirty)
+    names = files or [p.name for p in tree.files(TRG_DIR)]
+
+    # рядки до перевірки: лише ті, чий текст змінився з минулого запуску
+    per_file: dict[str, dict[str, list]] = {}
+    todo: dict[tuple[str, str], list[str]] = {}
+    for name in names:
+        path = TRG_DIR / name
+        if not tree.exists(path):
+            continue
+        entry = None if path in dirty else cache.get(name, path)
+        if entry is not None:
+            per_file[name] = entry
+            continue
+        old = (cache.entries.get(name) or {}).get("value", {})
+        rows = {}
+        df = tree.table(path)
+        for key, text in zip(df["key"], df["text"]):
+            if not key.strip() or key.startswith("#Loc;") or text in SKIP_TEXTS:
+                continue
+            h = text_hash(text.encode("utf-8"))[:12]
+            if key in old and old[key][0] == h:
+                rows[key] = old[key]
+            else:
+                rows[key] = [h, None]
+                todo[(name, key)] = tokens(text)
+        per_file[name] = rows
+
+    unique = sorted({w for ws in todo.values() for w in ws})
+    bad = check_words(unique, dawg_path, jobs, distance)
+    for (name, key), ws in todo.items():
+        per_file[name][key][1] = {w: bad[w] for w in dict.fromkeys(ws) if w in bad}
+
+    for name, rows in per_file.items():
+        if TRG_DIR / name not in dirty:
+            cache.put(name, rows, TRG_DIR / name)
+    cache.save()
+    return [(name, key, word, sugg) for name, rows in per_file.items()
+            for key, (_, found) in rows.items() for word, sugg in found.items()]
+
+
+def print_errors(result: list[tuple[str, str, str, list[str]]]) -> None:
+    for name, key, word, sugg in result:
+        hint = f" → {', '.join(sugg)}" if sugg else ""
+        print(f"❌ {name}:{key}  «{word}»{hint}")
+    if result:
+        words = len({r[2] for r in result})
+        print(f"\n⚠️  Можливих помилок: {len(result)} ({words} різних слів). "
+              f"Правильні назви й терміни додайте в {PROJECT_WORDS}.")
+    else:
+        print("✅ Орфографічних помилок не знайдено.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Орфографія колонки text у translation/text/db.")
+    ap.add_argument("files", nargs="*", help="лише ці *.loc.tsv (назви файлів)")
+    ap.add_argument("--wordlist", type=Path, default=WORDLIST, help="словоформи, по одній у рядку (.txt / .gz)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="кількість процесів")
+    ap.add_argument("--distance", type=int, default=1, choices=(0, 1, 2),
+                    help="макс. відстань редагування для підказок (0 — без підказок)")
+    ap.add_argument("--json", metavar="PATH", help="записати помилки в JSON")
+    args = ap.parse_args(argv)
+
+    if not args.wordlist.exists():
+        print(f"⛔  Немає словника {args.wordlist} — див. опис на початку scripts/spellcheck.py.")
+        return 1
+    result = check_tree(Tree(), args.wordlist, args.files, args.jobs, args.distance)
+    print_errors(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(
+            [{"file": f, "key": k, "word": w, "suggestions": s} for f, k, w, s in result],
+            ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
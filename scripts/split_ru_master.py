@@ -22,33 +22,40 @@ split_ru_master.py
      підставляє переклади.
 
 *Службовий рядок `#Loc;…` та порожні `key` не змінюються.*
+
+Потоковий режим (`--stream`) — для малих CI-контейнерів
+──────────────────────────────────────────────────────
+Master-файл не завантажується цілком:
+  1. з EN-файлів будується лише мапа маршрутизації key → файл;
+  2. master читається порціями по `--chunk-rows` рядків, кожен рядок
+     одразу йде в буфер свого файлу; буфери скидаються на диск
+     (`_temp/cache/split_ru/<file>`), щойно разом перевищать
+     `--buffer-rows` рядків;
+  3. далі файли обробляються по одному — у пам'яті лише RU-рядки
+     поточного файлу.
+Пікова пам'ять обмежена розміром порції та найбільшого файлу db, а не
+всього master-файлу.
+
+Використання:
+    python scripts/split_ru_master.py                    # усі файли
+    python scripts/split_ru_master.py factions.loc.tsv   # лише вказані
+    python scripts/split_ru_master.py --stream --chunk-rows 20000
 """
 
-import sys
+import argparse, shutil, sys
 from pathlib import Path
+from typing import Mapping, Optional
+
 import pandas as pd
 
+from l10n_tree import CACHE_DIR, READ_KW, load_tsv, patch_rows
+
 ROOT_EN     = Path("_upstream/en/text/db")
 ROOT_RU_DB  = Path("_upstream/ru/origin/text/db")
 RU_MASTER   = Path("_upstream/ru/localisation/localisation.loc.tsv")
+SPILL_DIR   = CACHE_DIR / "split_ru"
 
-def load(p: Path) -> pd.DataFrame:
-    return pd.read_csv(
-        p, sep="\t", dtype=str,
-        keep_default_na=False, na_filter=False
-    )
-
-# ── 1. master-словник ────────────────────────────────────────────────
-if not RU_MASTER.exists():
-    sys.exit("⛔  _upstream/ru/localisation/localisation.loc.tsv не знайдено.")
-
-master_df = load(RU_MASTER)
-ru_master = dict(zip(master_df["key"], master_df["text"]))
-
-# ── 2. список EN-файлів як еталон структури ─────────────────────────
-targets = [p.name for p in ROOT_EN.glob("*.loc.tsv")]
-
-def process(fname: str) -> None:
+def process(fname: str, ru_master: Mapping[str, str]) -> None:
     path_en  = ROOT_EN   / fname
     path_ru  = ROOT_RU_DB / fname
 
@@ -56,14 +63,11 @@ def process(fname: str) -> None:
         print(f"⚠️  {fname}: немає EN-еталона, пропуск.")
         return
 
-    en_df = load(path_en)
+    en_df = load_tsv(path_en)
 
-    # якщо RU-файлу немає — створюємо копію EN-файлу
-    if path_ru.exists():
-        ru_df = load(path_ru)
-    else:
-        path_ru.parent.mkdir(parents=True, exist_ok=True)
-        ru_df = en_df.copy()
+    # якщо RU-файлу немає — працюємо з копією EN-файлу
+    exists = path_ru.exists()
+    ru_df = load_tsv(path_ru) if exists else en_df
 
     # маска «можна редагувати»
     editable = (
@@ -71,7 +75,7 @@ def process(fname: str) -> None:
             ~ru_df["key"].str.startswith("#Loc;")
     )
 
-    updated = 0
+    edits: dict[str, str] = {}
     for idx in ru_df.index[editable]:
         k        = ru_df.at[idx, "key"]
         text_en  = en_df.at[idx, "text"]
@@ -79,15 +83,103 @@ def process(fname: str) -> None:
         text_cur = ru_df.at[idx, "text"]
 
         if text_ru and (text_cur == text_en or text_cur == "") and text_ru != text_en:
-            ru_df.at[idx, "text"] = text_ru
-            updated += 1
+            edits[k] = text_ru
+    updated = len(edits)
 
-    if updated or not path_ru.exists():
-        ru_df.to_csv(path_ru, sep="\t", index=False, na_rep="")
+    if updated or not exists:
+        # новий RU-файл — байт-у-байт копія EN із підставленими рядками
+        patch_rows(path_ru if exists else path_en, edits, dst=path_ru)
         print(f"✅ {fname}: записано {updated} рядків.")
     else:
         print(f"–  {fname}: оновлення не потрібне.")
 
+# ── звичайний режим: master цілком у словник ─────────────────────────
+def run_in_memory(targets: list[str]) -> None:
+    master_df = load_tsv(RU_MASTER)
+    ru_master = dict(zip(master_df["key"], master_df["text"]))
+    del master_df
+    for f in targets:
+        process(f, ru_master)
+
+# ── потоковий режим ──────────────────────────────────────────────────
+def build_routing(targets: list[str]) -> dict[str, tuple[str, ...]]:
+    """key → назви файлів db, у яких він є (читається лише колонка key EN-файлів).
+
+    Key, що трапляється в кількох EN-файлах, потрапляє в кожен з них — як
+    і в звичайному режимі.
+    """
+    routing: dict[str, tuple[str, ...]] = {}
+    for fname in targets:
+        path_en = ROOT_EN / fname
+        if path_en.exists():
+            for k in pd.read_csv(path_en, usecols=["key"], **READ_KW)["key"].drop_duplicates():
+                routing[k] = routing.get(k, ()) + (fname,)
+    return routing
+
+def spill(buffers: dict[str, list[str]]) -> None:
+    """Дописує буфери у файли-кошики й очищає їх."""
+    for fname, lines in buffers.items():
+        with open(SPILL_DIR / fname, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+    buffers.clear()
+
+def load_bucket(fname: str) -> dict[str, str]:
+    path = SPILL_DIR / fname
+    if not path.exists():
+        return {}
+    bucket = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            k, _, text = line.rstrip("\n").partition("\t")
+            bucket[k] = text
+    return bucket
+
+def run_streaming(targets: list[str], chunk_rows: int, buffer_rows: int) -> None:
+    routing = build_routing(targets)
+
+    shutil.rmtree(SPILL_DIR, ignore_errors=True)
+    SPILL_DIR.mkdir(parents=True)
+
+    buffers: dict[str, list[str]] = {}
+    buffered = 0
+    for chunk in pd.read_csv(RU_MASTER, usecols=["key", "text"], chunksize=chunk_rows, **READ_KW):
+        for k, text in zip(chunk["key"], chunk["text"]):
+            for fname in routing.get(k, ()):
+                buffers.setdefault(fname, []).append(f"{k}\t{text}\n")
+                buffered += 1
+        if buffered >= buffer_rows:
+            spill(buffers)
+            buffered = 0
+    spill(buffers)
+    del routing
+
+    try:
+        for f in targets:
+            process(f, load_bucket(f))
+    finally:
+        shutil.rmtree(SPILL_DIR, ignore_errors=True)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Розкидає RU master-локалізацію по файлах db.")
+    ap.add_argument("files", nargs="*", help="лише ці файли (за замовчуванням — усі EN-файли)")
+    ap.add_argument("--stream", action="store_true", help="потоковий режим з обмеженою пам'яттю")
+    ap.add_argument("--chunk-rows", type=int, default=50_000, help="рядків master за одне читання")
+    ap.add_argument("--buffer-rows", type=int, default=200_000, help="скільки рядків тримати в буферах")
+    args = ap.parse_args(argv)
+
+    # ── 1. master-файл ───────────────────────────────────────────────
+    if not RU_MASTER.exists():
+        print("⛔  _upstream/ru/localisation/localisation.loc.tsv не знайдено.")
+        return 1
+
+    # ── 2. список EN-файлів як еталон структури ──────────────────────
+    targets = args.files or [p.name for p in sorted(ROOT_EN.glob("*.loc.tsv"))]
+
+    if args.stream:
+        run_streaming(targets, args.chunk_rows, args.buffer_rows)
+    else:
+        run_in_memory(targets)
+    return 0
+
 if __name__ == "__main__":
-    for f in sys.argv[1:] or targets:
-        process(f)
+    sys.exit(main())
@@ -152,6 +152,43 @@ def sync_lua_files(upstream_dir: Path, translation_dir: Path) -> Tuple[int, int,
     
     return files_copied, files_skipped, deleted_files
 
+def sync_lua_tree(tree, upstream_dir: Path, translation_dir: Path) -> Tuple[int, int, List[str]]:
+    """
+    Same as sync_lua_files(), but stages the copies in an l10n_tree.Tree
+    instead of writing them to disk.
+
+    Nothing is written until tree.flush(), so a failing later stage or
+    --dry-run in l10n.py leaves the translated Lua files untouched.
+
+    Returns:
+        Tuple (files_changed, files_skipped, deleted_files) as in sync_lua_files()
+    """
+    if not upstream_dir.exists():
+        print(f"Error: Upstream directory {upstream_dir} does not exist!")
+        return 0, 0, []
+
+    upstream_lua_files = find_lua_files(upstream_dir)
+    translation_lua_files = find_lua_files(translation_dir)
+    files_changed = files_skipped = 0
+    for upstream_file in sorted(upstream_lua_files):
+        relative_path = get_relative_path(upstream_file, upstream_dir)
+        target_file = translation_dir / relative_path
+        if not tree.exists(target_file):
+            files_skipped += 1
+            continue
+        text = tree.text(upstream_file)
+        if tree.text(target_file) != text:
+            tree.put_text(target_file, text)
+            files_changed += 1
+
+    upstream_lua_set = {get_relative_path(f, upstream_dir) for f in upstream_lua_files}
+    deleted_files = [str(get_relative_path(f, translation_dir)) for f in translation_lua_files
+                     if get_relative_path(f, translation_dir) not in upstream_lua_set]
+    print(f"Lua files from upstream: {files_changed} changed, {files_skipped} skipped (not in translation)")
+    for deleted_file in sorted(deleted_files):
+        print(f"⚠️  Deleted from upstream: {deleted_file}")
+    return files_changed, files_skipped, deleted_files
+
 def main():
     """
     Main function that orchestrates the sync process.
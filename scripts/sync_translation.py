@@ -24,19 +24,15 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 SRC = os.path.join(PROJECT_ROOT, 'translation')
 ENV_FILE = os.path.join(PROJECT_ROOT, '.env')
 
-# Load .env manually
-if os.path.exists(ENV_FILE):
-    with open(ENV_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            if '=' in line:
-                key, value = line.strip().split('=', 1)
-                os.environ[key] = value
-
-DST = os.environ.get("DST")
-
-if not DST:
-    print("[ERROR] 'DST' not set in .env file.")
-    exit(1)
+def load_dst():
+    """Load .env manually and return the DST path (or None if it is not set)."""
+    if os.path.exists(ENV_FILE):
+        with open(ENV_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                if '=' in line:
+                    key, value = line.strip().split('=', 1)
+                    os.environ[key] = value
+    return os.environ.get("DST")
 
 def clear_folder(folder, src):
     # Delete only those folders that exist in SRC
@@ -76,15 +72,24 @@ def copytree(src, dst):
             except Exception as e:
                 print(f'    [ERROR] Failed to copy file {s} -> {d}. Reason: {e}')
 
-def main():
+def sync(dst):
+    """Copy translation/ into dst; returns an exit code."""
     print(f"SRC: {SRC}")
-    print(f"DST: {DST}")
-    if not os.path.exists(DST):
-        print(f"[ERROR] Target folder does not exist: {DST}\nCreate this folder or change the path in scripts/sync_translation.py")
+    print(f"DST: {dst}")
+    if not os.path.exists(dst):
+        print(f"[ERROR] Target folder does not exist: {dst}\nCreate this folder or change the path in scripts/sync_translation.py")
+        return 1
+    clear_folder(dst, SRC)
+    copytree(SRC, dst)
+    print(f'Synchronization completed: {SRC} -> {dst}')
+    return 0
+
+def main():
+    dst = load_dst()
+    if not dst:
+        print("[ERROR] 'DST' not set in .env file.")
         exit(1)
-    clear_folder(DST, SRC)
-    copytree(SRC, DST)
-    print(f'Synchronization completed: {SRC} -> {DST}')
+    exit(sync(dst))
 
 if __name__ == '__main__':
     main()
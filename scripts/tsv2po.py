@@ -21,20 +21,29 @@ tsv2po.py
           --srcdir _upstream/en/text/db \
           --trgdir translation/text/db \
           --outdir _tmp
+
+  Пари файлів конвертуються паралельно (`-j/--jobs`, за замовчуванням —
+  кількість ядер).
+
+Биті рядки (не 3 колонки, невалідний UTF-8) не пропускаються мовчки:
+для кожного файлу виводиться номер рядка й причина. Рядок з 2 колонками
+(немає tooltip) потрапляє в PO, з більш ніж 3 — пропускається.
+
+Колонка tooltip зберігається в PO як коментар `#. tooltip: <значення>`
+(значення з файлу перекладу, а якщо key там немає — з оригіналу).
+
+PO-файл перезаписується лише тоді, коли змінилося щось, крім дати в
+заголовку.
 """
 
-import argparse, csv, datetime
+import argparse, datetime, os, re, sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import pandas as pd
+from typing import NamedTuple, Optional
 
-# ── CLI ───────────────────────────────────────────────────────────────
-ap = argparse.ArgumentParser()
-ap.add_argument("--src", help="оригінальний TSV")
-ap.add_argument("--trg", help="TSV з перекладом")
-ap.add_argument("--srcdir", help="каталог оригіналів")
-ap.add_argument("--trgdir", help="каталог перекладів")
-ap.add_argument("--outdir", default="po", help="куди класти po-файли")
-args = ap.parse_args()
+from l10n_tree import atomic_write
+
+DATE_RE = re.compile(r'^"POT-Creation-Date: [^"]*"\n', re.M)
 
 # ── екрануємо символи ───────────────────────────────────────────────
 def po_escape(txt: str) -> str:
@@ -47,14 +56,30 @@ def po_escape(txt: str) -> str:
     )
 
 
-# ── утиліта читання TSV → DataFrame ──────────────────────────────────
-def read_tsv(p: Path) -> pd.DataFrame:
-    return pd.read_csv(
-        p, sep="\t", dtype=str,
-        names=["key", "text", "tooltip"],
-        header=0, keep_default_na=False, na_filter=False,
-        engine="python", on_bad_lines="skip"
-    )
+# ── читання TSV ──────────────────────────────────────────────────────
+def read_tsv(p: Path) -> tuple[list[list[str]], list[str]]:
+    """Повертає (рядки [key, text, tooltip], опис битих рядків «N: причина»)."""
+    rows, problems = [], []
+    with open(p, "rb") as f:
+        next(f, None)                                   # заголовок
+        for lineno, raw in enumerate(f, 2):
+            raw = raw.rstrip(b"\r\n")
+            if not raw:
+                continue
+            try:
+                line = raw.decode("utf-8")
+            except UnicodeDecodeError as e:
+                problems.append(f"{lineno}: невалідний UTF-8 (байт {e.start}) — рядок пропущено")
+                continue
+            fields = line.split("\t")
+            if len(fields) == 3:
+                rows.append(fields)
+            elif len(fields) == 2:
+                problems.append(f"{lineno}: немає колонки tooltip")
+                rows.append(fields + [""])
+            else:
+                problems.append(f"{lineno}: {len(fields)} колонок замість 3 — рядок пропущено")
+    return rows, problems
 
 # ── PO-заголовок ─────────────────────────────────────────────────────
 def po_header(filename: str) -> str:
@@ -69,14 +94,15 @@ def po_header(filename: str) -> str:
         f'"X-Source-File: {filename}\\n"\n\n'
     )
 
-# ── функція конвертації DataFrame у PO-текст ─────────────────────────
-def df_to_po(src_df: pd.DataFrame, trg_df: pd.DataFrame, src_name: str) -> str:
-    src_map = dict(zip(src_df["key"], src_df["text"]))
-    trg_map = dict(zip(trg_df["key"], trg_df["text"]))
+# ── функція конвертації рядків у PO-текст ────────────────────────────
+def rows_to_po(src_rows: list[list[str]], trg_rows: list[list[str]], src_name: str) -> str:
+    src_map = {r[0]: r[1] for r in src_rows}
+    trg_map = {r[0]: r[1] for r in trg_rows}
+    tooltips = {r[0]: r[2] for r in src_rows}
+    tooltips.update((r[0], r[2]) for r in trg_rows)
 
     lines = [po_header(src_name)]
     for k, src_txt in src_map.items():
-        tr_txt = trg_map.get(k, "")
         # пропускаємо службові та порожні ключі
         if not k or k.startswith("#Loc;"):
             continue
@@ -84,41 +110,95 @@ def df_to_po(src_df: pd.DataFrame, trg_df: pd.DataFrame, src_name: str) -> str:
         msgid = po_escape(src_txt)
         msgstr = po_escape(trg_map.get(k, ""))
 
+        lines.append(f'#. tooltip: {tooltips[k]}')
         lines.append(f'msgctxt "{k}"')
         lines.append(f'msgid "{msgid}"')
         lines.append(f'msgstr "{msgstr}"\n')
     return "\n".join(lines)
 
-# ── конвертер одного файлу ───────────────────────────────────────────
-def convert_single(src: Path, trg: Path, out: Path):
-    src_df, trg_df = read_tsv(src), read_tsv(trg)
-    po_text = df_to_po(src_df, trg_df, src.name)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(po_text, encoding="utf-8")
-    # ― акуратний вивід шляху ―
+# ── конвертер однієї пари ────────────────────────────────────────────
+class Result(NamedTuple):
+    out: Path
+    written: bool
+    problems: list[str]        # «<файл>:<рядок>: причина»
+
+
+def write_po(out: Path, po_text: str) -> bool:
+    """Пише PO, якщо він відрізняється від наявного чимось, крім дати."""
+    if out.exists():
+        old = out.read_text(encoding="utf-8")
+        if DATE_RE.sub("", old, count=1) == DATE_RE.sub("", po_text, count=1):
+            return False
+    atomic_write(out, po_text.encode("utf-8"))
+    return True
+
+
+def convert_single(src: Path, trg: Path, out: Path) -> Result:
+    (src_rows, src_bad), (trg_rows, trg_bad) = read_tsv(src), read_tsv(trg)
+    problems = [f"{src}:{m}" for m in src_bad] + [f"{trg}:{m}" for m in trg_bad]
+    written = write_po(out, rows_to_po(src_rows, trg_rows, src.name))
+    return Result(out, written, problems)
+
+
+def shown(p: Path) -> Path:
+    """Акуратний вивід шляху — відносно поточної теки, якщо можна."""
     try:
-        shown = out.relative_to(Path.cwd())
+        return p.resolve().relative_to(Path.cwd())
     except ValueError:
-        shown = out
-    print(f"✅  {shown}")
+        return p
+
+
+def print_result(r: Result) -> None:
+    print(f"{'✅' if r.written else '– '}  {shown(r.out)}{'' if r.written else ' (без змін)'}")
+    for m in r.problems:
+        print(f"   ⚠️  {m}")
 
 # ── головна логіка ───────────────────────────────────────────────────
-if args.src and args.trg:
-    out_path = Path(args.trg).with_suffix(".po")
-    convert_single(Path(args.src), Path(args.trg), out_path)
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", help="оригінальний TSV")
+    ap.add_argument("--trg", help="TSV з перекладом")
+    ap.add_argument("--srcdir", help="каталог оригіналів")
+    ap.add_argument("--trgdir", help="каталог перекладів")
+    ap.add_argument("--outdir", default="po", help="куди класти po-файли")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="кількість процесів")
+    args = ap.parse_args(argv)
+
+    if args.src and args.trg:
+        print_result(convert_single(Path(args.src), Path(args.trg), Path(args.trg).with_suffix(".po")))
+        return 0
+
+    if not (args.srcdir and args.trgdir):
+        ap.print_help()
+        return 1
 
-elif args.srcdir and args.trgdir:
     srcdir, trgdir, outdir = map(Path, (args.srcdir, args.trgdir, args.outdir))
     if not (srcdir.exists() and trgdir.exists()):
         raise SystemExit("⛔  srcdir / trgdir не існують.")
 
-    for src_file in srcdir.glob("*.loc.tsv"):
+    jobs = []
+    for src_file in sorted(srcdir.glob("*.loc.tsv")):
         trg_file = trgdir / src_file.name
         if not trg_file.exists():
             print(f"⚠️  пропущено {src_file.name} (немає перекладу)")
             continue
-        out_file = outdir / f"{src_file.stem}.po"
-        convert_single(src_file, trg_file, out_file)
-
-else:
-    ap.print_help()
+        jobs.append((src_file, trg_file, outdir / f"{src_file.stem}.po"))
+
+    if len(jobs) <= 1 or args.jobs <= 1:
+        results = [convert_single(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(convert_single, *zip(*jobs), chunksize=4))
+
+    for r in results:
+        if r.written or r.problems:
+            print_result(r)
+    written = sum(r.written for r in results)
+    bad = sum(len(r.problems) for r in results)
+    print(f"\nPO-файлів: {len(results)}, записано: {written}, без змін: {len(results) - written}"
+          + (f", битих рядків: {bad}" if bad else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+tsv_index.py
+────────────
+Індекс key → зміщення в байтах для *.loc.tsv, щоб не розбирати весь файл,
+коли потрібні лише кілька ключів (patch_lua.py, dedup apply тощо).
+
+• індекс будується ліниво, за один прохід по байтах файлу (без pandas),
+  і зберігається поруч у кеші: `_temp/cache/keyindex/<шлях>.json`
+• інвалідується за хешем вмісту: спершу звіряється дешевий відбиток
+  (розмір + mtime), а якщо він змінився — sha1; збіг sha1 означає, що
+  файл лише «торкнули», і індекс лишається чинним
+• `read()` читає з диска лише потрібні рядки (seek + read)
+• ключ, що трапляється у файлі кілька разів, має кілька проміжків:
+  `read()` повертає останній (як dict(zip(...)) у pandas-коді), а
+  `rewrite()` змінює всі — як `df.loc[df.key == k, "text"] = …`
+• `rewrite()` замінює text у кількох рядках, переписуючи тільки їхні
+  байтові проміжки (інші рядки не серіалізуються заново), і зсуває
+  зміщення наступних рядків без повторного сканування; запис іде
+  транзакцією під блокуванням дерева (l10n_txn.py)
+
+Використання як модуля:
+    idx = KeyIndex(Path("translation/text/db/technologies.loc.tsv"))
+    rows = idx.read(["technologies_onscreen_name_x"])    # key → [key, text, tooltip]
+    idx.rewrite({"technologies_onscreen_name_x": "Новий текст"})
+
+CLI (для перевірки):
+    python scripts/tsv_index.py translation/text/db/technologies.loc.tsv KEY [KEY …]
+"""
+
+import bisect, json, sys
+from pathlib import Path
+from typing import Iterable
+
+from l10n_tree import CACHE_DIR, file_signature, text_hash
+from l10n_txn import Transaction
+
+INDEX_DIR = CACHE_DIR / "keyindex"
+INDEX_VERSION = 2                       # 2: список проміжків на key (дублікати)
+
+
+def scan_offsets(data: bytes) -> dict[str, list[list[int]]]:
+    """key → [[start, end], …] тіл рядків (без кінця рядка) у порядку файлу;
+    заголовок пропускається."""
+    offsets: dict[str, list[list[int]]] = {}
+    pos = 0
+    first = True
+    for line in data.splitlines(keepends=True):
+        body_len = len(line.rstrip(b"\r\n"))
+        if not first:
+            tab = line.find(b"\t", 0, body_len)
+            key = line[:tab if tab >= 0 else body_len].decode("utf-8", errors="ignore")
+            offsets.setdefault(key, []).append([pos, pos + body_len])
+        first = False
+        pos += len(line)
+    return offsets
+
+
+class KeyIndex:
+    """Індекс зміщень одного TSV-файлу з кешем на диску."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.sidecar = INDEX_DIR / (self.path.as_posix().replace("/", "__") + ".json")
+        self.offsets: dict[str, list[list[int]]] = {}
+        self.sha1 = ""
+        self._load()
+
+    # ── побудова / кеш ───────────────────────────────────────────────
+    def _load(self) -> None:
+        sig = file_signature(self.path)
+        if self.sidecar.exists():
+            try:
+                meta = json.loads(self.sidecar.read_text(encoding="utf-8"))
+            except ValueError:
+                meta = {}
+            if meta.get("version") != INDEX_VERSION:
+                meta = {}
+            if meta.get("sig") == sig:
+                self.offsets, self.sha1 = meta["offsets"], meta["sha1"]
+                return
+            data = self.path.read_bytes()
+            if meta.get("sha1") == text_hash(data):
+                self.offsets, self.sha1 = meta["offsets"], meta["sha1"]
+                self._save()
+                return
+            self._build(data)
+            return
+        self._build(self.path.read_bytes())
+
+    def _build(self, data: bytes) -> None:
+        self.offsets = scan_offsets(data)
+        self.sha1 = text_hash(data)
+        self._save()
+
+    def _save(self) -> None:
+        self.sidecar.parent.mkdir(parents=True, exist_ok=True)
+        self.sidecar.write_text(json.dumps({
+            "version": INDEX_VERSION, "sig": file_signature(self.path), "sha1": self.sha1, "offsets": self.offsets,
+        }, ensure_ascii=False), encoding="utf-8")
+
+    # ── читання ──────────────────────────────────────────────────────
+    def __contains__(self, key: str) -> bool:
+        return key in self.offsets
+
+    def read(self, keys: Iterable[str]) -> dict[str, list[str]]:
+        """key → поля рядка для тих ключів, що є у файлі."""
+        wanted = sorted((*self.offsets[k][-1], k) for k in set(keys) if k in self.offsets)
+        rows = {}
+        with open(self.path, "rb") as f:
+            for start, end, key in wanted:
+                f.seek(start)
+                rows[key] = f.read(end - start).decode("utf-8").split("\t")
+        return rows
+
+    def texts(self, keys: Iterable[str]) -> dict[str, str]:
+        return {k: row[1] if len(row) > 1 else "" for k, row in self.read(keys).items()}
+
+    # ── запис ────────────────────────────────────────────────────────
+    def rewrite(self, edits: dict[str, str]) -> int:
+        """Замінює колонку text у рядках вказаних key (усіх дублікатів);
+        повертає кількість змінених рядків."""
+        # читання → запис під блокуванням дерева, на свіжому індексі
+        with Transaction() as txn:
+            self._load()
+            edits = {k: v for k, v in edits.items() if k in self.offsets}
+            if not edits:
+                return 0
+            data = self.path.read_bytes()
+
+            # рядки, що справді змінюються, від початку файлу
+            spans = []
+            for start, end, key in sorted((s, e, k) for k in edits for s, e in self.offsets[k]):
+                fields = data[start:end].split(b"\t")
+                new = edits[key].encode("utf-8")
+                if len(fields) < 2 or fields[1] == new:
+                    continue
+                fields[1] = new
+                spans.append((start, end, b"\t".join(fields)))
+            if not spans:
+                return 0
+
+            # склеюємо файл з незмінених шматків і нових рядків
+            parts, pos = [], 0
+            for start, end, line in spans:
+                parts += [data[pos:start], line]
+                pos = end
+            parts.append(data[pos:])
+            new_data = b"".join(parts)
+            txn.stage(self.path, new_data)
+
+        # зсуваємо зміщення: кожен рядок — на суму дельт змінених рядків перед ним
+        starts = [s for s, _, _ in spans]
+        shift = [0]
+        for start, end, line in spans:
+            shift.append(shift[-1] + len(line) - (end - start))
+        for key, ranges in self.offsets.items():
+            for span in ranges:
+                start, end = span
+                i = bisect.bisect_right(starts, start)
+                if i and starts[i - 1] == start:         # сам змінений рядок
+                    span[:] = [start + shift[i - 1], start + shift[i - 1] + len(spans[i - 1][2])]
+                elif shift[i]:
+                    span[:] = [start + shift[i], end + shift[i]]
+        self.sha1 = text_hash(new_data)
+        self._save()
+        return len(spans)
+
+
+def lookup_keys(files: Iterable[Path], keys: Iterable[str]) -> dict[str, str]:
+    """key → text для потрібних ключів з кількох файлів (пізніші перекривають)."""
+    keys = set(keys)
+    found: dict[str, str] = {}
+    for p in files:
+        found.update(KeyIndex(p).texts(keys))
+    return found
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Використання: tsv_index.py <file.loc.tsv> KEY [KEY …]")
+        sys.exit(1)
+    for k, row in KeyIndex(Path(sys.argv[1])).read(sys.argv[2:]).items():
+        print("\t".join(row))
@@ -7,6 +7,12 @@ unescape_quotes.py
 • Знімає зайві зовнішні лапки, якщо весь вміст поля був взятий у "…".
 • Не змінює інші колонки, порядок рядків і сервісні рядки.
 
+Працює на рівні байтів, рядок за рядком (без pandas): кожен рядок
+виправляється за один прохід, незмінені рядки копіюються як є (разом
+із кінцями рядків), а файл перезаписується лише тоді, коли в ньому
+щось справді змінилося. Файли обробляються паралельно, а виправлені
+записуються однією транзакцією під блокуванням дерева (l10n_txn.py).
+
 Використання:
     # 1) За замовчуванням пройти всі *.loc.tsv у DEFAULT_DIR
     python unescape_quotes.py
@@ -14,79 +20,117 @@ unescape_quotes.py
     # 2) Вказати файл(и) або директорію(ї)
     python unescape_quotes.py translation/text/db/names.loc.tsv
     python unescape_quotes.py translation/text/db  other_dir/
+
+    # 3) Лише перевірити (нічого не записує; код виходу 1, якщо є що виправити)
+    python unescape_quotes.py --check
+
+Підходить для pre-commit (див. .pre-commit-config.yaml): хук отримує
+лише змінені файли.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import sys
-import pandas as pd
+import argparse, contextlib, os, re, sys
+
+from l10n_txn import TreeLock, write_files
 
 DEFAULT_DIR = Path("translation/text/db")  # змініть, якщо потрібно
 
-# Повністю вимикаємо будь-яке «цитування» при читанні/записі
-QUOTE_NONE = 3         # еквівалент csv.QUOTE_NONE (без імпорту csv)
-QUOTECHAR  = "\x00"    # «неможливий» символ — щоб " сприймались як звичайні
+QUOTE_RUN_RE = re.compile(rb'"{2,}')
 
-def unescape_field(s: str):
-    if not isinstance(s, str):
-        return s
+def unescape_field(s: bytes) -> bytes:
     # якщо поле повністю обгорнуте в лапки — знімаємо їх один раз
-    if len(s) >= 2 and s[0] == '"' and s[-1] == '"':
+    if len(s) >= 2 and s[:1] == b'"' and s[-1:] == b'"':
         s = s[1:-1]
-    # прибираємо подвоєні лапки всередині
-    if '""' in s:
-        # два проходи гарантують обробку послідовностей типу """" → ""
-        s = s.replace('""', '"')
-        while '""' in s:
-            s = s.replace('""', '"')
+    # будь-яка послідовність "" / """ / """" … → одна лапка
+    if b'""' in s:
+        s = QUOTE_RUN_RE.sub(b'"', s)
     return s
 
-def process_file(path: Path) -> int:
-    df = pd.read_csv(
-        path, sep="\t", dtype=str,
-        keep_default_na=False, na_filter=False,
-        engine="python", quoting=QUOTE_NONE, quotechar=QUOTECHAR
-    )
-    if "text" not in df.columns:
-        print(f"{path.name}: колонку 'text' не знайдено — пропуск.")
-        return 0
-
-    before = df["text"].copy()
-    df["text"] = df["text"].map(unescape_field)
-    changed = (df["text"] != before).sum()
-
-    if changed:
-        df.to_csv(
-            path, sep="\t", index=False, na_rep="",
-            quoting=QUOTE_NONE, quotechar=QUOTECHAR,
-        )
-    print(f"{path.name}: оновлено {changed} рядків")
-    return changed
-
-def main():
-    args = sys.argv[1:]
-    files: list[Path] = []
+def normalize(data: bytes) -> tuple[bytes, int]:
+    """Повертає (новий вміст, кількість змінених рядків)."""
+    lines = data.splitlines(keepends=True)
+    if not lines:
+        return data, 0
+
+    header = lines[0].rstrip(b"\r\n").split(b"\t")
+    if b"text" not in header:
+        return data, -1
+    col = header.index(b"text")
+
+    changed = 0
+    for i in range(1, len(lines)):
+        line = lines[i]
+        if b'"' not in line:
+            continue
+        body = line.rstrip(b"\r\n")
+        eol = line[len(body):]
+        fields = body.split(b"\t")
+        if len(fields) <= col:
+            continue
+        fixed = unescape_field(fields[col])
+        if fixed != fields[col]:
+            fields[col] = fixed
+            lines[i] = b"\t".join(fields) + eol
+            changed += 1
+
+    return (b"".join(lines) if changed else data), changed
 
-    if args:
-        for a in args:
+def process_file(path: Path) -> tuple[Path, int, bytes]:
+    """(файл, кількість змінених рядків або -1, новий вміст) — без запису."""
+    new, changed = normalize(path.read_bytes())
+    return path, changed, new
+
+def main(argv: list[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Прибирає подвоєні/зовнішні лапки в колонці text.")
+    ap.add_argument("paths", nargs="*", help="файли або каталоги (за замовчуванням DEFAULT_DIR)")
+    ap.add_argument("--check", action="store_true", help="лише перевірити, нічого не записувати")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="кількість процесів")
+    args = ap.parse_args(argv)
+
+    files: list[Path] = []
+    if args.paths:
+        for a in args.paths:
             p = Path(a)
             if p.is_dir():
                 files.extend(sorted(p.glob("*.loc.tsv")))
-            else:
+            elif p.exists():
                 files.append(p)
+            else:
+                print(f"{p} — не знайдено, пропуск.")
     else:
         files = sorted(DEFAULT_DIR.glob("*.loc.tsv"))
 
     if not files:
         print("Файлів не знайдено.")
-        sys.exit(1)
+        return 1
 
-    total = 0
-    for f in files:
-        if f.exists():
-            total += process_file(f)
+    # блокування на весь цикл читання → запис, щоб не затерти чужі зміни;
+    # --check нічого не пише — і не блокує дерево
+    with TreeLock() if not args.check else contextlib.nullcontext():
+        if len(files) == 1 or args.jobs <= 1:
+            results = [process_file(f) for f in files]
         else:
-            print(f"{f} — не знайдено, пропуск.")
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                results = list(pool.map(process_file, files))
+
+        total, fixed = 0, {}
+        for path, changed, new in results:
+            if changed < 0:
+                print(f"{path.name}: колонку 'text' не знайдено — пропуск.")
+            elif changed and args.check:
+                print(f"{path.name}: потрібно виправити {changed} рядків")
+            elif changed:
+                fixed[path] = new
+                print(f"{path.name}: оновлено {changed} рядків")
+            total += max(changed, 0)
+        write_files(fixed)
+
+    if args.check:
+        print(f"Перевірено. Рядків до виправлення: {total}")
+        return 1 if total else 0
     print(f"Готово. Всього змінено рядків: {total}")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+upstream_import.py
+──────────────────
+Імпорт оригіналу прямо з *.pack мода в `_upstream/en` — без RPFM/PFM і
+ручного експорту.
+
+Що робить:
+  • читає індекс pack-файлів (PFH0, PFH2–PFH5; Attila — PFH4) через
+    mmap: вміст файлів не копіюється в пам'ять, лише індекс
+  • кожна бінарна таблиця `*.loc` (заголовок `FF FE "LOC" 00`, версія,
+    кількість записів; запис — key і text як UTF-16LE з довжиною u16 та
+    байт tooltip) розбирається потоково з mmap і пишеться як
+    `_upstream/en/<шлях>.loc.tsv` у тому ж вигляді, що й експорт RPFM:
+        key | text | tooltip
+        #Loc;1;text/db/names.loc | |
+        …
+    (табуляції й переноси рядків у тексті — `\\t` і `\\n`)
+  • таблиці розбираються паралельно (`-j`), кожен процес відкриває
+    pack-и через mmap сам
+  • Lua-скрипти (`*.lua`) копіюються як є в `_upstream/en/<шлях>`
+  • записуються лише змінені файли, усі однією транзакцією (l10n_txn.py);
+    файли `_upstream/en`, яких у pack-ах більше немає, показуються, а з
+    `--prune` — видаляються в тій самій транзакції
+
+Кілька pack-ів: файл з того самого шляху береться з останнього в списку.
+Стиснуті файли PFH5 (LZMA) розпаковуються; шифровані pack-и не
+підтримуються.
+
+Використання:
+    python scripts/upstream_import.py ~/mods/mk1212*.pack
+    python scripts/upstream_import.py mk1212_main.pack --dry-run
+    python scripts/upstream_import.py mk1212_main.pack --prune --snapshot v1.5
+
+Далі — як завжди: `python scripts/l10n.py update`.
+"""
+
+import argparse, lzma, mmap, os, struct, sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple, Optional
+
+from l10n_tree import Tree
+from l10n_txn import Transaction
+import upstream_snapshot
+
+OUT_DIR = Path("_upstream/en")
+
+PFH_HEADER_SIZE = {b"PFH0": 24, b"PFH2": 32, b"PFH3": 32, b"PFH4": 28, b"PFH5": 28}
+HAS_EXTENDED_HEADER       = 0x100
+HAS_ENCRYPTED_INDEX       = 0x80
+HAS_INDEX_WITH_TIMESTAMPS = 0x40
+HAS_ENCRYPTED_DATA        = 0x10
+
+LOC_MAGIC = b"\xff\xfeLOC\x00"
+
+
+class PackError(ValueError):
+    """Файл не є підтримуваним pack-ом або таблицею *.loc."""
+
+
+class Entry(NamedTuple):
+    pack: int           # номер pack-а в списку
+    path: str           # шлях усередині pack-а, через «/»
+    offset: int
+    size: int
+    compressed: bool
+
+# ── pack ─────────────────────────────────────────────────────────────
+def read_index(buf, pack: int = 0) -> list[Entry]:
+    """Індекс файлів pack-а (буфер — mmap або bytes)."""
+    magic = bytes(buf[:4])
+    if magic not in PFH_HEADER_SIZE:
+        raise PackError(f"невідомий формат {magic!r} (очікується PFH0, PFH2–PFH5)")
+    if len(buf) < PFH_HEADER_SIZE[magic]:
+        raise PackError("файл коротший за заголовок pack-а")
+    flags, _, pack_index_size, count, file_index_size = struct.unpack_from("<5I", buf, 4)
+    if flags & (HAS_ENCRYPTED_INDEX | HAS_ENCRYPTED_DATA):
+        raise PackError("шифровані pack-и не підтримуються")
+    pos = PFH_HEADER_SIZE[magic] + (20 if magic == b"PFH5" and flags & HAS_EXTENDED_HEADER else 0)
+    pos += pack_index_size                      # список залежних pack-ів
+    data = pos + file_index_size
+    stamp = (8 if magic in (b"PFH2", b"PFH3") else 4) if flags & HAS_INDEX_WITH_TIMESTAMPS else 0
+
+    entries = []
+    for _ in range(count):
+        end = buf.find(b"\x00", pos + 4 + stamp + (magic == b"PFH5"), data)
+        if end < 0:
+            raise PackError("індекс обрізаний (pack пошкоджений?)")
+        size, = struct.unpack_from("<I", buf, pos)
+        pos += 4 + stamp
+        compressed = False
+        if magic == b"PFH5":
+            compressed = bool(buf[pos])
+            pos += 1
+        path = bytes(buf[pos:end]).decode("utf-8", "replace").replace("\\", "/")
+        entries.append(Entry(pack, path, data, size, compressed))
+        pos = end + 1
+        data += size
+    if data > len(buf):
+        raise PackError("індекс виходить за межі файлу (pack обрізаний?)")
+    return entries
+
+
+def read_data(buf, e: Entry):
+    """Вміст файлу; без стиснення — memoryview на mmap без копіювання."""
+    view = memoryview(buf)[e.offset:e.offset + e.size]
+    if not e.compressed:
+        return view
+    # u32 розмір після розпакування + LZMA1 (5 байт властивостей) без поля розміру
+    size, = struct.unpack_from("<I", view)
+    alone = bytes(view[4:9]) + struct.pack("<Q", size) + bytes(view[9:])
+    return lzma.decompress(alone, format=lzma.FORMAT_ALONE)
+
+# ── *.loc → *.loc.tsv ────────────────────────────────────────────────
+def _escape(s: str) -> str:
+    return s.replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+
+
+def loc_to_tsv(data, path: str) -> bytes:
+    """Бінарна таблиця *.loc → TSV у форматі експорту RPFM."""
+    if bytes(data[:6]) != LOC_MAGIC:
+        raise PackError(f"{path}: не таблиця *.loc")
+    version, count = struct.unpack_from("<2I", data, 6)
+    lines = ["key\ttext\ttooltip", f"#Loc;{version};{path}\t\t"]
+    pos = 14
+    try:
+        for _ in range(count):
+            fields = []
+            for _ in range(2):
+                n, = struct.unpack_from("<H", data, pos)
+                fields.append(_escape(str(data[pos + 2:pos + 2 + 2 * n], "utf-16-le")))
+                pos += 2 + 2 * n
+            lines.append(f"{fields[0]}\t{fields[1]}\t{'true' if data[pos] else 'false'}")
+            pos += 1
+    except (struct.error, IndexError):
+        raise PackError(f"{path}: обрізаний запис №{len(lines) - 1} із {count}") from None
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def target(path: str) -> Optional[Path]:
+    """Куди в `_upstream/en` лягає файл pack-а (None — не імпортується).
+
+    Шлях з pack-а — чужі дані: абсолютний, з «..» або диском Windows
+    (`C:`) дає PackError, щоб жоден запис не вийшов за межі `_upstream/en`.
+    """
+    if not path.endswith((".loc", ".lua")):
+        return None
+    parts = PurePosixPath(path).parts
+    if not parts or path.startswith("/") or any(p in ("", ".", "..") or ":" in p for p in parts):
+        raise PackError(f"небезпечний шлях у pack-і: {path!r}")
+    dst = OUT_DIR.joinpath(*parts[:-1], parts[-1] + (".tsv" if path.endswith(".loc") else ""))
+    if not dst.resolve().is_relative_to(OUT_DIR.resolve()):
+        raise PackError(f"небезпечний шлях у pack-і: {path!r}")
+    return dst
+
+# ── паралельний розбір ───────────────────────────────────────────────
+_maps: list = []
+
+
+def _init_worker(packs: list[Path]) -> None:
+    global _maps
+    _maps = []
+    for p in packs:
+        with open(p, "rb") as f:
+            _maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _convert(e: Entry) -> bytes:
+    data = read_data(_maps[e.pack], e)
+    return loc_to_tsv(data, e.path) if e.path.endswith(".loc") else bytes(data)
+
+
+def extract(packs: list[Path], jobs: int = os.cpu_count()) -> dict[Path, bytes]:
+    """Шлях у `_upstream/en` → новий вміст для всіх *.loc і *.lua pack-ів."""
+    _init_worker(packs)
+    chosen: dict[Path, Entry] = {}
+    for i, buf in enumerate(_maps):
+        try:
+            entries = read_index(buf, i)
+        except PackError as e:
+            raise PackError(f"{packs[i]}: {e}") from None
+        for e in entries:
+            try:
+                dst = target(e.path)
+            except PackError as err:
+                raise PackError(f"{packs[i]}: {err}") from None
+            if dst is not None:
+                chosen[dst] = e                 # пізніший pack перекриває
+    out = {dst: bytes(read_data(_maps[e.pack], e)) for dst, e in chosen.items() if not e.path.endswith(".loc")}
+    locs = {dst: e for dst, e in chosen.items() if e.path.endswith(".loc")}
+    if jobs <= 1 or len(locs) < 8:
+        out.update(zip(locs, map(_convert, locs.values())))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(packs,)) as pool:
+            out.update(zip(locs, pool.map(_convert, locs.values(), chunksize=max(1, len(locs) // (jobs * 4)))))
+    return dict(sorted(out.items()))
+
+
+def existing() -> set[Path]:
+    return {p for p in OUT_DIR.rglob("*") if p.name.endswith((".loc.tsv", ".lua"))}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Імпорт *.loc і *.lua з pack-ів мода в _upstream/en.")
+    ap.add_argument("packs", nargs="+", type=Path, help="*.pack мода (пізніші перекривають попередні)")
+    ap.add_argument("--prune", action="store_true", help="видалити з _upstream/en файли, яких немає в pack-ах")
+    ap.add_argument("--snapshot", metavar="LABEL", help="після імпорту записати знімок (upstream_snapshot.py)")
+    ap.add_argument("--dry-run", action="store_true", help="лише показати, що зміниться")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="кількість процесів")
+    args = ap.parse_args(argv)
+
+    for p in args.packs:
+        if not p.is_file() or not p.stat().st_size:
+            print(f"❌ {p}: файл не знайдено або порожній")
+            return 1
+    try:
+        files = extract(args.packs, args.jobs)
+    except PackError as e:
+        print(f"⛔  {e}")
+        return 1
+    if not files:
+        print("⚠️  У pack-ах немає ні *.loc, ні *.lua.")
+        return 1
+
+    changed = {p: d for p, d in files.items() if not p.exists() or p.read_bytes() != d}
+    gone = sorted(existing() - set(files))
+    for p in changed:
+        print(f"{'+' if not p.exists() else '~'} {p.as_posix()}")
+    for p in gone:
+        print(f"{'-' if args.prune else '⚠️  немає в pack-ах:'} {p.as_posix()}")
+    tables = sum(p.name.endswith(".loc.tsv") for p in files)
+    summary = (f"таблиць: {tables}, Lua: {len(files) - tables}; змінено файлів: {len(changed)}"
+               + (f", видалено: {len(gone)}" if args.prune and gone else ""))
+    if args.dry_run:
+        print(f"\n(dry-run) {summary}")
+        return 0
+
+    with Transaction() as txn:
+        for p, data in changed.items():
+            txn.stage(p, data)
+        if args.prune:
+            for p in gone:
+                txn.delete(p)
+    print(f"\n✅ {summary}")
+    if args.snapshot:
+        upstream_snapshot.record(Tree(), args.snapshot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+upstream_snapshot.py
+────────────────────
+Архів версій `_upstream/<мова>/text/db`: кожен імпорт оригіналу
+зберігається як один стиснутий знімок, щоб після оновлення мода швидко
+відповісти «які EN-рядки змінилися між 1.x і 1.y» і перечитати їхній
+переклад.
+
+Знімок — `_upstream/snapshots/<мова>/<мітка>.snap.gz`:
+
+    {"format": 1, "label": …, "files": [...], "rows": N}   ← заголовок (JSON)
+    key₁ … keyₙ                                            ← колонка key
+    file₁ … fileₙ                                          ← індекс файлу в "files"
+    text₁ … textₙ                                          ← колонка text
+
+Рядки відсортовані за (key, файл), колонки лежать окремо — схожі key
+стоять поруч і gzip стискає їх у рази краще, ніж сирі TSV.
+
+Порівняння двох знімків — злиття двох відсортованих списків за один
+прохід (O(n + m)), без словників на весь знімок.
+
+Використання:
+    python scripts/upstream_snapshot.py record v1.4          # знімок поточного _upstream/en
+    python scripts/upstream_snapshot.py list
+    python scripts/upstream_snapshot.py diff v1.3 v1.4       # що змінилося в EN
+    python scripts/upstream_snapshot.py diff v1.4            # v1.4 → поточний _upstream/en
+    python scripts/upstream_snapshot.py diff v1.3 v1.4 --json changes.json
+
+merge_tsv.py --review-since <мітка> використовує цей diff, щоб позначити
+перекладені рядки, EN-текст яких змінився.
+"""
+
+import argparse, gzip, json, sys
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from l10n_tree import Tree, atomic_write
+
+UPSTREAM_DIR = Path("_upstream")
+SNAP_DIR     = UPSTREAM_DIR / "snapshots"
+FORMAT       = 1
+
+
+class Snapshot(NamedTuple):
+    label: str
+    files: list[str]
+    keys: list[str]         # відсортовано за (key, files[file_idx])
+    file_idx: list[int]
+    texts: list[str]
+
+    def rows(self) -> Iterator[tuple[str, str, str]]:
+        """(key, файл, text) у порядку сортування."""
+        files = self.files
+        for key, i, text in zip(self.keys, self.file_idx, self.texts):
+            yield key, files[i], text
+
+
+def snapshot_path(label: str, lang: str = "en") -> Path:
+    return SNAP_DIR / lang / f"{label}.snap.gz"
+
+# ── побудова / запис / читання ───────────────────────────────────────
+def build(tree: Tree, label: str, lang: str = "en") -> Snapshot:
+    """Знімок поточного `_upstream/<lang>/text/db`."""
+    paths = tree.files(UPSTREAM_DIR / lang / "text" / "db")
+    files = [p.name for p in paths]              # уже відсортовані
+    rows = []
+    for i, p in enumerate(paths):
+        df = tree.table(p)
+        for key, text in zip(df["key"], df["text"]):
+            if key.strip() and not key.startswith("#Loc;"):
+                rows.append((key, i, text))
+    rows.sort()
+    return Snapshot(label, files, [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+
+
+def dump(snap: Snapshot) -> bytes:
+    # без часу створення: той самий upstream дає байт-у-байт той самий знімок
+    header = {"format": FORMAT, "label": snap.label, "files": snap.files, "rows": len(snap.keys)}
+    parts = [json.dumps(header, ensure_ascii=False),
+             *snap.keys, *map(str, snap.file_idx), *snap.texts]
+    return gzip.compress(("\n".join(parts) + "\n").encode("utf-8"), mtime=0)
+
+
+def load(path: Path) -> Snapshot:
+    lines = gzip.decompress(path.read_bytes()).decode("utf-8").split("\n")
+    header = json.loads(lines[0])
+    if header.get("format") != FORMAT:
+        raise SystemExit(f"⛔  {path}: невідомий формат знімка {header.get('format')}")
+    n = header["rows"]
+    return Snapshot(header["label"], header["files"], lines[1:1 + n],
+                    [int(i) for i in lines[1 + n:1 + 2 * n]], lines[1 + 2 * n:1 + 3 * n])
+
+
+def record(tree: Tree, label: str, lang: str = "en") -> Path:
+    snap = build(tree, label, lang)
+    if any("\n" in t for t in snap.texts):
+        raise SystemExit("⛔  Текст містить перенос рядка — знімок неможливий.")
+    path = snapshot_path(label, lang)
+    atomic_write(path, dump(snap))
+    print(f"✅ {path}: {len(snap.keys)} рядків з {len(snap.files)} файлів "
+          f"({path.stat().st_size // 1024} KiB).")
+    return path
+
+
+def resolve(tree: Tree, label: Optional[str], lang: str = "en") -> Snapshot:
+    """Знімок за міткою; None — поточний стан `_upstream/<lang>` без запису."""
+    if label is None:
+        return build(tree, "(поточний)", lang)
+    path = snapshot_path(label, lang)
+    if not path.exists():
+        raise SystemExit(f"⛔  Знімок {path} не знайдено.")
+    return load(path)
+
+# ── diff ─────────────────────────────────────────────────────────────
+class Change(NamedTuple):
+    status: str              # added / removed / changed
+    file: str
+    key: str
+    old: Optional[str]
+    new: Optional[str]
+
+
+def diff(old: Snapshot, new: Snapshot) -> Iterator[Change]:
+    """Злиття двох відсортованих знімків за один прохід."""
+    a, b = old.rows(), new.rows()
+    x, y = next(a, None), next(b, None)
+    while x is not None or y is not None:
+        kx = (x[0], x[1]) if x is not None else None
+        ky = (y[0], y[1]) if y is not None else None
+        if ky is None or (kx is not None and kx < ky):
+            yield Change("removed", x[1], x[0], x[2], None)
+            x = next(a, None)
+        elif kx is None or ky < kx:
+            yield Change("added", y[1], y[0], None, y[2])
+            y = next(b, None)
+        else:
+            if x[2] != y[2]:
+                yield Change("changed", x[1], x[0], x[2], y[2])
+            x, y = next(a, None), next(b, None)
+
+
+def changed_keys(old: Snapshot, new: Snapshot) -> dict[str, dict[str, tuple[str, str]]]:
+    """file → {key: (старий EN, новий EN)} для рядків зі зміненим текстом."""
+    result: dict[str, dict[str, tuple[str, str]]] = {}
+    for c in diff(old, new):
+        if c.status == "changed":
+            result.setdefault(c.file, {})[c.key] = (c.old, c.new)
+    return result
+
+# ── CLI ──────────────────────────────────────────────────────────────
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Знімки _upstream і diff між версіями.")
+    ap.add_argument("--lang", default="en", help="мова в _upstream (за замовчуванням en)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("record", help="записати знімок поточного _upstream/<lang>")
+    p.add_argument("label")
+    sub.add_parser("list", help="наявні знімки")
+    p = sub.add_parser("diff", help="зміни між двома знімками")
+    p.add_argument("old")
+    p.add_argument("new", nargs="?", help="за замовчуванням — поточний _upstream/<lang>")
+    p.add_argument("--changed-only", action="store_true", help="лише змінені тексти")
+    p.add_argument("--json", metavar="PATH", help="записати зміни в JSON")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    if args.cmd == "record":
+        record(tree, args.label, args.lang)
+        return 0
+
+    if args.cmd == "list":
+        for path in sorted((SNAP_DIR / args.lang).glob("*.snap.gz")):
+            header = json.loads(gzip.open(path, "rt", encoding="utf-8").readline())
+            print(f"{header['label']:<20} {header['rows']:>8} рядків  {len(header['files'])} файлів")
+        return 0
+
+    old, new = resolve(tree, args.old, args.lang), resolve(tree, args.new, args.lang)
+    changes = [c for c in diff(old, new) if not args.changed_only or c.status == "changed"]
+    marks = {"added": "+", "removed": "-", "changed": "~"}
+    for c in changes:
+        if c.status == "changed":
+            print(f"~ {c.file}:{c.key}\n    - {c.old}\n    + {c.new}")
+        else:
+            print(f"{marks[c.status]} {c.file}:{c.key}")
+    counts = {s: sum(c.status == s for c in changes) for s in marks}
+    print(f"\n{old.label} → {new.label}: +{counts['added']} нових, "
+          f"-{counts['removed']} видалених, ~{counts['changed']} змінених.")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps([c._asdict() for c in changes],
+                                              ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,7 @@ validate_tsv.py – швидка перевірка всіх *.loc.tsv у вка
 • key не порожній
 • немає дублів key
 • TSV-розділювач = \t
-
-Колонка tooltip не аналізується – грі потрібна, але її вміст нас не цікавить.
+• tooltip — лише true / false (порожньо — у службовому рядку #Loc;)
 
 Використання:
     python scripts/validate_tsv.py                    # перевіряє translation/text/db/
@@ -16,40 +15,32 @@ validate_tsv.py – швидка перевірка всіх *.loc.tsv у вка
 
 from pathlib import Path
 import sys
+
 import pandas as pd
 
-# Визначаємо шлях до папки для перевірки
-if len(sys.argv) > 1:
-    ROOT = Path(sys.argv[1])
-else:
-    ROOT = Path("translation/text/db")
+from l10n_tree import Tree
 
+DEFAULT_ROOT = Path("translation/text/db")
 REQUIRED_COLS = ["key", "text", "tooltip"]
-EXIT_CODE = 0
 
 
 def fail(msg: str) -> None:
-    """Додає повідомлення та встановлює код виходу 1."""
-    global EXIT_CODE
     print(f"❌ {msg}")
-    EXIT_CODE = 1
 
 def warn(msg: str) -> None:
     print(f"⚠️  {msg}")
 
 
-print(f"🔍 Перевіряємо TSV у {ROOT} …\n")
-
-for file in sorted(ROOT.glob("*.loc.tsv")):
-    try:
-        df = pd.read_csv(file, sep="\t", dtype=str, keep_default_na=False)
-    except Exception as e:
-        fail(f"{file}: не вдалося прочитати файл ({e})")
-        continue
+def check_table(file, df: pd.DataFrame) -> int:
+    """Перевірки однієї таблиці; повертає 1, якщо є помилки."""
+    exit_code = 0
 
     # 1. Перевіряємо колонки
     if list(df.columns) != REQUIRED_COLS:
         fail(f"{file}: очікувано колонки {REQUIRED_COLS}, а отримано {list(df.columns)}")
+        if "key" not in df.columns:
+            return 1
+        exit_code = 1
 
     # 2. Порожні key
     empty_rows = df["key"].str.strip() == ""
@@ -63,11 +54,37 @@ for file in sorted(ROOT.glob("*.loc.tsv")):
     if not dup_keys.empty:
         keys = ", ".join(dup_keys.unique())
         fail(f"{file}: дублікати key: {keys}")
-
-# ── Підсумок ─────────────────────────────────────────────────────────────
-if EXIT_CODE == 0:
-    print("✅ Усі файли валідні – проблем не знайдено.")
-else:
-    print("⚠️  Перевірка завершена з помилками.")
-
-sys.exit(EXIT_CODE)
+        exit_code = 1
+
+    # 4. tooltip: load_tsv робить з неї bool, якщо всі значення true/false/""
+    if "tooltip" in df.columns and df["tooltip"].dtype != "boolean":
+        odd = sorted(set(df["tooltip"]) - {"true", "false", ""})
+        warn(f"{file}: tooltip не true/false: {', '.join(map(repr, odd[:5]))}")
+    return exit_code
+
+
+def validate(tree: Tree, root: Path = DEFAULT_ROOT) -> int:
+    """Перевіряє всі таблиці каталогу (з дерева) і повертає код виходу."""
+    exit_code = 0
+    print(f"🔍 Перевіряємо TSV у {root} …\n")
+
+    for file in tree.files(root):
+        try:
+            df = tree.table(file)
+        except Exception as e:
+            fail(f"{file}: не вдалося прочитати файл ({e})")
+            exit_code = 1
+            continue
+        exit_code |= check_table(file, df)
+
+    # ── Підсумок ─────────────────────────────────────────────────────────
+    if exit_code == 0:
+        print("✅ Усі файли валідні – проблем не знайдено.")
+    else:
+        print("⚠️  Перевірка завершена з помилками.")
+    return exit_code
+
+
+if __name__ == "__main__":
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROOT
+    sys.exit(validate(Tree(), root))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+worklist.py
+───────────
+Ділить усі неперекладені рядки дерева на N рівних за обсягом пакетів для
+перекладачів — замість того щоб роздавати цілі файли (хтось отримує
+technologies.loc.tsv на 1.5 МБ, а хтось — файл на 2 КБ).
+
+plan:
+  1. неперекладені рядки — як у translation_report.py / mt_prefill.py
+     (UA == EN, без службових рядків і placeholder-ів)
+  2. дедуплікація між файлами: кожен унікальний EN-текст перекладається
+     один раз, хоч би скільки key його мали
+  3. вага тексту — кількість слів EN (або символів, `--weight chars`),
+     розмітка [[…]] / {{…}} не рахується
+  4. тексти групуються за префіксом key (файл + перші `--prefix-depth`
+     частин key через «_»), щоб пов'язані рядки (назва й опис одного
+     загону, репліки одного діалогу) потрапили до однієї людини; група,
+     важча за середній пакет, ділиться на послідовні шматки
+  5. групи розкладаються по N пакетах жадібно (найважча група — в
+     найлегший пакет), що дає майже рівні пакети
+  6. кожен пакет — самодостатній файл у `_worklists/`:
+       • TSV: text | translate | keys  (як у dedup_translate_tsv.py;
+         keys — «файл:key» через кому)
+       • PO:  msgid — EN, msgstr — переклад, `#:` — «файл:key»
+
+Повторний plan перезаписує `_worklists/`, лише якщо пакети попереднього
+plan ніхто не редагував (sha1 з plan.json); інакше — відмова без
+`--force`, щоб не затерти роботу перекладача. Зайві `batch_*` від
+попереднього plan з більшим `-n` видаляються.
+
+apply: переклади з заповненого пакета підставляються в усі його key —
+лише в рядки, які досі не перекладені й EN яких не змінився з моменту
+plan (інакше рядок пропускається з попередженням).
+
+Використання:
+    python scripts/worklist.py plan -n 4                     # 4 пакети TSV
+    python scripts/worklist.py plan -n 6 --format po --weight chars
+    python scripts/worklist.py apply _worklists/batch_02.tsv
+    python scripts/worklist.py apply _worklists/batch_02.po --dry-run
+"""
+
+import argparse, heapq, json, re, sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from l10n_tree import READ_KW, Tree, WRITE_KW, atomic_write, text_hash
+from mt_prefill import untranslated
+from tsv2po import po_escape
+
+OUT_DIR = Path("_worklists")
+MARKUP_RE = re.compile(r"\[\[[^\]]*\]\]|\{\{[^}]*\}\}")
+WORD_RE = re.compile(r"\w+")
+
+
+class Unit(NamedTuple):
+    """Унікальний EN-текст і всі місця, де він неперекладений."""
+    en: str
+    places: list[str]           # «файл:key»
+    weight: int
+
+
+def text_weight(text: str, by: str) -> int:
+    plain = MARKUP_RE.sub(" ", text)
+    return max(1, len(WORD_RE.findall(plain)) if by == "words" else len(plain.strip()))
+
+
+def key_prefix(name: str, key: str, depth: int) -> str:
+    return f"{name}:{'_'.join(key.split('_')[:depth])}"
+
+# ── планування ───────────────────────────────────────────────────────
+def collect_units(tree: Tree, by: str, depth: int) -> dict[str, list[Unit]]:
+    """Префікс → унікальні тексти (кожен — у префіксі свого першого key)."""
+    units: dict[str, Unit] = {}
+    prefix_of: dict[str, str] = {}
+    for trg_path, key, en in untranslated(tree):
+        place = f"{trg_path.name}:{key}"
+        if en in units:
+            units[en].places.append(place)
+        else:
+            units[en] = Unit(en, [place], text_weight(en, by))
+            prefix_of[en] = key_prefix(trg_path.name, key, depth)
+    groups: dict[str, list[Unit]] = {}
+    for en, unit in units.items():
+        groups.setdefault(prefix_of[en], []).append(unit)
+    return groups
+
+
+def split_group(units: list[Unit], limit: float) -> list[list[Unit]]:
+    """Послідовні шматки групи, кожен не важчий за limit (якщо можна)."""
+    total = sum(u.weight for u in units)
+    if total <= limit:
+        return [units]
+    parts = -(-total // int(max(limit, 1)))
+    size = total / parts
+    chunks, cur, acc = [], [], 0
+    for u in units:
+        if cur and acc + u.weight > size * 1.05 and len(chunks) < parts - 1:
+            chunks.append(cur)
+            cur, acc = [], 0
+        cur.append(u)
+        acc += u.weight
+    chunks.append(cur)
+    return chunks
+
+
+def plan(groups: dict[str, list[Unit]], n: int) -> list[list[Unit]]:
+    """N пакетів приблизно однакової ваги (жадібне LPT-пакування)."""
+    total = sum(u.weight for units in groups.values() for u in units)
+    chunks = [c for units in groups.values() for c in split_group(units, total / n)]
+    chunks.sort(key=lambda c: -sum(u.weight for u in c))
+    heap = [(0, i) for i in range(n)]
+    batches: list[list[Unit]] = [[] for _ in range(n)]
+    for chunk in chunks:
+        weight, i = heapq.heappop(heap)
+        batches[i].extend(chunk)
+        heapq.heappush(heap, (weight + sum(u.weight for u in chunk), i))
+    # у пакеті — у порядку файлів і key, як у дереві
+    order = {u.en: i for i, u in enumerate(u for units in groups.values() for u in units)}
+    for batch in batches:
+        batch.sort(key=lambda u: order[u.en])
+    return batches
+
+# ── експорт ──────────────────────────────────────────────────────────
+def dump_tsv(units: list[Unit]) -> bytes:
+    df = pd.DataFrame({"text": [u.en for u in units], "translate": "",
+                       "keys": [",".join(u.places) for u in units]})
+    return df.to_csv(**WRITE_KW).encode("utf-8")
+
+
+def dump_po(units: list[Unit], name: str) -> bytes:
+    lines = ['msgid ""', 'msgstr ""', '"Language: uk\\n"', '"Content-Type: text/plain; charset=UTF-8\\n"',
+             f'"X-Worklist: {name}\\n"', ""]
+    for u in units:
+        lines += [f"#: {' '.join(u.places)}", f'msgid "{po_escape(u.en)}"', 'msgstr ""', ""]
+    return "\n".join(lines).encode("utf-8")
+
+# ── читання заповненого пакета ───────────────────────────────────────
+PO_UNESCAPE_RE = re.compile(r'\\(.)')
+
+
+def po_unescape(s: str) -> str:
+    r"""Зворотне до tsv2po.po_escape: \\ і \" — символи, а \n лишається як є
+    (у *.loc.tsv новий рядок і так записано двома символами)."""
+    return PO_UNESCAPE_RE.sub(lambda m: m.group(1) if m.group(1) in '\\"' else m.group(0), s)
+
+
+def read_po(path: Path) -> list[tuple[str, str, list[str]]]:
+    """(EN, переклад, «файл:key») з PO; рядки, розбиті редактором, склеюються."""
+    entries, places, field, values = [], [], None, {}
+
+    def finish() -> None:
+        if values.get("msgid"):
+            entries.append((values["msgid"], values.get("msgstr", ""), list(places)))
+
+    for line in path.read_text(encoding="utf-8").splitlines() + [""]:
+        line = line.strip()
+        if not line:
+            finish()
+            places, field, values = [], None, {}
+        elif line.startswith("#:"):
+            places += line[2:].split()
+        elif line.startswith("#"):
+            continue
+        elif line.startswith(("msgid ", "msgstr ", "msgctxt ")):
+            field, _, rest = line.partition(" ")
+            values[field] = po_unescape(rest.strip()[1:-1])
+        elif line.startswith('"') and field:
+            values[field] += po_unescape(line[1:-1])
+    return entries
+
+
+def read_worklist(path: Path) -> list[tuple[str, str, list[str]]]:
+    if path.suffix == ".po":
+        return read_po(path)
+    df = pd.read_csv(path, usecols=["text", "translate", "keys"], **READ_KW)
+    return [(en, tr, [p.strip() for p in keys.split(",") if p.strip()])
+            for en, tr, keys in zip(df["text"], df["translate"], df["keys"])]
+
+
+def apply(tree: Tree, entries: list[tuple[str, str, list[str]]]) -> tuple[int, list[str]]:
+    """Підставляє переклади; повертає (кількість рядків, пропущені «файл:key — причина»)."""
+    trg_dir = Path("translation/text/db")
+    pending = {f"{p.name}:{k}": en for p, k, en in untranslated(tree)}
+    edits: dict[str, dict[str, str]] = {}
+    skipped = []
+    for en, tr, places in entries:
+        if not tr or tr == en:
+            continue
+        for place in places:
+            if pending.get(place) == en:
+                name, _, key = place.partition(":")
+                edits.setdefault(name, {})[key] = tr
+            else:
+                skipped.append(f"{place} — вже перекладено або EN змінився")
+    for name, rows in edits.items():
+        tree.edit_rows(trg_dir / name, rows)
+    return sum(len(r) for r in edits.values()), skipped
+
+
+def edited_batches(outdir: Path) -> list[str]:
+    """Пакети в outdir, вміст яких відрізняється від записаного plan-ом."""
+    manifest = outdir / "plan.json"
+    try:
+        known = {m["file"]: m["sha1"] for m in json.loads(manifest.read_text(encoding="utf-8"))["batches"]}
+    except (OSError, ValueError, KeyError):
+        known = {}
+    return [p.name for p in sorted(outdir.glob("batch_*"))
+            if known.get(p.name) != text_hash(p.read_bytes())]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Рівні пакети неперекладених рядків для перекладачів.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan", help="розкласти неперекладене на N пакетів")
+    p.add_argument("-n", "--batches", type=int, required=True, help="кількість пакетів (перекладачів)")
+    p.add_argument("--weight", choices=("words", "chars"), default="words", help="міра обсягу EN-тексту")
+    p.add_argument("--prefix-depth", type=int, default=3, help="скільки частин key тримати разом")
+    p.add_argument("--format", choices=("tsv", "po"), default="tsv")
+    p.add_argument("--outdir", type=Path, default=OUT_DIR)
+    p.add_argument("--force", action="store_true", help="перезаписати пакети, які вже редагувалися")
+    p = sub.add_parser("apply", help="підставити переклади із заповненого пакета")
+    p.add_argument("worklist", type=Path)
+    p.add_argument("--dry-run", action="store_true", help="нічого не записувати")
+    args = ap.parse_args(argv)
+
+    tree = Tree()
+    if args.cmd == "apply":
+        count, skipped = apply(tree, read_worklist(args.worklist))
+        for s in skipped:
+            print(f"⚠️  {s}")
+        if args.dry_run:
+            print(f"(dry-run) буде підставлено рядків: {count} у {len(tree.pending())} файлах")
+            return 0
+        written = tree.flush()
+        print(f"✅ {args.worklist.name}: підставлено рядків: {count}, записано файлів: {len(written)}")
+        return 0
+
+    groups = collect_units(tree, args.weight, args.prefix_depth)
+    if not groups:
+        print("✅ Неперекладених рядків немає.")
+        return 0
+    batches = plan(groups, max(1, args.batches))
+
+    edited = edited_batches(args.outdir)
+    if edited and not args.force:
+        print(f"⛔  У {args.outdir.as_posix()} є пакети, змінені після попереднього plan: {', '.join(edited)}")
+        print("    Застосуйте їх (apply), а тоді запустіть plan з --force.")
+        return 1
+
+    manifest = []
+    print(f"{'Пакет':<16} {'Текстів':>7} {'Рядків':>7} {'Обсяг':>8}  Файли")
+    for i, units in enumerate(batches, 1):
+        name = f"batch_{i:02d}.{args.format}"
+        data = dump_tsv(units) if args.format == "tsv" else dump_po(units, name)
+        atomic_write(args.outdir / name, data)
+        files = sorted({p.split(":", 1)[0] for u in units for p in u.places})
+        weight = sum(u.weight for u in units)
+        rows = sum(len(u.places) for u in units)
+        manifest.append({"file": name, "texts": len(units), "rows": rows, "weight": weight,
+                         "files": files, "sha1": text_hash(data)})
+        shown = ", ".join(files[:3]) + (f", … ще {len(files) - 3}" if len(files) > 3 else "")
+        print(f"{name:<16} {len(units):>7} {rows:>7} {weight:>8}  {shown}")
+    current = {m["file"] for m in manifest}
+    for old in sorted(args.outdir.glob("batch_*")):
+        if old.name not in current:
+            old.unlink()
+            print(f"–  видалено застарілий {old.name}")
+    atomic_write(args.outdir / "plan.json",
+                 json.dumps({"weight": args.weight, "batches": manifest}, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    weights = [m["weight"] for m in manifest]
+    print(f"\nОбсяг ({args.weight}): найменший пакет {min(weights)}, найбільший {max(weights)}.")
+    print(f"Після перекладу:  python scripts/worklist.py apply {args.outdir.as_posix()}/batch_NN.{args.format}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())